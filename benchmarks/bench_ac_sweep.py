@@ -0,0 +1,53 @@
+"""Benchmark the vectorized AC sweep on RLC ladders.
+
+Sweeps 10k logarithmically spaced frequencies over ladders of increasing
+length and reports the time of the modal (all points in one vectorized
+evaluation) method next to a per-point sparse factorization estimate.
+
+    python benchmarks/bench_ac_sweep.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from circuit_core import Circuit, ac_sweep  # noqa: E402
+
+POINTS = 10000
+SPARSE_SAMPLE = 100  # Points timed with the per-point method, then extrapolated
+
+
+def build_ladder(sections):
+    """Alternating R / L series sections with a shunt capacitor at every node"""
+    circuit = Circuit()
+    circuit.add_ac_source("V1", "n0", "0", 1.0)
+    for i in range(sections):
+        if i % 2:
+            circuit.add_inductor(f"L{i}", f"n{i}", f"n{i + 1}", 1e-3)
+        else:
+            circuit.add_resistor(f"R{i}", f"n{i}", f"n{i + 1}", 10.0)
+        circuit.add_capacitor(f"C{i}", f"n{i + 1}", "0", 1e-6)
+    circuit.add_resistor("RL", f"n{sections}", "0", 50.0)
+    return circuit
+
+
+def main():
+    frequencies = np.logspace(1, 6, POINTS)
+    print(f"{'nodes':>6} {'modal s':>9} {'per-point sparse s (est.)':>26}")
+    for sections in (50, 100, 200, 400):
+        circuit = build_ladder(sections)
+        start = time.perf_counter()
+        ac_sweep(circuit, frequencies, method='modal')
+        t_modal = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ac_sweep(circuit, frequencies[:SPARSE_SAMPLE], method='sparse')
+        t_sparse = (time.perf_counter() - start) * POINTS / SPARSE_SAMPLE
+        print(f"{circuit.num_nodes:6d} {t_modal:9.3f} {t_sparse:26.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Benchmark MNA assembly of large dependent-source networks.
+
+Builds a chain of resistive stages, each driven by a voltage-controlled
+voltage source, a current-controlled current source and an ideal
+transformer, and times assemble_dc and a full DC solve.
+
+    python benchmarks/bench_assembly.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from circuit_core import Circuit, solve_dc  # noqa: E402
+from circuit_core.mna import assemble_dc  # noqa: E402
+
+
+def build_chain(stages):
+    circuit = Circuit()
+    circuit.add_voltage_source("V1", "n0", "0", 1.0)
+    for i in range(stages):
+        circuit.add_vcvs(f"E{i}", f"a{i}", "0", f"n{i}", "0", 2.0)
+        circuit.add_resistor(f"RA{i}", f"a{i}", f"b{i}", 1e3)
+        circuit.add_transformer(f"T{i}", f"b{i}", "0", f"s{i}", "0", 0.5)
+        circuit.add_resistor(f"RS{i}", f"s{i}", f"n{i + 1}", 1e3)
+        circuit.add_cccs(f"F{i}", "0", f"n{i + 1}", "V1", 1e-3)
+        circuit.add_resistor(f"RL{i}", f"n{i + 1}", "0", 1e3)
+    return circuit
+
+
+def main():
+    print(f"{'stages':>8} {'unknowns':>9} {'build ms':>9} {'assemble ms':>12} {'solve ms':>9}")
+    for stages in (100, 1000, 10000, 100000):
+        start = time.perf_counter()
+        circuit = build_chain(stages)
+        built = time.perf_counter()
+        assemble_dc(circuit)
+        assembled = time.perf_counter()
+        solve_dc(circuit)
+        solved = time.perf_counter()
+        print(f"{stages:8d} {circuit.size:9d} {(built - start) * 1e3:9.1f} "
+              f"{(assembled - built) * 1e3:12.1f} {(solved - assembled) * 1e3:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
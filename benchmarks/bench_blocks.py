@@ -0,0 +1,53 @@
+"""Benchmark block solving of canvases made of many independent exercises.
+
+Each exercise is a small divider network, every seventh one buffered by a
+voltage-controlled source. Compares one sparse LU of the whole system with
+the block solver, and times a re-solve after a source change.
+
+    python benchmarks/bench_blocks.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from circuit_core import Circuit  # noqa: E402
+from circuit_core.blocks import BlockSolver  # noqa: E402
+from circuit_core.mna import DCSolver  # noqa: E402
+
+
+def build_canvas(exercises):
+    circuit = Circuit()
+    for i in range(exercises):
+        circuit.add_voltage_source(f"V{i}", f"a{i}", "0", 1.0 + i % 3)
+        circuit.add_resistor(f"R1_{i}", f"a{i}", f"b{i}", 1e3)
+        circuit.add_resistor(f"R2_{i}", f"b{i}", "0", 2e3 * (1 + i % 5))
+        if i % 2:
+            circuit.add_resistor(f"R3_{i}", f"b{i}", f"c{i}", 1e3)
+            circuit.add_resistor(f"R4_{i}", f"c{i}", "0", 1e3)
+        if i % 7 == 0:
+            circuit.add_vcvs(f"E{i}", f"o{i}", "0", f"b{i}", "0", 3.0)
+            circuit.add_resistor(f"RL{i}", f"o{i}", "0", 1e3)
+    return circuit
+
+
+def main():
+    print(f"{'parts':>7} {'unknowns':>9} {'blocks':>7} {'single LU ms':>13} {'blocks ms':>10} {'re-solve ms':>12}")
+    for exercises in (10, 500, 5000, 50000):
+        circuit = build_canvas(exercises)
+        start = time.perf_counter()
+        DCSolver(circuit).solve()
+        single = time.perf_counter()
+        solver = BlockSolver(circuit)
+        solver.solve()
+        blocked = time.perf_counter()
+        solver.set_value("V0", 2.0)
+        solver.solve()
+        resolved = time.perf_counter()
+        print(f"{exercises:7d} {circuit.size:9d} {len(solver.structure):7d} {(single - start) * 1e3:13.1f} "
+              f"{(blocked - single) * 1e3:10.1f} {(resolved - blocked) * 1e3:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
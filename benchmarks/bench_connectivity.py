@@ -0,0 +1,57 @@
+"""Benchmark net extraction time against pin count.
+
+Places rows of two-pin parts joined end to end, with a wire every tenth
+part, extracts all nets from scratch and then times incremental updates
+after moving single parts.
+
+    python benchmarks/bench_connectivity.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from circuit_core import Schematic  # noqa: E402
+
+PINS = [('1', (-40.0, 0.0)), ('2', (40.0, 0.0))]
+ROW = 500  # Parts per row
+
+
+def build(parts):
+    schematic = Schematic()
+    for i in range(parts):
+        x = (i % ROW) * 80.0
+        y = (i // ROW) * 80.0
+        schematic.add('R', (x, y), pins=PINS)
+        if i % 10 == 0:
+            schematic.add_wire((x - 40.0, y), (x - 40.0, y + 80.0))
+    return schematic
+
+
+def main():
+    random.seed(0)
+    print(f"{'pins':>8} {'build s':>8} {'extract s':>10} {'us/pin':>7} {'nets':>7} {'move+refresh us':>16}")
+    for parts in (1000, 10000, 50000):
+        start = time.perf_counter()
+        schematic = build(parts)
+        built = time.perf_counter()
+        nets = schematic.connectivity.nets()
+        extracted = time.perf_counter()
+
+        components = list(schematic)
+        moves = 200
+        move_start = time.perf_counter()
+        for _ in range(moves):
+            schematic.move(random.choice(components), 80.0, 0.0)
+            schematic.connectivity.refresh()
+        move_time = (time.perf_counter() - move_start) / moves
+
+        pins = 2 * parts
+        print(f"{pins:8d} {built - start:8.3f} {extracted - built:10.3f} "
+              f"{(extracted - built) / pins * 1e6:7.2f} {len(nets):7d} {move_time * 1e6:16.1f}")
+
+
+if __name__ == "__main__":
+    main()
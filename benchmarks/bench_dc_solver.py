@@ -0,0 +1,66 @@
+"""Benchmark DC operating point solve time against node count.
+
+Builds square resistor meshes driven by a voltage source and compares the
+sparse LU solver with a dense numpy.linalg.solve (dense only up to a size
+where it still finishes in reasonable time).
+
+    python benchmarks/bench_dc_solver.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+from scipy.sparse.linalg import splu
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from circuit_core import Circuit, assemble_dc  # noqa: E402
+
+DENSE_LIMIT = 4000  # Largest system handed to the dense solver
+
+
+def build_mesh(side):
+    """side x side resistor grid, corner driven by 1V, opposite corner grounded"""
+    circuit = Circuit()
+    for row in range(side):
+        for col in range(side):
+            node = f"n{row}_{col}"
+            if col + 1 < side:
+                circuit.add_resistor(f"RH{row}_{col}", node, f"n{row}_{col + 1}", 1e3)
+            if row + 1 < side:
+                circuit.add_resistor(f"RV{row}_{col}", node, f"n{row + 1}_{col}", 1e3)
+    circuit.add_voltage_source("V1", "n0_0", "0", 1.0)
+    circuit.add_resistor("RGND", f"n{side - 1}_{side - 1}", "0", 1e3)
+    return circuit
+
+
+def timed(func, repeat=3):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    print(f"{'nodes':>8} {'assemble ms':>12} {'sparse LU ms':>13} {'dense ms':>10} {'max |dx|':>10}")
+    for side in (10, 20, 32, 50, 71, 100, 141, 200):
+        circuit = build_mesh(side)
+        t_assemble, (matrix, rhs) = timed(lambda: assemble_dc(circuit))
+
+        t_sparse, x_sparse = timed(lambda: splu(matrix, permc_spec='COLAMD').solve(rhs))
+        if matrix.shape[0] <= DENSE_LIMIT:
+            t_dense, x_dense = timed(lambda: np.linalg.solve(matrix.toarray(), rhs), repeat=1)
+            dense = f"{t_dense * 1e3:10.2f}"
+            error = f"{np.max(np.abs(x_dense - x_sparse)):10.1e}"
+        else:
+            dense = f"{'-':>10}"
+            error = f"{'-':>10}"
+        print(f"{circuit.num_nodes:8d} {t_assemble * 1e3:12.2f} {t_sparse * 1e3:13.2f} {dense} {error}")
+
+
+if __name__ == "__main__":
+    main()
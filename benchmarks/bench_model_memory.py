@@ -0,0 +1,83 @@
+"""Benchmark resident memory per placed part.
+
+Compares the old dict-per-part records (item lists in a dict) with bare
+slotted Component/Pin records, and with a full Schematic, which adds the
+id map and the canvas item -> component reverse map. Canvas item ids are
+plain integers here, as they are in Tk.
+
+    python benchmarks/bench_model_memory.py
+"""
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from circuit_core import Component, Schematic  # noqa: E402
+
+PINS = [('1', (-40.0, 0.0)), ('2', (40.0, 0.0))]
+ITEMS_PER_PART = (12, 3, 3)  # symbol, name and value items of a two-pin part
+
+
+def build_dicts(count):
+    components = []
+    item = 0
+    for i in range(count):
+        parts = []
+        for size in ITEMS_PER_PART:
+            parts.append(list(range(item, item + size)))
+            item += size
+        components.append({
+            'type': 'R', 'name_text': f"R{i + 1}", 'origin': (float(i % 500) * 40, float(i // 500) * 40),
+            'pins': [{'name': name, 'offset': offset} for name, offset in PINS],
+            'symbol': parts[0], 'name': parts[1], 'value': parts[2],
+        })
+    return components
+
+
+def build_components(count):
+    components = []
+    item = 0
+    for i in range(count):
+        parts = []
+        for size in ITEMS_PER_PART:
+            parts.append(range(item, item + size))
+            item += size
+        components.append(Component(i + 1, 'R', f"R{i + 1}", (float(i % 500) * 40, float(i // 500) * 40),
+                                    pins=PINS, symbol=parts[0], name=parts[1], value=parts[2]))
+    return components
+
+
+def build_schematic(count):
+    schematic = Schematic()
+    item = 0
+    for i in range(count):
+        parts = []
+        for size in ITEMS_PER_PART:
+            parts.append(range(item, item + size))
+            item += size
+        schematic.add('R', (float(i % 500) * 40, float(i // 500) * 40), name_text=f"R{i + 1}",
+                      pins=PINS, symbol=parts[0], name=parts[1], value=parts[2])
+    return schematic
+
+
+def measure(builder, count):
+    tracemalloc.start()
+    result = builder(count)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main():
+    print(f"{'parts':>8} {'dict B/part':>12} {'slotted B/part':>15} {'schematic B/part':>17}")
+    for count in (1000, 10000, 50000):
+        old = measure(build_dicts, count)
+        slotted = measure(build_components, count)
+        schematic = measure(build_schematic, count)
+        print(f"{count:8d} {old / count:12.0f} {slotted / count:15.0f} {schematic / count:17.0f}")
+
+
+if __name__ == "__main__":
+    main()
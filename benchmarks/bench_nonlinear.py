@@ -0,0 +1,46 @@
+"""Benchmark Newton-Raphson operating points of transistor circuits.
+
+Solves a growing number of independent common-emitter stages (divider
+biased NPNs) from a cold start, then re-solves after a supply change
+starting from the previous operating point.
+
+    python benchmarks/bench_nonlinear.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from circuit_core import Circuit  # noqa: E402
+from circuit_core.nonlinear import NewtonSolver  # noqa: E402
+
+
+def build_stages(stages):
+    circuit = Circuit()
+    circuit.add_voltage_source("VCC", "vcc", "0", 12.0)
+    for i in range(stages):
+        circuit.add_resistor(f"R1_{i}", "vcc", f"b{i}", 47e3)
+        circuit.add_resistor(f"R2_{i}", f"b{i}", "0", 10e3)
+        circuit.add_resistor(f"RC{i}", "vcc", f"c{i}", 4.7e3)
+        circuit.add_resistor(f"RE{i}", f"e{i}", "0", 1e3)
+        circuit.add_bjt(f"Q{i}", f"c{i}", f"b{i}", f"e{i}")
+    return circuit
+
+
+def main():
+    print(f"{'BJTs':>6} {'cold ms':>8} {'iter':>5} {'warm ms':>8} {'iter':>5}")
+    for stages in (1, 10, 100, 1000):
+        solver = NewtonSolver(build_stages(stages))
+        start = time.perf_counter()
+        cold = solver.solve()
+        solved = time.perf_counter()
+        solver.set_value("VCC", 11.0)
+        warm = solver.solve()
+        resolved = time.perf_counter()
+        print(f"{stages:6d} {(solved - start) * 1e3:8.2f} {cold.iterations:5d} "
+              f"{(resolved - solved) * 1e3:8.2f} {warm.iterations:5d}")
+
+
+if __name__ == "__main__":
+    main()
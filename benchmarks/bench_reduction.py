@@ -0,0 +1,46 @@
+"""Benchmark series/parallel reduction of resistor ladders.
+
+Builds ladders of series and shunt resistors, collapses them, and compares
+solving the reduced circuit (with back-substitution of every removed node)
+against solving the full MNA system.
+
+    python benchmarks/bench_reduction.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from circuit_core import Circuit, solve_dc  # noqa: E402
+from circuit_core.reduction import reduce_circuit  # noqa: E402
+
+
+def build_ladder(sections):
+    circuit = Circuit()
+    circuit.add_voltage_source("V1", "n0", "0", 10.0)
+    for i in range(sections):
+        circuit.add_resistor(f"RS{i}", f"n{i}", f"n{i + 1}", 1e3)
+        circuit.add_resistor(f"RP{i}", f"n{i + 1}", "0", 10e3)
+        circuit.add_resistor(f"RQ{i}", f"n{i + 1}", "0", 10e3)  # Parallel pair
+    return circuit
+
+
+def main():
+    print(f"{'sections':>9} {'unknowns':>9} {'reduced':>8} {'steps':>6} {'full ms':>8} "
+          f"{'reduce ms':>10} {'solve ms':>9}")
+    for sections in (10, 100, 1000, 10000):
+        circuit = build_ladder(sections)
+        start = time.perf_counter()
+        solve_dc(circuit)
+        full = time.perf_counter()
+        reduction = reduce_circuit(circuit)
+        reduced = time.perf_counter()
+        reduction.solve()
+        solved = time.perf_counter()
+        print(f"{sections:9d} {circuit.size:9d} {reduction.circuit.size:8d} {len(reduction):6d} "
+              f"{(full - start) * 1e3:8.1f} {(reduced - full) * 1e3:10.1f} {(solved - reduced) * 1e3:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
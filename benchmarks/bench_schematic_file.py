@@ -0,0 +1,52 @@
+"""Benchmark saving and opening schematic files against part count.
+
+Times save_schematic, mapping the file (header only), and a full load into
+a Schematic, and reports the file size per part.
+
+    python benchmarks/bench_schematic_file.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from circuit_core import Schematic  # noqa: E402
+from circuit_core.schematic_file import SchematicFile, load_schematic, save_schematic  # noqa: E402
+
+PINS = [('1', (-40.0, 0.0)), ('2', (40.0, 0.0))]
+ROW = 500  # Parts per row
+
+
+def build(parts):
+    schematic = Schematic()
+    for i in range(parts):
+        x = (i % ROW) * 80.0
+        y = (i // ROW) * 80.0
+        schematic.add('R', (x, y), value_text=f"{i % 100 + 1}k", pins=PINS)
+        if i % 10 == 0:
+            schematic.add_wire((x - 40.0, y), (x - 40.0, y + 80.0))
+    return schematic
+
+
+def main():
+    print(f"{'parts':>8} {'save s':>8} {'map ms':>8} {'load s':>8} {'B/part':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.csch')
+        for parts in (1000, 10000, 50000):
+            schematic = build(parts)
+            start = time.perf_counter()
+            save_schematic(schematic, path)
+            saved = time.perf_counter()
+            with SchematicFile(path) as schematic_file:
+                len(schematic_file)
+            mapped = time.perf_counter()
+            load_schematic(path)
+            loaded = time.perf_counter()
+            print(f"{parts:8d} {saved - start:8.3f} {(mapped - saved) * 1e3:8.2f} "
+                  f"{loaded - mapped:8.3f} {os.path.getsize(path) / parts:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
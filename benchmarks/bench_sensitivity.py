@@ -0,0 +1,62 @@
+"""Benchmark adjoint sensitivities against perturbation re-solves.
+
+For a resistor mesh, computes the sensitivity of one node voltage to every
+resistor with one transpose solve, and compares it with perturbing each
+resistor and re-solving (low-rank updates on a shared factorization).
+
+    python benchmarks/bench_sensitivity.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from circuit_core import Circuit  # noqa: E402
+from circuit_core.mna import DCSolver  # noqa: E402
+from circuit_core.sensitivity import dc_sensitivities  # noqa: E402
+
+
+def build_mesh(side):
+    circuit = Circuit()
+    circuit.add_voltage_source("V1", "n0_0", "0", 1.0)
+    for i in range(side):
+        for j in range(side):
+            if i + 1 < side:
+                circuit.add_resistor(f"RV{i}_{j}", f"n{i}_{j}", f"n{i + 1}_{j}", 1e3 + i + j)
+            if j + 1 < side:
+                circuit.add_resistor(f"RH{i}_{j}", f"n{i}_{j}", f"n{i}_{j + 1}", 1e3 + i * j)
+    circuit.add_resistor("RL", f"n{side - 1}_{side - 1}", "0", 1e3)
+    return circuit
+
+
+def main():
+    print(f"{'resistors':>10} {'adjoint ms':>11} {'perturb ms':>11} {'max rel diff':>13}")
+    for side in (5, 10, 20, 40):
+        circuit = build_mesh(side)
+        output = f"n{side // 2}_{side // 2}"
+        solver = DCSolver(circuit)
+        solver.solve()
+        start = time.perf_counter()
+        sensitivity = dc_sensitivities(circuit, output, solver=solver)
+        adjoint = time.perf_counter()
+        base = solver.solve().voltage(output)
+        names = circuit.resistors.names
+        perturbed = np.empty(len(names))
+        for k, name in enumerate(names):
+            value = circuit.resistors.values[k]
+            step = value * 1e-6
+            solver.set_value(name, value + step)
+            perturbed[k] = (solver.solve().voltage(output) - base) / step
+            solver.set_value(name, value)
+        finished = time.perf_counter()
+        exact = np.array([sensitivity[name] for name in names])
+        scale = np.abs(exact).max()
+        print(f"{len(names):10d} {(adjoint - start) * 1e3:11.2f} {(finished - adjoint) * 1e3:11.1f} "
+              f"{np.abs(exact - perturbed).max() / scale:13.2e}")
+
+
+if __name__ == "__main__":
+    main()
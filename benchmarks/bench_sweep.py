@@ -0,0 +1,48 @@
+"""Benchmark Monte Carlo runs of a resistor ladder.
+
+Draws 5% tolerances for a growing number of ladder resistors and solves
+the DC operating point of every run with the batched low-rank path and
+with a process pool over all cores.
+
+    python benchmarks/bench_sweep.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from circuit_core import Circuit  # noqa: E402
+from circuit_core.sweeps import monte_carlo  # noqa: E402
+
+SECTIONS = 500
+RUNS = 2000
+
+
+def build_ladder(sections):
+    circuit = Circuit()
+    circuit.add_voltage_source("V1", "n0", "0", 10.0)
+    for i in range(sections):
+        circuit.add_resistor(f"R{i}", f"n{i}", f"n{i + 1}", 100.0)
+        circuit.add_resistor(f"S{i}", f"n{i + 1}", "0", 10e3)
+    return circuit
+
+
+def main():
+    circuit = build_ladder(SECTIONS)
+    output = f"n{SECTIONS}"
+    print(f"{RUNS} runs, {SECTIONS * 2} resistors, {os.cpu_count()} cores")
+    print(f"{'varied':>7} {'batch s':>8} {'pool s':>8}")
+    for varied in (1, 8, 32, 64):
+        tolerances = {f"R{i}": 0.05 for i in range(varied)}
+        start = time.perf_counter()
+        batch = monte_carlo(circuit, tolerances, RUNS, [output], seed=1, method='batch')
+        batched = time.perf_counter()
+        pool = monte_carlo(circuit, tolerances, RUNS, [output], seed=1, method='pool')
+        pooled = time.perf_counter()
+        assert abs(batch.mean[0] - pool.mean[0]) < 1e-9
+        print(f"{varied:7d} {batched - start:8.3f} {pooled - batched:8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Headless circuit analysis engine used by the Circuit Calculator GUI.
+
+Nothing in this package imports tkinter. Submodules are imported lazily, so
+loading a library or building a schematic does not pay for numpy/scipy.
+"""
+import importlib
+
+_EXPORTS = {
+    'ACSweep': 'ac',
+    'ac_sweep': 'ac',
+    'BlockSolver': 'blocks',
+    'block_structure': 'blocks',
+    'DEFAULT_LIBRARY': 'library',
+    'SymbolGeometry': 'geometry',
+    'History': 'history',
+    'SchematicEditor': 'history',
+    'transform_points': 'geometry',
+    'LibraryRegistry': 'library',
+    'SpiceDevice': 'library',
+    'SymbolLibrary': 'library',
+    'load_library': 'library',
+    'parse_library': 'library',
+    'Circuit': 'mna',
+    'DCSolution': 'mna',
+    'DCSolver': 'mna',
+    'SingularCircuitError': 'mna',
+    'assemble_dc': 'mna',
+    'assemble_reactive': 'mna',
+    'parse_value': 'mna',
+    'solve_dc': 'mna',
+    'ConvergenceError': 'nonlinear',
+    'NewtonSolver': 'nonlinear',
+    'Component': 'schematic',
+    'Connectivity': 'connectivity',
+    'Net': 'connectivity',
+    'Pin': 'schematic',
+    'Schematic': 'schematic',
+    'Wire': 'schematic',
+    'SchematicFile': 'schematic_file',
+    'SchematicFormatError': 'schematic_file',
+    'export_json': 'schematic_file',
+    'load_schematic': 'schematic_file',
+    'save_schematic': 'schematic_file',
+    'Sensitivities': 'sensitivity',
+    'ac_sensitivities': 'sensitivity',
+    'dc_sensitivities': 'sensitivity',
+    'Reduction': 'reduction',
+    'ReductionStep': 'reduction',
+    'reduce_circuit': 'reduction',
+    'SpatialIndex': 'spatial',
+    'SweepResult': 'sweeps',
+    'circuit_from_schematic': 'sweeps',
+    'grid': 'sweeps',
+    'monte_carlo': 'sweeps',
+    'sweep': 'sweeps',
+    'SymbolicCache': 'symbolic',
+    'SymbolicSolution': 'symbolic',
+    'nodal_equations': 'symbolic',
+    'solve_symbolic': 'symbolic',
+    'iter_netlist': 'spice',
+    'write_netlist': 'spice',
+    'Pulse': 'tran',
+    'Sine': 'tran',
+    'TransientChunk': 'tran',
+    'TransientSimulator': 'tran',
+    'transient': 'tran',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,177 @@
+"""Small-signal AC frequency sweep over the MNA system G + sC"""
+import logging
+
+import numpy as np
+import scipy.linalg
+from scipy.sparse.linalg import splu
+
+from .mna import SingularCircuitError, assemble_dc, assemble_reactive
+
+logger = logging.getLogger(__name__)
+
+DENSE_LIMIT = 2000  # Largest system handled by the dense modal/batched methods
+BATCH_BYTES = 64 * 2**20  # Memory budget for one stack of batched dense matrices
+MODAL_TOLERANCE = 1e-8  # Relative residual accepted from the modal method
+AC_METHODS = ('auto', 'modal', 'batched', 'sparse')
+
+
+def assemble_ac_rhs(circuit):
+    """Complex excitation vector from the circuit's AC source phasors"""
+    rhs = np.zeros(circuit.size, dtype=complex)
+    for name, phasor in circuit.ac_phasors.items():
+        if name in circuit.vsources.index:
+            rhs[circuit.num_nodes + circuit.vsources.index[name]] += phasor
+        elif name in circuit.isources.index:
+            row = circuit.isources.index[name]
+            a, b = circuit.isources.a[row], circuit.isources.b[row]
+            if a >= 0:
+                rhs[a] -= phasor
+            if b >= 0:
+                rhs[b] += phasor
+    return rhs
+
+
+class ACSweep:
+    """Complex node voltages (or branch currents) of an AC sweep, one row per frequency"""
+
+    def __init__(self, frequencies, outputs, response):
+        self.frequencies = frequencies
+        self.outputs = outputs
+        self.response = response  # Shape (len(frequencies), len(outputs))
+        self._columns = {name: i for i, name in enumerate(outputs)}
+
+    def phasor(self, node):
+        return self.response[:, self._columns[str(node)]]
+
+    @property
+    def magnitude_db(self):
+        with np.errstate(divide='ignore'):
+            return 20.0 * np.log10(np.abs(self.response))
+
+    @property
+    def phase_deg(self):
+        return np.degrees(np.angle(self.response))
+
+    def bode(self, node, unwrap=True):
+        """Magnitude in dB and phase in degrees of one node across the sweep"""
+        phasor = self.phasor(node)
+        with np.errstate(divide='ignore'):
+            magnitude = 20.0 * np.log10(np.abs(phasor))
+        phase = np.angle(phasor)
+        if unwrap:
+            phase = np.unwrap(phase)
+        return magnitude, np.degrees(phase)
+
+
+def _gather(x, rows):
+    """Select output rows from solutions x (..., size), ground reads as zero"""
+    padded = np.concatenate([x, np.zeros(x.shape[:-1] + (1,), dtype=x.dtype)], axis=-1)
+    return padded[..., rows]
+
+
+def _modal_sweep(G, C, rhs, s):
+    """Solve every frequency at once through an eigendecomposition.
+
+    With a real shift s0, G + sC = A0 (I + (s - s0) M) where A0 = G + s0 C
+    and M = A0^-1 C = V diag(lam) V^-1, so each frequency only needs the
+    diagonal (1 + (s - s0) lam)^-1. Returns None when the decomposition is
+    not accurate enough (defective M, singular A0) so the caller can fall back.
+    """
+    positive = np.abs(s[s != 0])
+    s0 = float(np.exp(np.mean(np.log(positive)))) if len(positive) else 1.0
+    try:
+        lu = scipy.linalg.lu_factor(G + s0 * C, check_finite=False)
+        if np.any(np.diag(lu[0]) == 0):
+            return None
+        M = scipy.linalg.lu_solve(lu, C, check_finite=False)
+        y0 = scipy.linalg.lu_solve(lu, rhs, check_finite=False)
+        lam, V = scipy.linalg.eig(M, check_finite=False)
+        w = np.linalg.solve(V, y0)
+    except (np.linalg.LinAlgError, ValueError):
+        return None
+
+    def full_solution(index):
+        return V @ (w / (1.0 + (s[index] - s0) * lam))
+
+    # Spot check the residual at both ends and the middle of the sweep
+    scale = np.linalg.norm(rhs) or 1.0
+    for index in {0, len(s) // 2, len(s) - 1}:
+        x = full_solution(index)
+        residual = np.linalg.norm((G + s[index] * C) @ x - rhs) / scale
+        if not np.isfinite(residual) or residual > MODAL_TOLERANCE:
+            logger.debug(f"Modal AC sweep rejected (residual {residual:.2e})")
+            return None
+    return V, w, lam, s0
+
+
+def _batched_sweep(G, C, rhs, s, rows):
+    size = G.shape[0]
+    chunk = max(1, BATCH_BYTES // (16 * size * size))
+    response = np.empty((len(s), len(rows)), dtype=complex)
+    for start in range(0, len(s), chunk):
+        block = s[start:start + chunk]
+        A = G[None, :, :] + block[:, None, None] * C[None, :, :]
+        x = np.linalg.solve(A, np.broadcast_to(rhs, (len(block), size))[..., None])[..., 0]
+        response[start:start + chunk] = _gather(x, rows)
+    return response
+
+
+def _sparse_sweep(G, C, rhs, s, rows):
+    # Large systems: one sparse factorization per frequency
+    response = np.empty((len(s), len(rows)), dtype=complex)
+    G = G.astype(complex)
+    for i, si in enumerate(s):
+        try:
+            x = splu((G + si * C).tocsc()).solve(rhs)
+        except RuntimeError as e:
+            raise SingularCircuitError(f"AC matrix is singular at s={si} ({e})") from e
+        response[i] = _gather(x, rows)
+    return response
+
+
+def ac_sweep(circuit, frequencies, outputs=None, method='auto'):
+    """Small-signal sweep of the circuit's AC sources over frequencies in Hz.
+
+    method is 'modal' (eigendecomposition, all frequencies in one vectorized
+    evaluation), 'batched' (stacked dense solves), 'sparse' (one sparse LU per
+    point, for very large systems) or 'auto'.
+    """
+    if circuit.is_nonlinear:
+        raise ValueError("AC analysis of nonlinear devices is not supported")
+    if method not in AC_METHODS:
+        raise ValueError(f"Unknown AC sweep method: {method!r}")
+    frequencies = np.atleast_1d(np.asarray(frequencies, dtype=float))
+    if outputs is None:
+        outputs = list(circuit.nodes)
+    outputs = [str(name) for name in outputs]
+    rows = np.array([circuit.unknown_index(name) for name in outputs], dtype=np.int64)
+
+    G, _ = assemble_dc(circuit)
+    C = assemble_reactive(circuit)
+    rhs = assemble_ac_rhs(circuit)
+    s = 2j * np.pi * frequencies
+    size = circuit.size
+
+    if method == 'auto':
+        method = 'modal' if size <= DENSE_LIMIT else 'sparse'
+
+    if method == 'sparse':
+        response = _sparse_sweep(G, C, rhs, s, rows)
+    else:
+        G = G.toarray()
+        C = C.toarray()
+        modal = _modal_sweep(G, C, rhs, s) if method == 'modal' else None
+        if modal is not None:
+            V, w, lam, s0 = modal
+            # Row -1 (ground) reads the appended zero row
+            padded = np.vstack([V * w, np.zeros((1, size), dtype=complex)])
+            response = (1.0 / (1.0 + (s[:, None] - s0) * lam[None, :])) @ padded[rows].T
+        else:
+            if method == 'modal':
+                logger.info("Modal AC sweep not accurate for this circuit, using batched solves")
+            try:
+                response = _batched_sweep(G, C, rhs, s, rows)
+            except np.linalg.LinAlgError as e:
+                raise SingularCircuitError(f"AC matrix is singular for at least one frequency ({e})") from e
+
+    return ACSweep(frequencies, outputs, response)
@@ -0,0 +1,234 @@
+"""Block decomposition of MNA systems: independent subcircuits solved on their own"""
+import concurrent.futures
+import logging
+import os
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components, maximum_bipartite_matching
+from scipy.sparse.linalg import splu
+
+from .mna import DCSolution, SingularCircuitError, assemble_dc, parse_value, set_element_value
+
+logger = logging.getLogger(__name__)
+
+DENSE_BLOCK = 32  # Largest block solved as part of a batched dense stack rather than by sparse LU
+
+
+def unknown_names(circuit):
+    """Name of every MNA unknown: node names, then branch elements in row order"""
+    names = list(circuit.nodes)
+    names += circuit.vsources.names + circuit.inductors.names
+    for table in (circuit.vcvs, circuit.ccvs, circuit.transformers):
+        names += table.names
+    return names
+
+
+class BlockStructure:
+    """Block lower triangular ordering of a sparse matrix.
+
+    rows[k] and columns[k] are the equation and unknown placed at position
+    k, so that matrix[rows][:, columns] is block lower triangular with a
+    zero-free diagonal. Blocks are (start, stop) position ranges, sorted by
+    level: a block only depends on unknowns of blocks with a lower level, so
+    blocks of one level are independent of each other. Within a level,
+    blocks are sorted by size. components counts the groups of unknowns that
+    share no equation at all (subcircuits connected only through ground).
+    """
+
+    def __init__(self, rows, columns, starts, sizes, levels, components):
+        self.rows = rows
+        self.columns = columns
+        self.starts = starts
+        self.sizes = sizes
+        self.levels = levels
+        self.components = components
+
+    def __len__(self):
+        return len(self.sizes)
+
+    @property
+    def depth(self):
+        return int(self.levels.max()) + 1 if len(self.levels) else 0
+
+
+def block_structure(matrix, names=None):
+    """Decompose a square sparse matrix into independent and triangular blocks.
+
+    A maximum transversal moves an entry onto every diagonal position; the
+    strongly connected components of the result are the irreducible blocks
+    (Dulmage-Mendelsohn). Structurally symmetric parts, such as networks of
+    resistors and sources, give one block per connected subcircuit;
+    controlled sources that only feed forward split further into a chain of
+    blocks. names (one per unknown) are used in the error raised when the
+    matrix is structurally singular.
+    """
+    # Explicit zeros are kept: the blocks then follow the topology, whatever the values
+    pattern = sp.csr_matrix(matrix)
+    size = pattern.shape[0]
+    if size == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return BlockStructure(empty, empty, empty, empty, empty, 0)
+    match = maximum_bipartite_matching(pattern, perm_type='column')
+    if np.any(match < 0):
+        unmatched = np.setdiff1d(np.arange(size), match[match >= 0])
+        where = ', '.join(str(names[i]) if names is not None else str(i) for i in unmatched[:5])
+        raise SingularCircuitError(
+            f"MNA matrix is structurally singular at {where}; check for floating nodes or voltage source loops")
+    components = connected_components(pattern, directed=False)[0]
+
+    # Equation i owns unknown match[i]; it depends on the equations owning its other unknowns
+    owned = pattern[:, match].tocoo()
+    count, labels = connected_components(owned, directed=True, connection='strong')
+    coupled = labels[owned.row] != labels[owned.col]
+    dependent, dependency = labels[owned.row[coupled]], labels[owned.col[coupled]]
+    # Longest path from a block without dependencies, relaxed once per level of the chain
+    levels = np.zeros(count, dtype=np.int64)
+    while len(dependent):
+        deeper = levels.copy()
+        np.maximum.at(deeper, dependent, levels[dependency] + 1)
+        if np.array_equal(deeper, levels):
+            break
+        levels = deeper
+
+    sizes = np.bincount(labels, minlength=count)
+    block_order = np.lexsort((np.arange(count), sizes, levels))
+    rank = np.empty(count, dtype=np.int64)
+    rank[block_order] = np.arange(count)
+    rows = np.argsort(rank[labels], kind='stable')
+    sizes = sizes[block_order]
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    return BlockStructure(rows, match[rows], starts, sizes, levels[block_order], components)
+
+
+def _dense_stack(permuted, first, count, size):
+    """count adjacent diagonal blocks of equal size, starting at position first, as one array"""
+    part = permuted[first:first + count * size, first:first + count * size].tocoo()
+    stack = np.zeros((count, size, size))
+    block = part.row // size
+    inside = block == part.col // size
+    stack[block[inside], part.row[inside] % size, part.col[inside] % size] = part.data[inside]
+    return stack
+
+
+class BlockSolver:
+    """DC solver for circuits made of independent or one-way coupled parts.
+
+    The MNA system is split with block_structure(); blocks up to dense_block
+    unknowns are grouped by size and solved as batched dense stacks, larger
+    ones get their own sparse LU. Blocks of one level do not depend on each
+    other and are spread over a thread pool of workers threads (all cores by
+    default). The decomposition is kept until elements or nodes are added;
+    value edits refactor the blocks but reuse it, and source edits only
+    re-solve.
+    """
+
+    def __init__(self, circuit, workers=None, dense_block=DENSE_BLOCK):
+        self.circuit = circuit
+        self.workers = workers or os.cpu_count() or 1
+        self.dense_block = dense_block
+        self.structure = None
+        self.matrix = None
+        self.rhs = None
+        self._structure = None
+        self._data = None  # Matrix entries of the current factorization
+        self._tasks = None  # Per level: [(start, stop, dense stack or None for a sparse LU)]
+        self._coupling = None  # Per level: its rows of the permuted matrix (None for level 0)
+        self._lus = {}  # Start position -> SuperLU of each sparse block
+
+    def _structure_key(self):
+        return self.circuit.structure_key()
+
+    def factorize(self):
+        if self.circuit.is_nonlinear:
+            raise ValueError("Circuit has nonlinear devices; use nonlinear.NewtonSolver")
+        matrix, self.rhs = assemble_dc(self.circuit)
+        if self.structure is None or self._structure != self._structure_key():
+            self.structure = block_structure(matrix, unknown_names(self.circuit))
+            self._structure = self._structure_key()
+            logger.debug(f"Split {matrix.shape[0]} unknowns into {len(self.structure)} blocks on "
+                         f"{self.structure.depth} levels ({self.structure.components} subcircuits)")
+        self.matrix = matrix
+        self._data = matrix.data.copy()
+        structure = self.structure
+        permuted = matrix.tocsr()[structure.rows][:, structure.columns].tocsr()
+
+        self._tasks = []
+        self._coupling = []
+        self._lus = {}
+        sparse = []
+        for level in range(structure.depth):
+            blocks = np.flatnonzero(structure.levels == level)
+            start = structure.starts[blocks[0]]
+            stop = structure.starts[blocks[-1]] + structure.sizes[blocks[-1]]
+            self._coupling.append(permuted[start:stop] if level else None)
+            tasks = []
+            sizes = structure.sizes[blocks]
+            for size in np.unique(sizes):
+                group = blocks[sizes == size]
+                first = structure.starts[group[0]]
+                if size <= self.dense_block:
+                    # Same-size blocks of a level are adjacent: one stack, one batched solve
+                    stack = _dense_stack(permuted, first, len(group), size)
+                    tasks.append((first, first + len(group) * size, stack))
+                else:
+                    tasks += [(structure.starts[b], structure.starts[b] + size, None) for b in group]
+            sparse += [task for task in tasks if task[2] is None]
+            self._tasks.append(tasks)
+        self._run(self._factor_block, sparse, permuted)
+
+    def _factor_block(self, task, permuted):
+        start, stop, _ = task
+        try:
+            self._lus[start] = splu(permuted[start:stop, start:stop].tocsc())
+        except RuntimeError as e:
+            raise SingularCircuitError(
+                f"MNA matrix is singular ({e}); check for floating nodes or voltage source loops") from e
+
+    def _solve_block(self, task, y):
+        start, stop, stack = task
+        if stack is None:
+            y[start:stop] = self._lus[start].solve(y[start:stop])
+            return
+        try:
+            y[start:stop] = np.linalg.solve(stack, y[start:stop].reshape(len(stack), -1, 1)).ravel()
+        except np.linalg.LinAlgError as e:
+            raise SingularCircuitError(
+                f"MNA matrix is singular ({e}); check for floating nodes or voltage source loops") from e
+
+    def _run(self, function, tasks, argument):
+        if self.workers == 1 or len(tasks) < 2:
+            for task in tasks:
+                function(task, argument)
+            return
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(self.workers, len(tasks))) as executor:
+            # list() re-raises the first error of any block
+            list(executor.map(lambda task: function(task, argument), tasks))
+
+    def set_value(self, name, value):
+        """Change the value of an existing element; the decomposition is kept"""
+        set_element_value(self.circuit, name, parse_value(value))
+
+    def solve(self):
+        if self.matrix is None or self._structure != self._structure_key():
+            self.factorize()
+        else:
+            matrix, rhs = assemble_dc(self.circuit)
+            if np.array_equal(matrix.data, self._data):
+                self.rhs = rhs
+            else:
+                self.factorize()
+        structure = self.structure
+        y = self.rhs[structure.rows]
+        solved = np.zeros_like(y)  # Unknowns of the levels solved so far, zero elsewhere
+        for coupling, tasks in zip(self._coupling, self._tasks):
+            start, stop = tasks[0][0], tasks[-1][1]
+            if coupling is not None:
+                y[start:stop] -= coupling @ solved
+            self._run(self._solve_block, tasks, y)
+            solved[start:stop] = y[start:stop]
+        x = np.empty_like(y)
+        x[structure.columns] = y
+        if not np.all(np.isfinite(x)):
+            raise SingularCircuitError("MNA solve produced non-finite values")
+        return DCSolution(self.circuit, x)
@@ -0,0 +1,267 @@
+"""Net connectivity from pin and wire endpoint coordinates"""
+import itertools
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Net:
+    """Electrically connected set of pins"""
+
+    __slots__ = ('id', 'name', 'pins')
+
+    def __init__(self, net_id, name=None, pins=None):
+        self.id = net_id
+        self.name = name
+        self.pins = pins if pins is not None else []  # (component id, pin name) pairs
+
+    def __repr__(self):
+        return f"Net({self.id}, {self.name!r}, {len(self.pins)} pins)"
+
+
+class UnionFind:
+    """Disjoint sets over hashable keys (union by size, path halving)"""
+
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    def add(self, key):
+        if key not in self.parent:
+            self.parent[key] = key
+            self.size[key] = 1
+
+    def find(self, key):
+        parent = self.parent
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    def union(self, a, b):
+        a = self.find(a)
+        b = self.find(b)
+        if a == b:
+            return a
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        return a
+
+    def groups(self):
+        groups = {}
+        for key in self.parent:
+            groups.setdefault(self.find(key), []).append(key)
+        return list(groups.values())
+
+
+class Connectivity:
+    """Incremental net extraction over a hashed coordinate grid.
+
+    Points (pin connection points and wire endpoints) are hashed by their
+    coordinates rounded to the tolerance, so points on the same snapped
+    position share a cell. Points sharing a cell and the two ends of every
+    wire are merged with a union-find. Adding, moving or removing a
+    point only marks its net dirty; the next query re-runs the union-find
+    over the dirty nets and whatever they now touch, so an edit costs time
+    proportional to the nets involved and a full extraction is linear in
+    the number of points.
+
+    Pin keys are (component id, pin name) pairs and wire endpoint keys are
+    ('wire', wire id, 0 or 1). Only endpoints connect: a pin touching the
+    middle of a wire is not joined to it.
+    """
+
+    def __init__(self, tolerance=0.5):
+        self.tolerance = float(tolerance)
+        self.points = {}  # key -> (x, y)
+        self.cells = {}  # (column, row) -> set of keys
+        self.links = {}  # key -> keys joined regardless of position (wire ends)
+        self.net_of = {}  # key -> net id, for resolved keys
+        self.members = {}  # net id -> set of keys
+        self._dirty = set()  # Keys whose net has to be resolved again
+        self._net_ids = itertools.count(1)
+
+    def _cell(self, x, y):
+        return (round(x / self.tolerance), round(y / self.tolerance))
+
+    def _neighbors(self, key):
+        """Keys sharing the cell of key plus keys linked to it"""
+        neighbors = list(self.cells[self._cell(*self.points[key])])
+        neighbors.extend(self.links.get(key, ()))
+        return neighbors
+
+    def _detach(self, key):
+        """Dissolve the net of key; all of its members are resolved again"""
+        net_id = self.net_of.get(key)
+        if net_id is None:
+            return ()
+        members = self.members.pop(net_id)
+        for member in members:
+            del self.net_of[member]
+        self._dirty |= members
+        return members
+
+    def _unhash(self, key):
+        cell = self._cell(*self.points[key])
+        keys = self.cells[cell]
+        keys.discard(key)
+        if not keys:
+            del self.cells[cell]
+
+    def add_point(self, key, x, y):
+        if key in self.points:
+            self.move_point(key, x, y)
+            return
+        self.points[key] = (x, y)
+        self.cells.setdefault(self._cell(x, y), set()).add(key)
+        self._dirty.add(key)
+
+    def add_points(self, points):
+        """Add many (key, x, y) points; the bulk form of add_point used when loading"""
+        tolerance = self.tolerance
+        known = self.points
+        cells = self.cells
+        dirty = self._dirty
+        for key, x, y in points:
+            if key in known:
+                self.move_point(key, x, y)
+                continue
+            known[key] = (x, y)
+            cell = (round(x / tolerance), round(y / tolerance))
+            keys = cells.get(cell)
+            if keys is None:
+                cells[cell] = {key}
+            else:
+                keys.add(key)
+            dirty.add(key)
+
+    def move_point(self, key, x, y):
+        if self.points[key] == (x, y):
+            return
+        self._detach(key)
+        self._unhash(key)
+        self.points[key] = (x, y)
+        self.cells.setdefault(self._cell(x, y), set()).add(key)
+        self._dirty.add(key)
+
+    def remove_point(self, key):
+        if key not in self.points:
+            return
+        self._detach(key)
+        self._unhash(key)
+        del self.points[key]
+        for other in self.links.pop(key, ()):
+            self.links[other].discard(key)
+        self._dirty.discard(key)
+
+    def link(self, a, b):
+        self.links.setdefault(a, set()).add(b)
+        self.links.setdefault(b, set()).add(a)
+        self._dirty.update((a, b))
+
+    def refresh(self):
+        """Resolve the nets of every dirty key"""
+        if not self._dirty:
+            return
+        region = set()
+        stack = [key for key in self._dirty if key in self.points]
+        region.update(stack)
+        if not self.net_of:
+            stack = []  # Full extraction, there are no existing nets to merge
+        while stack:
+            key = stack.pop()
+            for other in self._neighbors(key):
+                if other in region:
+                    continue
+                if other in self.net_of:
+                    # An existing net now touches the region and gets merged
+                    region |= self._detach(other)
+                else:
+                    region.add(other)
+                    stack.append(other)
+        self._dirty.clear()
+
+        # Keys sharing a cell are connected anyway, so the union-find runs
+        # over cells and only wire links cause unions
+        points = self.points
+        union_find = UnionFind()
+        cell_of = {}
+        for key in region:
+            cell = self._cell(*points[key])
+            cell_of[key] = cell
+            union_find.add(cell)
+        for key in region:
+            for other in self.links.get(key, ()):
+                union_find.union(cell_of[key], cell_of[other])
+        for group in union_find.groups():
+            net_id = next(self._net_ids)
+            members = set().union(*(self.cells[cell] for cell in group))
+            self.members[net_id] = members
+            for key in members:
+                self.net_of[key] = net_id
+        logger.debug(f"Resolved {len(region)} points into nets")
+
+    def rebuild(self):
+        """Throw away every net and extract them all again"""
+        self.net_of.clear()
+        self.members.clear()
+        self._dirty = set(self.points)
+        self.refresh()
+
+    def net(self, key):
+        self.refresh()
+        return self.net_of.get(key)
+
+    def nets(self):
+        """Net objects of every net with at least one pin, pins sorted"""
+        self.refresh()
+        nets = []
+        for net_id, members in self.members.items():
+            pins = sorted((key for key in members if len(key) == 2), key=repr)
+            if pins:
+                nets.append(Net(net_id, pins=pins))
+        return nets
+
+    def clear(self):
+        self.points.clear()
+        self.cells.clear()
+        self.links.clear()
+        self.net_of.clear()
+        self.members.clear()
+        self._dirty.clear()
+
+    # Schematic objects
+
+    def add_component(self, component):
+        for name, (x, y) in component.pin_positions().items():
+            self.add_point((component.id, name), x, y)
+
+    def move_component(self, component):
+        for name, (x, y) in component.pin_positions().items():
+            self.move_point((component.id, name), x, y)
+
+    def remove_component(self, component):
+        for pin in component.pins:
+            self.remove_point((component.id, pin.name))
+
+    def add_components(self, components):
+        """add_component for many components at once"""
+        points = []
+        for component in components:
+            x, y = component.origin
+            for pin in component.pins:
+                points.append(((component.id, pin.name), x + pin.offset[0], y + pin.offset[1]))
+        self.add_points(points)
+
+    def add_wire(self, wire_id, x1, y1, x2, y2):
+        start = ('wire', wire_id, 0)
+        end = ('wire', wire_id, 1)
+        self.add_point(start, x1, y1)
+        self.add_point(end, x2, y2)
+        self.link(start, end)
+
+    def remove_wire(self, wire_id):
+        self.remove_point(('wire', wire_id, 0))
+        self.remove_point(('wire', wire_id, 1))
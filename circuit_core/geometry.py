@@ -0,0 +1,115 @@
+"""Struct-of-arrays symbol geometry"""
+import math
+import sys
+
+import numpy as np
+
+
+def _layer_id(layer):
+    # Eagle layers are numbered, so the number itself is a stable interned id
+    return int(layer)
+
+
+def _array(rows, width):
+    return np.array(rows, dtype=float).reshape(-1, width)
+
+
+class SymbolGeometry:
+    """Drawing primitives of one library symbol, one NumPy array per kind.
+
+    Coordinates are in Eagle units (mm). Layers are stored as int16 layer
+    numbers and strings (text contents, pin names/directions) are interned,
+    so symbols of a large library share them.
+    """
+
+    __slots__ = (
+        'wires', 'wire_layers',  # (n, 4) x1, y1, x2, y2
+        'circles', 'circle_layers',  # (n, 3) x, y, radius
+        'arcs', 'arc_layers',  # (n, 5) x1, y1, x2, y2, curve
+        'texts', 'text_layers', 'text_contents',  # (n, 3) x, y, size
+        'pins', 'pin_layers', 'pin_directions', 'pin_names',  # (n, 3) x, y, length
+    )
+
+    def __init__(self, wires=(), circles=(), arcs=(), texts=(), pins=()):
+        self.wires = _array([w[:4] for w in wires], 4)
+        self.wire_layers = np.array([_layer_id(w[4]) for w in wires], dtype=np.int16)
+        self.circles = _array([c[:3] for c in circles], 3)
+        self.circle_layers = np.array([_layer_id(c[3]) for c in circles], dtype=np.int16)
+        self.arcs = _array([a[:5] for a in arcs], 5)
+        self.arc_layers = np.array([_layer_id(a[5]) for a in arcs], dtype=np.int16)
+        self.texts = _array([t[:3] for t in texts], 3)
+        self.text_contents = [sys.intern(t[3]) for t in texts]
+        self.text_layers = np.array([_layer_id(t[4]) for t in texts], dtype=np.int16)
+        self.pins = _array([p[:3] for p in pins], 3)
+        self.pin_directions = [sys.intern(str(p[3])) for p in pins]
+        self.pin_names = [sys.intern(str(p[4])) for p in pins]
+        self.pin_layers = np.array([_layer_id(p[5]) for p in pins], dtype=np.int16)
+
+    @classmethod
+    def from_elements(cls, elements):
+        """Build from legacy ('wire', ...), ('circle', ...) ... tuples"""
+        kinds = {'wire': [], 'circle': [], 'arc': [], 'text': [], 'pin': []}
+        for element in elements:
+            kinds[element[0]].append(element[1:])
+        return cls(kinds['wire'], kinds['circle'], kinds['arc'], kinds['text'], kinds['pin'])
+
+    def elements(self):
+        """Yield the legacy drawing tuples (wires, circles, arcs, texts, pins)"""
+        for (x1, y1, x2, y2), layer in zip(self.wires.tolist(), self.wire_layers.tolist()):
+            yield ('wire', x1, y1, x2, y2, str(layer))
+        for (x, y, radius), layer in zip(self.circles.tolist(), self.circle_layers.tolist()):
+            yield ('circle', x, y, radius, str(layer))
+        for (x1, y1, x2, y2, curve), layer in zip(self.arcs.tolist(), self.arc_layers.tolist()):
+            yield ('arc', x1, y1, x2, y2, curve, str(layer))
+        for (x, y, size), content, layer in zip(self.texts.tolist(), self.text_contents,
+                                                self.text_layers.tolist()):
+            yield ('text', x, y, size, content, str(layer))
+        for (x, y, length), direction, name, layer in zip(self.pins.tolist(), self.pin_directions,
+                                                          self.pin_names, self.pin_layers.tolist()):
+            yield ('pin', x, y, length, direction, name, str(layer))
+
+    def __iter__(self):
+        return self.elements()
+
+    def __eq__(self, other):
+        if not isinstance(other, SymbolGeometry):
+            return NotImplemented
+        return list(self.elements()) == list(other.elements())
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def bounds(self):
+        """(xmin, ymin, xmax, ymax) of wires, circles and pin points"""
+        xs = [self.wires[:, 0::2].ravel(), self.pins[:, 0]]
+        ys = [self.wires[:, 1::2].ravel(), self.pins[:, 1]]
+        if len(self.circles):
+            r = self.circles[:, 2]
+            xs += [self.circles[:, 0] - r, self.circles[:, 0] + r]
+            ys += [self.circles[:, 1] - r, self.circles[:, 1] + r]
+        xs = np.concatenate(xs)
+        ys = np.concatenate(ys)
+        if not len(xs):
+            return (0.0, 0.0, 0.0, 0.0)
+        return (float(xs.min()), float(ys.min()), float(xs.max()), float(ys.max()))
+
+
+def transform_points(points, rotation=0, scale=1.0, offset_x=0.0, offset_y=0.0):
+    """Rotate (degrees), scale and offset an (n, 2) array of Eagle points.
+
+    The y axis is flipped because Eagle's y grows upwards and the canvas'
+    grows downwards.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    if rotation:
+        angle = math.radians(rotation)
+        cos_a, sin_a = math.cos(angle), math.sin(angle)
+        points = points @ np.array([[cos_a, sin_a], [-sin_a, cos_a]])
+    result = np.empty_like(points)
+    result[:, 0] = points[:, 0] * scale + offset_x
+    result[:, 1] = -points[:, 1] * scale + offset_y
+    return result
@@ -0,0 +1,201 @@
+"""Undo/redo as a log of commands"""
+import collections
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command:
+    """One undoable edit, recorded after it has been applied.
+
+    Commands call an editor to change the drawing. The editor provides
+    insert_items(components, wires), delete_items(components, wires),
+    translate_components(components, dx, dy) and
+    edit_component(component, attribute, value); SchematicEditor is the
+    headless one and the GUI implements the same methods for the canvas.
+    """
+
+    __slots__ = ()
+
+    def undo(self, editor):
+        raise NotImplementedError
+
+    def redo(self, editor):
+        raise NotImplementedError
+
+    def merge(self, command):
+        """Fold a following command into this one; returns whether it did"""
+        return False
+
+
+class AddItems(Command):
+    """Components and wires that were placed"""
+
+    __slots__ = ('components', 'wires')
+
+    def __init__(self, components=(), wires=()):
+        self.components = tuple(components)
+        self.wires = tuple(wires)
+
+    def undo(self, editor):
+        editor.delete_items(self.components, self.wires)
+
+    def redo(self, editor):
+        editor.insert_items(self.components, self.wires)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({len(self.components)} components, {len(self.wires)} wires)"
+
+
+class RemoveItems(AddItems):
+    """Components and wires that were deleted"""
+
+    __slots__ = ()
+
+    def undo(self, editor):
+        editor.insert_items(self.components, self.wires)
+
+    def redo(self, editor):
+        editor.delete_items(self.components, self.wires)
+
+
+class MoveComponents(Command):
+    """Components moved by (dx, dy); consecutive moves of the same parts merge"""
+
+    __slots__ = ('components', 'dx', 'dy')
+
+    def __init__(self, components, dx, dy):
+        self.components = tuple(components)
+        self.dx = dx
+        self.dy = dy
+
+    def undo(self, editor):
+        editor.translate_components(self.components, -self.dx, -self.dy)
+
+    def redo(self, editor):
+        editor.translate_components(self.components, self.dx, self.dy)
+
+    def merge(self, command):
+        if not isinstance(command, MoveComponents):
+            return False
+        if [c.id for c in command.components] != [c.id for c in self.components]:
+            return False
+        self.dx += command.dx
+        self.dy += command.dy
+        return True
+
+    def __repr__(self):
+        return f"MoveComponents({len(self.components)} components, {self.dx}, {self.dy})"
+
+
+class EditComponent(Command):
+    """A component attribute changed from old to new"""
+
+    __slots__ = ('component', 'attribute', 'old', 'new')
+
+    def __init__(self, component, attribute, old, new):
+        self.component = component
+        self.attribute = attribute
+        self.old = old
+        self.new = new
+
+    def undo(self, editor):
+        editor.edit_component(self.component, self.attribute, self.old)
+
+    def redo(self, editor):
+        editor.edit_component(self.component, self.attribute, self.new)
+
+    def __repr__(self):
+        return f"EditComponent({self.component.name_text!r}, {self.attribute!r}, {self.old!r} -> {self.new!r})"
+
+
+class History:
+    """Undo and redo stacks of commands.
+
+    Commands keep references to the Component and Wire objects they touched
+    rather than copies of the schematic, so a step costs memory in
+    proportion to the change and a deep history of a large drawing stays
+    small. A command that merges into the previous one (the deltas of a
+    drag) extends it instead of adding a step, until seal() is called.
+    """
+
+    def __init__(self, limit=1000):
+        self.undo_stack = collections.deque(maxlen=limit)
+        self.redo_stack = []
+        self._open = False  # Whether the last step may still absorb commands
+
+    def record(self, command):
+        """Add a command that has already been applied"""
+        self.redo_stack.clear()
+        if self._open and self.undo_stack and self.undo_stack[-1].merge(command):
+            return
+        self.undo_stack.append(command)
+        self._open = True
+
+    def seal(self):
+        """End the current step; the next command starts a new one"""
+        self._open = False
+
+    def undo(self, editor):
+        """Revert the last step; returns its command, or None if there is none"""
+        if not self.undo_stack:
+            return None
+        command = self.undo_stack.pop()
+        command.undo(editor)
+        self.redo_stack.append(command)
+        self._open = False
+        logger.debug(f"Undo {command!r}")
+        return command
+
+    def redo(self, editor):
+        if not self.redo_stack:
+            return None
+        command = self.redo_stack.pop()
+        command.redo(editor)
+        self.undo_stack.append(command)
+        self._open = False
+        logger.debug(f"Redo {command!r}")
+        return command
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self._open = False
+
+    @property
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    @property
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+
+class SchematicEditor:
+    """Applies commands to a bare Schematic, without a canvas"""
+
+    def __init__(self, schematic):
+        self.schematic = schematic
+        self._bounds = {}  # Component id -> bounding box while it is deleted
+
+    def insert_items(self, components, wires):
+        for component in components:
+            self.schematic.insert(component, self._bounds.pop(component.id, None))
+        for wire in wires:
+            self.schematic.insert_wire(wire)
+
+    def delete_items(self, components, wires):
+        for component in components:
+            bounds = self.schematic.index.boxes.get(component.id)
+            if bounds is not None:
+                self._bounds[component.id] = bounds
+            self.schematic.remove(component)
+        for wire in wires:
+            self.schematic.remove_wire(wire)
+
+    def translate_components(self, components, dx, dy):
+        for component in components:
+            self.schematic.move(component, dx, dy)
+
+    def edit_component(self, component, attribute, value):
+        setattr(component, attribute, value)
@@ -0,0 +1,434 @@
+"""Eagle .lbr symbol library parser (no GUI dependencies)"""
+import hashlib
+import html
+import logging
+import os
+import pickle
+import re
+import xml.etree.ElementTree as ET
+from collections.abc import Mapping
+
+from .geometry import SymbolGeometry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIBRARY = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'eagle_libraries', 'ngspice-simulation.lbr'
+)
+
+# Bump whenever parse_symbol output changes so stale caches are rebuilt
+CACHE_VERSION = 3
+
+_SYMBOL_START = re.compile(rb'<symbol\s[^>]*?name="([^"]*)"')
+
+# Convert Eagle pin lengths to numeric values
+PIN_LENGTHS = {
+    'short': 2.54,
+    'middle': 5.08,
+    'long': 7.62,
+    'point': 0
+}
+
+# Hand-tuned drawings that replace the library geometry of some symbols
+SYMBOL_OVERRIDES = {
+    'C': [
+        # Main capacitor plates (vertical lines)
+        ('wire', -1.27, -2, -1.27, 0, "94"),  # Left plate (vertical)
+        ('wire', 1.27, 0, 1.27, 2, "94"),     # Right plate (vertical)
+        # Connection pins
+        ('pin', -5.08, 0, 3, "R", "1", "91"),  # Left pin
+        ('pin', 5.08, 0, 3, "L", "2", "91"),   # Right pin
+        # Value and name labels
+        ('text', 0, -3.81, 1.27, '>VALUE', "96"),  # Value above
+        ('text', 0, 2.54, 1.27, '>NAME', "95"),    # Name below
+    ],
+    'AMMETER': [
+        # Circle
+        ('circle', 0, 0, 2.54, "94"),  # Main circle
+        # Arrow
+        ('wire', 0, -1.27, 0, 1.27, "94"),    # Vertical line
+        ('wire', -0.635, 0.635, 0, 1.27, "94"),  # Left diagonal
+        ('wire', 0.635, 0.635, 0, 1.27, "94"),   # Right diagonal
+        # Pins
+        ('pin', 0, -2.54, 2, "D", "1", "91"),  # Top pin
+        ('pin', 0, 2.54, 2, "U", "2", "91"),   # Bottom pin
+        # Labels with adjusted positions
+        ('text', 3.81, 0, 1.27, '>NAME', "95"),    # Name to the right
+        ('text', 3.81, 2.54, 1.27, '>VALUE', "96")  # Value above name
+    ],
+}
+
+
+def parse_symbol(symbol):
+    """Convert one <symbol> element into a SymbolGeometry"""
+    symbol_data = []
+
+    # Parse wires (lines)
+    for wire in symbol.findall("wire"):
+        x1 = float(wire.get('x1', '0'))
+        y1 = float(wire.get('y1', '0'))
+        x2 = float(wire.get('x2', '0'))
+        y2 = float(wire.get('y2', '0'))
+        layer = wire.get('layer', '94')
+        symbol_data.append(('wire', x1, y1, x2, y2, layer))
+
+    # Parse circles
+    for circle in symbol.findall("circle"):
+        x = float(circle.get('x', '0'))
+        y = float(circle.get('y', '0'))
+        radius = float(circle.get('radius', '1'))
+        layer = circle.get('layer', '94')
+        symbol_data.append(('circle', x, y, radius, layer))
+
+    # Parse arcs
+    for arc in symbol.findall("arc"):
+        x1 = float(arc.get('x1', '0'))
+        y1 = float(arc.get('y1', '0'))
+        x2 = float(arc.get('x2', '0'))
+        y2 = float(arc.get('y2', '0'))
+        curve = float(arc.get('curve', '90'))
+        layer = arc.get('layer', '94')
+        symbol_data.append(('arc', x1, y1, x2, y2, curve, layer))
+
+    # Parse text
+    for text in symbol.findall("text"):
+        x = float(text.get('x', '0'))
+        y = float(text.get('y', '0'))
+        size = float(text.get('size', '1'))
+        layer = text.get('layer', '95')
+        content = text.text or ''
+        symbol_data.append(('text', x, y, size, content, layer))
+
+    # Parse pins with safe length handling
+    for pin in symbol.findall("pin"):
+        x = float(pin.get('x', '0'))
+        y = float(pin.get('y', '0'))
+        length = PIN_LENGTHS.get(pin.get('length', 'short'), 2.54)
+        direction = pin.get('direction', 'io')
+        name = pin.get('name', '')
+        layer = "91"  # Standard pin layer
+        symbol_data.append(('pin', x, y, length, direction, name, layer))
+
+    symbol_data = SYMBOL_OVERRIDES.get(symbol.get('name'), symbol_data)
+    return SymbolGeometry.from_elements(symbol_data)
+
+
+def parse_library(filename):
+    """Parse every symbol of an Eagle library into {name: SymbolGeometry}"""
+    root = ET.parse(filename).getroot()
+    symbols = {}
+    for symbol in root.findall(".//symbols/symbol"):
+        symbols[symbol.get('name')] = parse_symbol(symbol)
+    logger.info(f"Loaded {len(symbols)} symbols from library")
+    return symbols
+
+
+SPICE_ATTRIBUTES = ('VALUE', 'SPICEMODEL', 'SPICEEXTRA', 'SPICEGROUND', 'VNAME')
+
+
+class SpiceDevice:
+    """SPICE data of one Eagle deviceset: prefix, pin order, attributes and model"""
+
+    __slots__ = ('name', 'symbol', 'prefix', 'pins', 'attributes', 'model_name', 'model')
+
+    def __init__(self, name, symbol, prefix, pins, attributes, model_name=None, model=None):
+        self.name = name  # Deviceset name, e.g. 'BJT_NPN'
+        self.symbol = symbol  # Symbol of its (first) gate, e.g. 'BJT-NPN'
+        self.prefix = prefix  # SPICE element letter, e.g. 'Q'
+        self.pins = pins  # Pin names in SPICE node order
+        self.attributes = attributes  # Default VALUE, SPICEMODEL, SPICEEXTRA, ...
+        self.model_name = model_name
+        self.model = model  # .MODEL/.SUBCKT text shipped with the library
+
+    @property
+    def is_ground(self):
+        return 'SPICEGROUND' in self.attributes
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def __repr__(self):
+        return f"SpiceDevice({self.name!r}, {self.prefix!r}, {self.pins})"
+
+
+def parse_device(deviceset):
+    """Convert one <deviceset> element into a SpiceDevice"""
+    gate = deviceset.find("gates/gate")
+    symbol = gate.get('symbol') if gate is not None else None
+
+    attributes = {}
+    for attribute in deviceset.iter("attribute"):
+        name = attribute.get('name', '').upper()
+        if name in SPICE_ATTRIBUTES and name not in attributes:
+            attributes[name] = attribute.get('value', '')
+
+    pinmapping = deviceset.find("spice/pinmapping")
+    prefix = deviceset.get('prefix', '')
+    pins = []
+    if pinmapping is not None:
+        prefix = pinmapping.get('spiceprefix', prefix)
+        pinmaps = sorted(pinmapping.findall("pinmap"), key=lambda pinmap: int(pinmap.get('pinorder', '0')))
+        pins = [pinmap.get('pin') for pinmap in pinmaps]
+
+    model_name = model = None
+    model_element = deviceset.find("spice/model")
+    if model_element is not None:
+        model_name = model_element.get('name')
+        model = (model_element.text or '').strip()
+        # Eagle fills >SPICEMODEL with the library model unless the part overrides it
+        attributes.setdefault('SPICEMODEL', model_name)
+    return SpiceDevice(deviceset.get('name'), symbol, prefix, pins, attributes, model_name, model)
+
+
+def parse_devices(filename):
+    """Parse the SPICE data of every deviceset into {deviceset name: SpiceDevice}"""
+    root = ET.parse(filename).getroot()
+    devices = {}
+    for deviceset in root.findall(".//devicesets/deviceset"):
+        devices[deviceset.get('name')] = parse_device(deviceset)
+    logger.info(f"Loaded {len(devices)} SPICE devices from library")
+    return devices
+
+
+def cache_path(filename, cache_dir=None, kind='symbols'):
+    """Location of a compiled artifact for a library (__pycache__ next to it by default)"""
+    filename = os.path.abspath(filename)
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(filename), '__pycache__')
+    return os.path.join(cache_dir, f"{os.path.basename(filename)}.{kind}.pickle")
+
+
+def _file_digest(filename):
+    digest = hashlib.sha1()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_cache(path):
+    try:
+        with open(path, 'rb') as f:
+            cached = pickle.load(f)
+    except (OSError, pickle.PickleError, EOFError, AttributeError, ImportError):
+        return None
+    if not isinstance(cached, dict) or cached.get('version') != CACHE_VERSION:
+        return None
+    return cached
+
+
+def _write_cache(path, entry):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        # Atomic rename so concurrent workers never read a partial file
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.debug(f"Could not write library cache {path}: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def _cached(filename, kind, builder, cache_dir=None, refresh=False):
+    """Return builder(filename), cached on disk and keyed by mtime, size and SHA-1.
+
+    An unchanged mtime/size pair is trusted without reading the .lbr at all.
+    When only the mtime changed (touch, checkout) the content hash decides
+    whether the cached data is still valid. refresh rebuilds and rewrites
+    the entry regardless, for data found to be stale.
+    """
+    stat = os.stat(filename)
+    path = cache_path(filename, cache_dir, kind)
+    cached = None if refresh else _read_cache(path)
+    if cached is not None and cached['size'] == stat.st_size:
+        if cached['mtime_ns'] == stat.st_mtime_ns:
+            logger.debug(f"Library cache hit: {path}")
+            return cached['data']
+        digest = _file_digest(filename)
+        if cached['sha1'] == digest:
+            cached['mtime_ns'] = stat.st_mtime_ns
+            _write_cache(path, cached)
+            return cached['data']
+    else:
+        digest = _file_digest(filename)
+
+    data = builder(filename)
+    _write_cache(path, {
+        'version': CACHE_VERSION,
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha1': digest,
+        'data': data,
+    })
+    return data
+
+
+def load_library(filename, cache_dir=None):
+    """parse_library() backed by the on-disk cache"""
+    return _cached(filename, 'symbols', parse_library, cache_dir)
+
+
+def load_devices(filename, cache_dir=None):
+    """parse_devices() backed by the on-disk cache"""
+    return _cached(filename, 'devices', parse_devices, cache_dir)
+
+
+def build_index(filename):
+    """Map every symbol name to the byte span of its <symbol> element.
+
+    This is a plain byte scan, no XML tree is built, so it stays fast for
+    libraries with thousands of symbols.
+    """
+    with open(filename, 'rb') as f:
+        data = f.read()
+    index = {}
+    for match in _SYMBOL_START.finditer(data):
+        end = data.find(b'</symbol>', match.end())
+        if end < 0:
+            break
+        name = html.unescape(match.group(1).decode('utf-8'))
+        index[name] = (match.start(), end + len(b'</symbol>'))
+    return index
+
+
+class SymbolLibrary(Mapping):
+    """One .lbr file whose symbols are parsed on first access.
+
+    Only the name -> byte span index is built (or read from the cache) up
+    front; a symbol's geometry is parsed from its slice of the file the
+    first time it is looked up and then kept in memory.
+    """
+
+    def __init__(self, filename, cache_dir=None):
+        self.filename = os.path.abspath(filename)
+        self.name = os.path.splitext(os.path.basename(filename))[0]
+        self.cache_dir = cache_dir
+        self._index = _cached(self.filename, 'index', build_index, cache_dir)
+        self._symbols = {}
+        self._devices = None
+
+    def __getitem__(self, name):
+        symbol_data = self._symbols.get(name)
+        if symbol_data is None:
+            chunk = self._read_chunk(name)
+            if not chunk.startswith(b'<symbol'):
+                # The file changed under us, possibly keeping its mtime and
+                # size; rebuild the index from the file itself, once
+                logger.warning(f"Stale symbol index for {self.filename}, rebuilding")
+                self._index = _cached(self.filename, 'index', build_index, self.cache_dir, refresh=True)
+                self._symbols.clear()
+                chunk = self._read_chunk(name)
+                if not chunk.startswith(b'<symbol'):
+                    raise KeyError(name)
+            symbol_data = parse_symbol(ET.fromstring(chunk))
+            self._symbols[name] = symbol_data
+        return symbol_data
+
+    def _read_chunk(self, name):
+        start, end = self._index[name]
+        with open(self.filename, 'rb') as f:
+            f.seek(start)
+            return f.read(end - start)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    @property
+    def loaded(self):
+        """Names of the symbols parsed so far"""
+        return list(self._symbols)
+
+    @property
+    def devices(self):
+        """{deviceset name: SpiceDevice}, parsed (or read from the cache) on first use"""
+        if self._devices is None:
+            self._devices = load_devices(self.filename, self.cache_dir)
+        return self._devices
+
+    def device(self, name):
+        """SPICE device for a deviceset or symbol name, or None"""
+        devices = self.devices
+        if name in devices:
+            return devices[name]
+        # Components are placed by symbol; the first deviceset using it wins
+        for device in devices.values():
+            if device.symbol == name:
+                return device
+        return None
+
+
+class LibraryRegistry(Mapping):
+    """Symbols of several libraries behind one mapping.
+
+    Symbols of the first registered library keep their plain names (as
+    placed components and the solver expect, e.g. 'R'); symbols of every
+    other library are listed as 'library/symbol', which the parts window
+    shows as one category per library. A plain name that only exists in a
+    later library still resolves.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir
+        self.libraries = []
+
+    def register(self, filename):
+        """Add a library; registering a file again reloads it in its original position"""
+        library = SymbolLibrary(filename, self.cache_dir)
+        for i, registered in enumerate(self.libraries):
+            if registered.filename == library.filename:
+                self.libraries[i] = library
+                break
+        else:
+            self.libraries.append(library)
+        logger.info(f"Registered {len(library)} symbols from {library.name}")
+        return library
+
+    def _resolve(self, key):
+        if '/' in key:
+            library_name, symbol_name = key.split('/', 1)
+            for library in self.libraries[1:]:
+                if library.name == library_name and symbol_name in library:
+                    return library, symbol_name
+        for library in self.libraries:
+            if key in library:
+                return library, key
+        return None, None
+
+    def device(self, key):
+        """SpiceDevice for a (possibly 'library/'-qualified) symbol name, or None"""
+        library, symbol_name = self._resolve(key)
+        if library is None:
+            return None
+        return library.device(symbol_name)
+
+    def __getitem__(self, key):
+        library, symbol_name = self._resolve(key)
+        if library is None:
+            raise KeyError(key)
+        return library[symbol_name]
+
+    def __contains__(self, key):
+        return self._resolve(key)[0] is not None
+
+    def __iter__(self):
+        for i, library in enumerate(self.libraries):
+            for symbol_name in library:
+                yield symbol_name if i == 0 else f"{library.name}/{symbol_name}"
+
+    def __len__(self):
+        return sum(len(library) for library in self.libraries)
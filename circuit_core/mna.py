@@ -0,0 +1,796 @@
+"""Sparse Modified Nodal Analysis (MNA) matrix assembly and DC operating point solver"""
+import logging
+import re
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+
+logger = logging.getLogger(__name__)
+
+# Node names that are tied to the reference node
+GROUND_NAMES = ('0', 'GND', 'gnd')
+
+# SPICE engineering suffixes (matched case-insensitively, 'meg' before 'm')
+SI_PREFIXES = {
+    'f': 1e-15,
+    'p': 1e-12,
+    'n': 1e-9,
+    'u': 1e-6,
+    'µ': 1e-6,
+    'm': 1e-3,
+    'k': 1e3,
+    'meg': 1e6,
+    'g': 1e9,
+    't': 1e12,
+}
+_VALUE_RE = re.compile(r'^\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:e[-+]?\d+)?)(meg|[fpnuµmkgt])?(\d*)', re.IGNORECASE)
+
+# Library symbol name -> element kind understood by Circuit.add_device
+SYMBOL_KINDS = {
+    'R': 'resistor',
+    'VOLTAGE': 'vsource',
+    'CURRENT': 'isource',
+    'AMMETER': 'ammeter',
+    'C': 'capacitor',
+    'L': 'inductor',
+    'DIODE': 'diode',
+    'LED': 'diode',
+    'BJT-NPN': 'bjt',
+    'BJT-PNP': 'bjt',
+    'FET-N': 'mosfet',
+    'FET-P': 'mosfet',
+    'VCVS': 'vcvs',
+    'VCCS': 'vccs',
+    'CCVS': 'ccvs',
+    'CCCS': 'cccs',
+    'TRANSFORMER': 'transformer',
+    'OPAMP': 'opamp',
+}
+
+# Pin names of multi-terminal symbols in the node order add_device expects
+SYMBOL_PINS = {
+    'DIODE': ('A', 'C'),
+    'LED': ('A', 'C'),
+    'BJT-NPN': ('C', 'B', 'E'),
+    'BJT-PNP': ('C', 'B', 'E'),
+    'FET-N': ('D', 'G', 'S'),
+    'FET-P': ('D1', 'G1', 'S1'),
+    'VCVS': ('NP', 'NM', 'NCP', 'NCM'),
+    'VCCS': ('NP', 'NM', 'NCP', 'NCM'),
+    'CCVS': ('NP', 'NM'),
+    'CCCS': ('NP', 'NM'),
+    'TRANSFORMER': ('P$1', 'P$2', 'P$3', 'P$4'),
+    'OPAMP': ('P', 'N', 'VOUT'),  # VDD and VSS are unused by the library model
+}
+
+# Intrinsic semiconductor models (SPICE parameter names). The library's
+# .MODEL cards give no parameters, so these are textbook values;
+# POLARITY is +1 for NPN/NMOS and -1 for PNP/PMOS.
+DEVICE_MODELS = {
+    'DMOD': {'IS': 1e-14, 'N': 1.0},
+    'LED': {'IS': 1e-19, 'N': 2.0},  # About 1.9 V at 10 mA
+    'QNPN': {'POLARITY': 1.0, 'IS': 1e-16, 'BF': 100.0, 'BR': 1.0},
+    'QPNP': {'POLARITY': -1.0, 'IS': 1e-16, 'BF': 100.0, 'BR': 1.0},
+    'NFET': {'POLARITY': 1.0, 'VTO': 1.0, 'KP': 1e-3, 'LAMBDA': 0.01},
+    'PFET': {'POLARITY': -1.0, 'VTO': -1.0, 'KP': 1e-3, 'LAMBDA': 0.01},
+}
+SYMBOL_MODELS = {'DIODE': 'DMOD', 'LED': 'LED', 'BJT-NPN': 'QNPN', 'BJT-PNP': 'QPNP',
+                 'FET-N': 'NFET', 'FET-P': 'PFET'}
+
+
+class SingularCircuitError(RuntimeError):
+    """Raised when the MNA matrix cannot be factorized (floating nodes, V-loops)"""
+
+
+def parse_value(text):
+    """Parse a SPICE style value such as '4k7', '10V', '1meg' or '2.2uF'"""
+    if isinstance(text, (int, float)):
+        return float(text)
+    match = _VALUE_RE.match(str(text))
+    if not match:
+        raise ValueError(f"Cannot parse component value: {text!r}")
+    number, prefix, trailing = match.groups()
+    value = float(number)
+    if prefix:
+        value *= SI_PREFIXES[prefix.lower()]
+        # Handle the '4k7' notation where the prefix acts as decimal point
+        if trailing:
+            value += float(f"0.{trailing}") * SI_PREFIXES[prefix.lower()]
+    return value
+
+
+class ElementTable:
+    """Parallel columns holding every instance of one two-terminal device class"""
+
+    def __init__(self):
+        self.names = []
+        self.a = []  # Positive node index (-1 is ground)
+        self.b = []  # Negative node index
+        self.values = []
+        self.index = {}  # Element name -> row
+
+    def append(self, name, a, b, value):
+        if name in self.index:
+            raise ValueError(f"Duplicate element name: {name}")
+        self.index[name] = len(self.names)
+        self.names.append(name)
+        self.a.append(a)
+        self.b.append(b)
+        self.values.append(float(value))
+
+    def arrays(self):
+        return (np.asarray(self.a, dtype=np.int64),
+                np.asarray(self.b, dtype=np.int64),
+                np.asarray(self.values, dtype=float))
+
+    def __len__(self):
+        return len(self.names)
+
+
+class DeviceTable:
+    """Parallel columns holding every instance of one multi-terminal device class"""
+
+    def __init__(self, terminals, parameters):
+        self.terminals = terminals  # Terminal names in node order
+        self.names = []
+        self.nodes = []  # Node indices per device, in terminal order (-1 is ground)
+        self.parameters = {name: [] for name in parameters}  # Model parameter columns
+        self.index = {}
+
+    def append(self, name, nodes, model):
+        if name in self.index:
+            raise ValueError(f"Duplicate element name: {name}")
+        missing = [parameter for parameter in self.parameters if parameter not in model]
+        if missing:
+            raise ValueError(f"Model of {name} lacks {', '.join(missing)}")
+        self.index[name] = len(self.names)
+        self.names.append(name)
+        self.nodes.append(tuple(nodes))
+        for parameter, column in self.parameters.items():
+            column.append(float(model[parameter]))
+
+    def arrays(self):
+        """Node indices, shape (devices, terminals), and {parameter: values}"""
+        nodes = np.asarray(self.nodes, dtype=np.int64).reshape(len(self.names), len(self.terminals))
+        return nodes, {name: np.asarray(column, dtype=float) for name, column in self.parameters.items()}
+
+    def __len__(self):
+        return len(self.names)
+
+
+class CurrentControlledTable(DeviceTable):
+    """DeviceTable whose devices are controlled by the current of a voltage source or ammeter"""
+
+    def __init__(self, terminals, parameters):
+        super().__init__(terminals, parameters)
+        self.controls = []  # Name of the controlling source per device
+
+    def append(self, name, nodes, model, control=None):
+        if not control:
+            raise ValueError(f"{name} needs the name of its controlling voltage source")
+        super().append(name, nodes, model)
+        self.controls.append(control)
+
+    def control_rows(self, circuit):
+        """Matrix rows of the controlling branch currents"""
+        try:
+            return np.array([circuit.num_nodes + circuit.vsources.index[name] for name in self.controls],
+                            dtype=np.int64)
+        except KeyError as e:
+            raise ValueError(f"Controlling voltage source {e.args[0]} does not exist") from None
+
+
+def device_model(model, default):
+    """Model parameters from a DEVICE_MODELS name or a dict of overrides of default"""
+    if model is None:
+        model = default
+    if isinstance(model, str):
+        if model not in DEVICE_MODELS:
+            raise ValueError(f"Unknown device model: {model}")
+        return DEVICE_MODELS[model]
+    return {**DEVICE_MODELS[default], **model}
+
+
+class Circuit:
+    """Netlist of named nodes and elements, grouped by device class"""
+
+    def __init__(self):
+        self.nodes = {}  # Node name -> matrix row (ground is not stored)
+        self.resistors = ElementTable()
+        self.vsources = ElementTable()  # Voltage sources, batteries and ammeters
+        self.isources = ElementTable()
+        self.capacitors = ElementTable()
+        self.inductors = ElementTable()
+        self.diodes = DeviceTable(('a', 'c'), ('IS', 'N'))
+        self.bjts = DeviceTable(('c', 'b', 'e'), ('POLARITY', 'IS', 'BF', 'BR'))
+        self.mosfets = DeviceTable(('d', 'g', 's'), ('POLARITY', 'VTO', 'KP', 'LAMBDA'))
+        # Controlled sources: GAIN is V/V, A/V (VCCS), V/A (CCVS) or A/A (CCCS)
+        self.vcvs = DeviceTable(('p', 'm', 'cp', 'cm'), ('GAIN',))
+        self.vccs = DeviceTable(('p', 'm', 'cp', 'cm'), ('GAIN',))
+        self.ccvs = CurrentControlledTable(('p', 'm'), ('GAIN',))
+        self.cccs = CurrentControlledTable(('p', 'm'), ('GAIN',))
+        self.transformers = DeviceTable(('p1', 'p2', 's1', 's2'), ('RATIO',))
+        self.ammeters = set()  # Names of vsources that are 0V ammeters
+        self.ac_phasors = {}  # Source name -> complex small-signal amplitude
+        self.waveforms = {}  # Source name -> callable f(t) used by transient analysis
+
+    def node(self, name):
+        """Return the matrix index of a node, creating it on first use"""
+        name = str(name)
+        if name in GROUND_NAMES:
+            return -1
+        index = self.nodes.get(name)
+        if index is None:
+            index = len(self.nodes)
+            self.nodes[name] = index
+        return index
+
+    def unknown_index(self, name):
+        """Row of a node voltage, or of the branch current of a voltage-defined element"""
+        name = str(name)
+        if name in GROUND_NAMES:
+            return -1
+        if name in self.nodes:
+            return self.nodes[name]
+        if name in self.vsources.index:
+            return len(self.nodes) + self.vsources.index[name]
+        if name in self.inductors.index:
+            return self.inductor_offset + self.inductors.index[name]
+        offset = self.controlled_offset
+        for table in (self.vcvs, self.ccvs, self.transformers):
+            if name in table.index:
+                return offset + table.index[name]
+            offset += len(table)
+        raise KeyError(name)
+
+    def structure_key(self):
+        """Element counts per class; changes whenever nodes or elements are added"""
+        return (len(self.nodes), len(self.resistors), len(self.vsources), len(self.isources),
+                len(self.inductors), len(self.diodes), len(self.bjts), len(self.mosfets),
+                len(self.vcvs), len(self.vccs), len(self.ccvs), len(self.cccs), len(self.transformers))
+
+    @property
+    def is_nonlinear(self):
+        return bool(len(self.diodes) or len(self.bjts) or len(self.mosfets))
+
+    @property
+    def num_nodes(self):
+        return len(self.nodes)
+
+    @property
+    def has_controlled_sources(self):
+        return bool(len(self.vcvs) or len(self.vccs) or len(self.ccvs) or len(self.cccs)
+                    or len(self.transformers))
+
+    @property
+    def inductor_offset(self):
+        # Branch currents are ordered: voltage sources, inductors, then VCVS,
+        # CCVS and transformer secondaries
+        return len(self.nodes) + len(self.vsources)
+
+    @property
+    def controlled_offset(self):
+        return self.inductor_offset + len(self.inductors)
+
+    @property
+    def size(self):
+        return self.controlled_offset + len(self.vcvs) + len(self.ccvs) + len(self.transformers)
+
+    def add_resistor(self, name, n1, n2, value):
+        value = parse_value(value)
+        if value <= 0:
+            raise ValueError(f"Resistor {name} must have a positive value, got {value}")
+        self.resistors.append(name, self.node(n1), self.node(n2), value)
+
+    def add_voltage_source(self, name, n_plus, n_minus, value):
+        self.vsources.append(name, self.node(n_plus), self.node(n_minus), parse_value(value))
+
+    def add_battery(self, name, n_plus, n_minus, value):
+        self.add_voltage_source(name, n_plus, n_minus, value)
+
+    def add_current_source(self, name, n_plus, n_minus, value):
+        # SPICE convention: current flows from n_plus through the source to n_minus
+        self.isources.append(name, self.node(n_plus), self.node(n_minus), parse_value(value))
+
+    def add_ammeter(self, name, n_plus, n_minus):
+        # An ammeter is a 0V source whose branch current is the reading
+        self.vsources.append(name, self.node(n_plus), self.node(n_minus), 0.0)
+        self.ammeters.add(name)
+
+    def add_capacitor(self, name, n1, n2, value):
+        value = parse_value(value)
+        if value <= 0:
+            raise ValueError(f"Capacitor {name} must have a positive value, got {value}")
+        self.capacitors.append(name, self.node(n1), self.node(n2), value)
+
+    def add_inductor(self, name, n1, n2, value):
+        value = parse_value(value)
+        if value <= 0:
+            raise ValueError(f"Inductor {name} must have a positive value, got {value}")
+        self.inductors.append(name, self.node(n1), self.node(n2), value)
+
+    def add_ac_source(self, name, n_plus, n_minus, amplitude, phase=0.0, dc=0.0):
+        """Voltage source with a DC value and a small-signal phasor (phase in degrees)"""
+        self.add_voltage_source(name, n_plus, n_minus, dc)
+        self.ac_phasors[name] = parse_value(amplitude) * np.exp(1j * np.radians(phase))
+
+    def add_diode(self, name, anode, cathode, model='DMOD'):
+        self.diodes.append(name, (self.node(anode), self.node(cathode)), device_model(model, 'DMOD'))
+
+    def add_bjt(self, name, collector, base, emitter, model='QNPN'):
+        self.bjts.append(name, (self.node(collector), self.node(base), self.node(emitter)),
+                         device_model(model, 'QNPN'))
+
+    def add_mosfet(self, name, drain, gate, source, model='NFET'):
+        # The bulk is tied to the source
+        self.mosfets.append(name, (self.node(drain), self.node(gate), self.node(source)),
+                            device_model(model, 'NFET'))
+
+    def add_vcvs(self, name, n_plus, n_minus, control_plus, control_minus, gain):
+        """V(n_plus, n_minus) = gain * V(control_plus, control_minus)"""
+        self.vcvs.append(name, (self.node(n_plus), self.node(n_minus), self.node(control_plus),
+                                self.node(control_minus)), {'GAIN': parse_value(gain)})
+
+    def add_vccs(self, name, n_plus, n_minus, control_plus, control_minus, transconductance):
+        """gain * V(control_plus, control_minus) flows from n_plus through the source to n_minus"""
+        self.vccs.append(name, (self.node(n_plus), self.node(n_minus), self.node(control_plus),
+                                self.node(control_minus)), {'GAIN': parse_value(transconductance)})
+
+    def add_ccvs(self, name, n_plus, n_minus, control, transresistance):
+        """V(n_plus, n_minus) = transresistance * I(control), control naming a voltage source"""
+        self.ccvs.append(name, (self.node(n_plus), self.node(n_minus)),
+                         {'GAIN': parse_value(transresistance)}, control)
+
+    def add_cccs(self, name, n_plus, n_minus, control, gain):
+        """gain * I(control) flows from n_plus through the source to n_minus"""
+        self.cccs.append(name, (self.node(n_plus), self.node(n_minus)), {'GAIN': parse_value(gain)}, control)
+
+    def add_transformer(self, name, p1, p2, s1, s2, ratio):
+        """Ideal transformer, V(s1, s2) = ratio * V(p1, p2), as the library's XFORMER"""
+        self.transformers.append(name, (self.node(p1), self.node(p2), self.node(s1), self.node(s2)),
+                                 {'RATIO': parse_value(ratio)})
+
+    def add_opamp(self, name, n_plus, n_minus, out):
+        """The library's basic op amp macromodel: Aol = 10^4, poles at 100 Hz, 4.8 MHz
+        and 4.8 MHz, 1 GOhm input and 100 Ohm output resistance.
+
+        Its internal elements and nodes are named '<name>.<element or node>'.
+        """
+        def node(label):
+            return f"{name}.{label}"
+
+        self.add_resistor(node('RIN'), n_plus, n_minus, 1e9)
+        self.add_vccs(node('G1'), '0', node(10), n_plus, n_minus, 1e-2)
+        self.add_resistor(node('R1'), node(10), '0', 1e6)
+        self.add_capacitor(node('C1'), node(10), '0', 1.59e-9)
+        self.add_vccs(node('G2'), '0', node(20), node(10), '0', 1e-6)
+        self.add_resistor(node('R2'), node(20), '0', 1e6)
+        self.add_capacitor(node('C2'), node(20), '0', 3.3e-14)
+        self.add_vccs(node('G3'), '0', node(30), node(20), '0', 1e-6)
+        self.add_resistor(node('R3'), node(30), '0', 1e6)
+        self.add_capacitor(node('C3'), node(30), '0', 3.3e-14)
+        self.add_vcvs(node('EBUFFER'), node(80), '0', node(30), '0', 1.0)
+        self.add_resistor(node('ROUT'), node(80), out, 100)
+
+    def set_waveform(self, name, waveform):
+        """Drive an existing voltage or current source with waveform(t) in transient runs"""
+        if name not in self.vsources.index and name not in self.isources.index:
+            raise KeyError(name)
+        self.waveforms[name] = waveform
+
+    def add_device(self, symbol_name, name, nodes, value=None, control=None):
+        """Add an element using the library symbol name of a placed component.
+
+        Multi-terminal symbols take their nodes in SYMBOL_PINS order.
+        Semiconductors use the DEVICE_MODELS entry named by value, or the
+        symbol's default model; controlled sources and transformers default
+        to a gain or ratio of 1, and CCVS/CCCS name their controlling
+        voltage source in control (the VNAME attribute).
+        """
+        kind = SYMBOL_KINDS.get(symbol_name)
+        if kind is None:
+            raise ValueError(f"Symbol {symbol_name} has no simulation model")
+        if kind == 'ammeter':
+            self.add_ammeter(name, *nodes)
+        elif kind == 'resistor':
+            self.add_resistor(name, *nodes, value)
+        elif kind == 'vsource':
+            self.add_voltage_source(name, *nodes, value)
+        elif kind == 'isource':
+            self.add_current_source(name, *nodes, value)
+        elif kind == 'capacitor':
+            self.add_capacitor(name, *nodes, value)
+        elif kind == 'inductor':
+            self.add_inductor(name, *nodes, value)
+        elif kind in ('vcvs', 'vccs', 'transformer'):
+            getattr(self, f"add_{kind}")(name, *nodes, 1.0 if value is None else value)
+        elif kind in ('ccvs', 'cccs'):
+            getattr(self, f"add_{kind}")(name, *nodes, control, 1.0 if value is None else value)
+        elif kind == 'opamp':
+            self.add_opamp(name, *nodes)
+        else:
+            model = value if value in DEVICE_MODELS else SYMBOL_MODELS[symbol_name]
+            if kind == 'diode':
+                self.add_diode(name, *nodes, model)
+            elif kind == 'bjt':
+                self.add_bjt(name, *nodes, model)
+            else:
+                self.add_mosfet(name, *nodes, model)
+
+
+def element_value(circuit, name):
+    for table in (circuit.resistors, circuit.vsources, circuit.isources,
+                  circuit.capacitors, circuit.inductors):
+        row = table.index.get(name)
+        if row is not None:
+            return table.values[row]
+    raise KeyError(name)
+
+
+def set_element_value(circuit, name, value):
+    for table in (circuit.resistors, circuit.vsources, circuit.isources,
+                  circuit.capacitors, circuit.inductors):
+        row = table.index.get(name)
+        if row is not None:
+            table.values[row] = float(value)
+            return
+    raise KeyError(name)
+
+
+def _stamp_conductances(a, b, g):
+    """COO triplets for conductances g between node arrays a and b"""
+    rows = np.concatenate([a, b, a, b])
+    cols = np.concatenate([a, b, b, a])
+    vals = np.concatenate([g, g, -g, -g])
+    keep = (rows >= 0) & (cols >= 0)
+    return rows[keep], cols[keep], vals[keep]
+
+
+def _stamp_branches(a, b, branch):
+    """COO triplets for the incidence entries of voltage-defined branches"""
+    ones = np.ones(len(a))
+    rows = np.concatenate([a, branch, b, branch])
+    cols = np.concatenate([branch, a, branch, b])
+    vals = np.concatenate([ones, ones, -ones, -ones])
+    keep = (rows >= 0) & (cols >= 0)
+    return rows[keep], cols[keep], vals[keep]
+
+
+def _stamp_transconductances(p, m, cp, cm, g):
+    """COO triplets for currents g * V(cp, cm) leaving node p and entering node m"""
+    rows = np.concatenate([p, p, m, m])
+    cols = np.concatenate([cp, cm, cp, cm])
+    vals = np.concatenate([g, -g, -g, g])
+    keep = (rows >= 0) & (cols >= 0)
+    return rows[keep], cols[keep], vals[keep]
+
+
+def _stamp_gains(branch, cp, cm, gain):
+    """COO triplets for -gain * V(cp, cm) in the equations of voltage-defined branches"""
+    rows = np.concatenate([branch, branch])
+    cols = np.concatenate([cp, cm])
+    vals = np.concatenate([-gain, gain])
+    keep = cols >= 0
+    return rows[keep], cols[keep], vals[keep]
+
+
+def _stamp_controlled(circuit):
+    """COO triplets of every controlled source and transformer, one class at a time"""
+    triplets = []
+    branch = circuit.controlled_offset
+    if len(circuit.vcvs):
+        nodes, parameters = circuit.vcvs.arrays()
+        p, m, cp, cm = nodes.T
+        rows = branch + np.arange(len(nodes))
+        triplets += [_stamp_branches(p, m, rows), _stamp_gains(rows, cp, cm, parameters['GAIN'])]
+        branch += len(nodes)
+    if len(circuit.ccvs):
+        nodes, parameters = circuit.ccvs.arrays()
+        p, m = nodes.T
+        rows = branch + np.arange(len(nodes))
+        triplets += [_stamp_branches(p, m, rows),
+                     (rows, circuit.ccvs.control_rows(circuit), -parameters['GAIN'])]
+        branch += len(nodes)
+    if len(circuit.transformers):
+        nodes, parameters = circuit.transformers.arrays()
+        p1, p2, s1, s2 = nodes.T
+        ratio = parameters['RATIO']
+        rows = branch + np.arange(len(nodes))
+        # The secondary is a voltage-defined branch; the primary draws ratio
+        # times its current, so the ideal transformer conserves power
+        triplets += [_stamp_branches(s1, s2, rows), _stamp_gains(rows, p1, p2, ratio),
+                     _stamp_transconductances(p1, p2, rows, np.full(len(rows), -1), -ratio)]
+    if len(circuit.vccs):
+        nodes, parameters = circuit.vccs.arrays()
+        triplets.append(_stamp_transconductances(*nodes.T, parameters['GAIN']))
+    if len(circuit.cccs):
+        nodes, parameters = circuit.cccs.arrays()
+        p, m = nodes.T
+        triplets.append(_stamp_transconductances(p, m, circuit.cccs.control_rows(circuit),
+                                                 np.full(len(p), -1), parameters['GAIN']))
+    return triplets
+
+
+def assemble_dc(circuit):
+    """Build the sparse MNA matrix (CSC) and right-hand side for a circuit"""
+    n = circuit.num_nodes
+    size = circuit.size
+    triplets = []
+
+    if len(circuit.resistors):
+        a, b, r = circuit.resistors.arrays()
+        triplets.append(_stamp_conductances(a, b, 1.0 / r))
+
+    rhs = np.zeros(size)
+    if len(circuit.vsources):
+        a, b, v = circuit.vsources.arrays()
+        branch = n + np.arange(len(v))
+        triplets.append(_stamp_branches(a, b, branch))
+        rhs[branch] = v
+
+    if len(circuit.inductors):
+        # Inductors are 0V branches at DC; their L term lives in assemble_reactive
+        a, b, _ = circuit.inductors.arrays()
+        triplets.append(_stamp_branches(a, b, circuit.inductor_offset + np.arange(len(a))))
+
+    # Controlled sources and transformers are frequency independent
+    triplets += _stamp_controlled(circuit)
+
+    if len(circuit.isources):
+        a, b, i = circuit.isources.arrays()
+        # Current leaves n_plus and enters n_minus through the external circuit
+        np.add.at(rhs, a[a >= 0], -i[a >= 0])
+        np.add.at(rhs, b[b >= 0], i[b >= 0])
+
+    return _to_csc(triplets, size), rhs
+
+
+def assemble_reactive(circuit):
+    """Build the matrix C of the MNA system G + sC (capacitances, -L on inductor branches)"""
+    triplets = []
+    if len(circuit.capacitors):
+        a, b, c = circuit.capacitors.arrays()
+        triplets.append(_stamp_conductances(a, b, c))
+    if len(circuit.inductors):
+        _, _, inductance = circuit.inductors.arrays()
+        branch = circuit.inductor_offset + np.arange(len(inductance))
+        triplets.append((branch, branch, -inductance))
+    return _to_csc(triplets, circuit.size)
+
+
+def _to_csc(triplets, size):
+    if triplets:
+        rows, cols, vals = (np.concatenate(part) for part in zip(*triplets))
+    else:
+        rows = cols = np.zeros(0, dtype=np.int64)
+        vals = np.zeros(0)
+    # Duplicate entries are summed by the COO -> CSC conversion
+    return sp.coo_matrix((vals, (rows, cols)), shape=(size, size)).tocsc()
+
+
+class DCSolution:
+    """Node voltages and branch currents of a DC operating point"""
+
+    def __init__(self, circuit, x):
+        self.circuit = circuit
+        self.x = x
+        self.node_voltages = x[:circuit.num_nodes]
+        self.branch_currents = x[circuit.num_nodes:]
+
+    def voltage(self, node):
+        node = str(node)
+        if node in GROUND_NAMES:
+            return 0.0
+        return float(self.node_voltages[self.circuit.nodes[node]])
+
+    def current(self, name):
+        """Current through a voltage source, ammeter or resistor (n1 -> n2)"""
+        table = self.circuit.vsources
+        if name in table.index:
+            # SPICE convention: positive current flows from n_plus through the element
+            return float(self.branch_currents[table.index[name]])
+        table = self.circuit.inductors
+        if name in table.index:
+            return float(self.branch_currents[len(self.circuit.vsources) + table.index[name]])
+        table = self.circuit.resistors
+        if name in table.index:
+            row = table.index[name]
+            va = self._node_value(table.a[row])
+            vb = self._node_value(table.b[row])
+            return (va - vb) / table.values[row]
+        if name in self.circuit.capacitors.index:
+            return 0.0
+        for table in (self.circuit.vcvs, self.circuit.ccvs, self.circuit.transformers):
+            if name in table.index:
+                # From the positive (secondary) terminal through the element, as for sources
+                return float(self.x[self.circuit.unknown_index(name)])
+        raise KeyError(name)
+
+    def _node_value(self, index):
+        return 0.0 if index < 0 else float(self.node_voltages[index])
+
+    def as_dict(self):
+        return {name: float(self.node_voltages[index]) for name, index in self.circuit.nodes.items()}
+
+
+class DCSolver:
+    """Sparse LU based DC operating point solver.
+
+    Value edits made through set_value() reuse the existing factorization:
+    source changes only touch the right-hand side, and resistor changes are
+    applied as low-rank (Sherman-Morrison-Woodbury) corrections until more
+    than max_updates resistors differ from the factorized matrix, at which
+    point the matrix is patched in place and refactorized. Adding elements
+    or nodes changes the structure and triggers a full rebuild.
+    """
+
+    def __init__(self, circuit, permc_spec='COLAMD', max_updates=16):
+        self.circuit = circuit
+        self.permc_spec = permc_spec
+        self.max_updates = max_updates
+        self.matrix = None
+        self.rhs = None
+        self.lu = None
+        self._structure = None
+        self._incidence = None  # Resistor node index arrays
+        self._conductance = None  # Resistor conductances inside self.matrix
+        self._pending = {}  # Resistor row -> conductance delta not yet factorized
+        self._columns = {}  # Resistor row -> A^-1 u, valid until the next refactorization
+        self._base_x = None  # A^-1 rhs for the factorized matrix
+
+    def _structure_key(self):
+        return self.circuit.structure_key()
+
+    def factorize(self):
+        if self.circuit.is_nonlinear:
+            raise ValueError("Circuit has nonlinear devices; use nonlinear.NewtonSolver")
+        self.matrix, self.rhs = assemble_dc(self.circuit)
+        self._structure = self._structure_key()
+        a, b, r = self.circuit.resistors.arrays()
+        self._incidence = (a, b)
+        self._conductance = 1.0 / r
+        self._pending = {}
+        self._columns = {}
+        self._base_x = None
+        self._factor()
+
+    def _factor(self):
+        if self.matrix.shape[0] == 0:
+            self.lu = None
+            return
+        try:
+            self.lu = splu(self.matrix, permc_spec=self.permc_spec)
+        except RuntimeError as e:
+            raise SingularCircuitError(
+                f"MNA matrix is singular ({e}); check for floating nodes or voltage source loops"
+            ) from e
+        logger.debug(f"Factorized {self.matrix.shape[0]}x{self.matrix.shape[0]} MNA matrix "
+                     f"with {self.matrix.nnz} non-zeros")
+
+    def set_value(self, name, value):
+        """Change the value of an existing element without rebuilding the system"""
+        circuit = self.circuit
+        value = parse_value(value)
+        if name in circuit.resistors.index:
+            if value <= 0:
+                raise ValueError(f"Resistor {name} must have a positive value, got {value}")
+            row = circuit.resistors.index[name]
+            circuit.resistors.values[row] = value
+            if self.matrix is None:
+                return
+            delta = 1.0 / value - self._conductance[row]
+            if delta == 0.0:
+                self._pending.pop(row, None)
+            else:
+                self._pending[row] = delta
+            if len(self._pending) > self.max_updates:
+                self._refactor()
+        elif name in circuit.vsources.index:
+            row = circuit.vsources.index[name]
+            circuit.vsources.values[row] = value
+            if self.matrix is not None:
+                self.rhs[circuit.num_nodes + row] = value
+                self._base_x = None
+        elif name in circuit.isources.index:
+            table = circuit.isources
+            row = table.index[name]
+            delta = value - table.values[row]
+            table.values[row] = value
+            if self.matrix is not None:
+                if table.a[row] >= 0:
+                    self.rhs[table.a[row]] -= delta
+                if table.b[row] >= 0:
+                    self.rhs[table.b[row]] += delta
+                self._base_x = None
+        elif name in circuit.capacitors.index or name in circuit.inductors.index:
+            # Reactive values do not enter the DC operating point
+            table = circuit.capacitors if name in circuit.capacitors.index else circuit.inductors
+            table.values[table.index[name]] = value
+        else:
+            raise KeyError(name)
+
+    def _refactor(self):
+        """Fold pending resistor updates into the matrix and refactorize"""
+        rows = np.fromiter(self._pending.keys(), dtype=np.int64)
+        deltas = np.fromiter(self._pending.values(), dtype=float)
+        a, b = self._incidence
+        r, c, v = _stamp_conductances(a[rows], b[rows], deltas)
+        size = self.matrix.shape[0]
+        self.matrix = (self.matrix + sp.csc_matrix((v, (r, c)), shape=(size, size))).tocsc()
+        self._conductance[rows] += deltas
+        self._pending = {}
+        self._columns = {}
+        self._base_x = None
+        self._factor()
+
+    def _update_column(self, row):
+        column = self._columns.get(row)
+        if column is None:
+            a, b = self._incidence
+            u = np.zeros(self.matrix.shape[0])
+            if a[row] >= 0:
+                u[a[row]] += 1.0
+            if b[row] >= 0:
+                u[b[row]] -= 1.0
+            column = self.lu.solve(u)
+            self._columns[row] = column
+        return column
+
+    def _project(self, rows, x):
+        """u_k^T x for the incidence vectors of the given resistors"""
+        a, b = self._incidence
+        padded = np.append(x, 0.0)  # Index -1 (ground) reads the trailing zero
+        return padded[a[rows]] - padded[b[rows]]
+
+    def solve(self):
+        if self.matrix is None or self._structure != self._structure_key():
+            self.factorize()
+        if self.lu is None:
+            return DCSolution(self.circuit, np.zeros(0))
+        if self._base_x is None:
+            self._base_x = self.lu.solve(self.rhs)
+        x = self._base_x
+        if self._pending:
+            rows = np.fromiter(self._pending.keys(), dtype=np.int64)
+            deltas = np.fromiter(self._pending.values(), dtype=float)
+            Z = np.column_stack([self._update_column(row) for row in rows])
+            # Woodbury: (A + U D U^T)^-1 b = x - Z (D^-1 + U^T Z)^-1 U^T x
+            capacitance = np.diag(1.0 / deltas) + np.vstack([self._project(rows, z) for z in Z.T]).T
+            try:
+                x = x - Z @ np.linalg.solve(capacitance, self._project(rows, x))
+            except np.linalg.LinAlgError:
+                self._refactor()
+                return self.solve()
+        if not np.all(np.isfinite(x)):
+            raise SingularCircuitError("MNA solve produced non-finite values")
+        return DCSolution(self.circuit, x)
+
+    def solve_transpose(self, rhs):
+        """Solve A^T y = rhs with the current factorization (used by adjoint sensitivities)"""
+        if self.matrix is None or self._structure != self._structure_key():
+            self.factorize()
+        if self._pending:
+            # Transpose solves need the factorization of the matrix as it is now
+            self._refactor()
+        if self.lu is None:
+            return np.zeros(0, dtype=np.result_type(rhs))
+        return self.lu.solve(np.asarray(rhs), trans='T')
+
+
+def solve_dc(circuit, reduce=False):
+    """Solve the DC operating point of a circuit (by Newton iteration if it is nonlinear).
+
+    Linear circuits are split into independent blocks (see blocks.BlockSolver),
+    so a canvas of unrelated subcircuits solves as many small systems. With
+    reduce, series/parallel sections are collapsed first and the removed
+    nodes back-substituted (see reduction.reduce_circuit).
+    """
+    if reduce:
+        from .reduction import reduce_circuit
+        return reduce_circuit(circuit).solve()
+    if circuit.is_nonlinear:
+        from .nonlinear import NewtonSolver
+        return NewtonSolver(circuit).solve()
+    from .blocks import BlockSolver
+    return BlockSolver(circuit).solve()
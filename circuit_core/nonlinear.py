@@ -0,0 +1,417 @@
+"""Newton-Raphson DC operating point of circuits with diodes, BJTs and MOSFETs"""
+import logging
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+
+from .mna import DCSolution, SingularCircuitError, assemble_dc, parse_value, set_element_value
+
+logger = logging.getLogger(__name__)
+
+THERMAL_VOLTAGE = 0.025852  # kT/q at 300 K
+GMIN = 1e-12  # Conductance across every junction, as in SPICE
+MAX_EXPONENT = 80.0  # Junction exponentials continue linearly beyond this, against overflow
+FET_STEP = 1.0  # Largest change of a MOSFET control voltage per iteration
+DENSE_SIZE = 150  # Larger systems are factorized as sparse matrices
+
+
+class ConvergenceError(RuntimeError):
+    """Raised when Newton iteration fails even with gmin and source stepping"""
+
+
+def _pn_limit(new, old, vt, vcrit):
+    """SPICE pnjlim: damp large forward steps of junction voltages; returns (voltages, limited)"""
+    limited = (new > vcrit) & (np.abs(new - old) > 2 * vt)
+    arg = 1 + (new - old) / vt
+    with np.errstate(invalid='ignore', divide='ignore'):
+        stepped = np.where(old > 0, np.where(arg > 0, old + vt * np.log(arg), vcrit),
+                           vt * np.log(new / vt))
+    return np.where(limited, stepped, new), limited
+
+
+def _junction_exp(x):
+    """exp(x) and its derivative, continued linearly above MAX_EXPONENT"""
+    e = np.exp(np.minimum(x, MAX_EXPONENT))
+    return np.where(x > MAX_EXPONENT, e * (1 + x - MAX_EXPONENT), e), e
+
+
+def _vcrit(vt, saturation):
+    """Junction voltage above which pnjlim limits steps"""
+    return vt * np.log(vt / (np.sqrt(2) * saturation))
+
+
+def _diode_initial(parameters):
+    return _vcrit(parameters['N'] * THERMAL_VOLTAGE, parameters['IS'])[:, None]
+
+
+def _diode_limit(v, old, parameters):
+    nvt = parameters['N'] * THERMAL_VOLTAGE
+    vcrit = _vcrit(nvt, parameters['IS'])
+    v, limited = _pn_limit(v[:, 0], old[:, 0], nvt, vcrit)
+    return v[:, None], limited
+
+
+def _diode_model(v, parameters):
+    """Terminal currents (anode, cathode) and their derivatives by vd = Va - Vc"""
+    vd = v[:, 0]
+    nvt = parameters['N'] * THERMAL_VOLTAGE
+    e, slope = _junction_exp(vd / nvt)
+    current = parameters['IS'] * (e - 1) + GMIN * vd
+    conductance = parameters['IS'] / nvt * slope + GMIN
+    currents = np.stack([current, -current], axis=1)
+    jacobian = np.stack([conductance, -conductance], axis=1)[:, :, None]
+    return currents, jacobian
+
+
+def _bjt_initial(parameters):
+    vbe = _vcrit(THERMAL_VOLTAGE, parameters['IS'])
+    return np.stack([vbe, np.zeros_like(vbe)], axis=1)
+
+
+def _bjt_limit(v, old, parameters):
+    vt = THERMAL_VOLTAGE
+    vcrit = _vcrit(vt, parameters['IS'])
+    vbe, limited_be = _pn_limit(v[:, 0], old[:, 0], vt, vcrit)
+    vbc, limited_bc = _pn_limit(v[:, 1], old[:, 1], vt, vcrit)
+    return np.stack([vbe, vbc], axis=1), limited_be | limited_bc
+
+
+def _bjt_model(v, parameters):
+    """Ebers-Moll transport model: terminal currents (c, b, e) and derivatives by (vbe, vbc).
+
+    Junction voltages are those of an NPN (multiplied by POLARITY), so a
+    PNP is the NPN with all voltages and currents reversed.
+    """
+    vbe, vbc = v[:, 0], v[:, 1]
+    polarity = parameters['POLARITY']
+    saturation = parameters['IS']
+    bf = parameters['BF']
+    br = parameters['BR']
+    ef, slope_f = _junction_exp(vbe / THERMAL_VOLTAGE)
+    er, slope_r = _junction_exp(vbc / THERMAL_VOLTAGE)
+    forward = saturation * (ef - 1)
+    reverse = saturation * (er - 1)
+    gf = saturation / THERMAL_VOLTAGE * slope_f
+    gr = saturation / THERMAL_VOLTAGE * slope_r
+
+    collector = forward - reverse - reverse / br - GMIN * vbc
+    base = forward / bf + reverse / br + GMIN * (vbe + vbc)
+    d_collector = np.stack([gf, -gr - gr / br - GMIN], axis=1)
+    d_base = np.stack([gf / bf + GMIN, gr / br + GMIN], axis=1)
+
+    currents = polarity[:, None] * np.stack([collector, base, -(collector + base)], axis=1)
+    jacobian = polarity[:, None, None] * np.stack([d_collector, d_base, -(d_collector + d_base)], axis=1)
+    return currents, jacobian
+
+
+def _mosfet_initial(parameters):
+    vgs = parameters['POLARITY'] * parameters['VTO']
+    return np.stack([vgs, np.zeros_like(vgs)], axis=1)
+
+
+def _mosfet_limit(v, old, parameters):
+    step = np.clip(v - old, -FET_STEP, FET_STEP)
+    return old + step, np.any(step != v - old, axis=1)
+
+
+def _mosfet_model(v, parameters):
+    """Level 1 (Shichman-Hodges) model: terminal currents (d, g, s) and derivatives by (vgs, vds).
+
+    Drain and source swap roles when vds < 0, so the device conducts
+    symmetrically.
+    """
+    vgs, vds = v[:, 0], v[:, 1]
+    polarity = parameters['POLARITY']
+    kp = parameters['KP']
+    lam = parameters['LAMBDA']
+    vto = polarity * parameters['VTO']  # Threshold of the equivalent NMOS
+
+    reverse = vds < 0
+    vgs_eff = np.where(reverse, vgs - vds, vgs)
+    vds_eff = np.abs(vds)
+    overdrive = vgs_eff - vto
+    on = overdrive > 0
+    saturated = vds_eff >= overdrive
+    clm = 1 + lam * vds_eff
+    triode = overdrive * vds_eff - vds_eff ** 2 / 2
+    drain = np.where(on, np.where(saturated, kp / 2 * overdrive ** 2, kp * triode) * clm, 0.0)
+    gm = np.where(on, np.where(saturated, kp * overdrive, kp * vds_eff) * clm, 0.0)
+    gds = np.where(on, np.where(saturated, kp / 2 * overdrive ** 2 * lam,
+                                kp * (overdrive - vds_eff) * clm + kp * triode * lam), 0.0)
+
+    # In reverse the current is -f(vgd, vsd): d/dvgs = -gm, d/dvds = gm + gds
+    drain = np.where(reverse, -drain, drain) + GMIN * vds
+    d_drain = np.stack([np.where(reverse, -gm, gm), np.where(reverse, gm + gds, gds) + GMIN], axis=1)
+
+    zero = np.zeros_like(drain)
+    currents = polarity[:, None] * np.stack([drain, zero, -drain], axis=1)
+    jacobian = polarity[:, None, None] * np.stack([d_drain, np.zeros_like(d_drain), -d_drain], axis=1)
+    return currents, jacobian
+
+
+# Circuit table, incidence of the control voltages on the terminals, and
+# the functions giving cold-start control voltages, limiting steps and
+# evaluating the model
+_KINDS = (
+    ('diodes', np.array([[1.0, -1.0]]), _diode_initial, _diode_limit, _diode_model),
+    ('bjts', np.array([[0.0, 1.0, -1.0], [-1.0, 1.0, 0.0]]), _bjt_initial, _bjt_limit, _bjt_model),
+    ('mosfets', np.array([[0.0, 1.0, -1.0], [1.0, 0.0, -1.0]]), _mosfet_initial, _mosfet_limit,
+     _mosfet_model),
+)
+
+
+class _DeviceGroup:
+    """Vectorized state of all instances of one device kind"""
+
+    def __init__(self, table, incidence, initial, limit, model):
+        self.terminals = table.terminals
+        self.index = table.index
+        self.nodes, self.parameters = table.arrays()
+        polarity = self.parameters.get('POLARITY', np.ones(len(self.nodes)))
+        # Control voltages are incidence @ terminal voltages, per device
+        self.incidence = polarity[:, None, None] * incidence
+        self.initial = initial
+        self.limit = limit
+        self.model = model
+        self.control = None  # Limited control voltages of the last iteration
+        self._currents = None  # Terminal currents and Jacobian at self.control
+        self._jacobian = None
+
+    def controls(self, x):
+        padded = np.append(x, 0.0)  # Index -1 (ground) reads the trailing zero
+        return np.einsum('nkt,nt->nk', self.incidence, padded[self.nodes])
+
+    def linearize(self, x, reltol, abstol, cold=False):
+        """Jacobian by terminal voltages, equivalent currents and whether the devices settled.
+
+        A device has settled when its step was not limited and its current
+        at x matches the prediction of the previous linearization, the
+        current convergence test of SPICE. cold starts from the initial
+        control voltages (junctions at their critical voltage, MOSFETs at
+        threshold) instead of those of x, as SPICE does for its first
+        iteration.
+        """
+        previous = self.control
+        if cold:
+            v = self.initial(self.parameters)
+            previous = None
+        else:
+            v = self.controls(x)
+        settled = previous is not None
+        if previous is not None:
+            v, limited = self.limit(v, previous, self.parameters)
+            settled = not limited.any()
+        currents, jacobian = self.model(v, self.parameters)
+        if settled:
+            predicted = self._currents + np.einsum('ntk,nk->nt', self._jacobian, v - previous)
+            settled = bool(np.all(np.abs(currents - predicted)
+                                  <= reltol * np.maximum(np.abs(currents), np.abs(predicted)) + abstol))
+        self.control, self._currents, self._jacobian = v, currents, jacobian
+        # I(V) ~ I(v*) + dI/dv (v - v*), with v = incidence @ V
+        equivalent = currents - np.einsum('ntk,nk->nt', jacobian, v)
+        return np.einsum('ntk,nks->nts', jacobian, self.incidence), equivalent, settled
+
+
+class NonlinearSolution(DCSolution):
+    """DC operating point with device terminal currents and solver statistics"""
+
+    def __init__(self, circuit, x, groups, iterations, strategy):
+        super().__init__(circuit, x)
+        self.iterations = iterations  # Newton iterations over all continuation steps
+        self.strategy = strategy  # 'newton', 'gmin' or 'source'
+        self._groups = groups
+
+    def terminal_currents(self, name):
+        """{terminal: current into the device} of a diode, BJT or MOSFET"""
+        for group in self._groups:
+            row = group.index.get(name)
+            if row is not None:
+                currents, _ = group.model(group.controls(self.x)[row:row + 1],
+                                          {key: value[row:row + 1] for key, value in group.parameters.items()})
+                return dict(zip(group.terminals, currents[0].tolist()))
+        raise KeyError(name)
+
+    def current(self, name):
+        """Current of an element; for semiconductors the anode, collector or drain current"""
+        if any(name in group.index for group in self._groups):
+            return next(iter(self.terminal_currents(name).values()))
+        return super().current(name)
+
+
+class NewtonSolver:
+    """Newton-Raphson DC operating point of a circuit with nonlinear devices.
+
+    Device models are evaluated for all instances of a kind at once. The
+    sparsity pattern of the Jacobian (linear elements, device stamps and
+    the node diagonal) is computed once, so every iteration only sums the
+    new values into fixed slots; systems above DENSE_SIZE also reuse the
+    column ordering of the first sparse factorization. Junction voltages
+    are limited as in SPICE. When plain Newton iteration fails, gmin
+    stepping (a shunt conductance on every node, reduced to zero) and then
+    source stepping (sources ramped from zero) are tried.
+    """
+
+    def __init__(self, circuit, max_iterations=100, reltol=1e-3, vntol=1e-6, abstol=1e-12):
+        self.circuit = circuit
+        self.max_iterations = max_iterations
+        self.reltol = reltol
+        self.vntol = vntol
+        self.abstol = abstol
+        self.x = None  # Last solution, the starting point of the next solve
+        self._structure = None
+        self._values_stale = False
+
+    def _structure_key(self):
+        return self.circuit.structure_key()
+
+    def prepare(self):
+        """Assemble the linear part and the fixed Jacobian pattern"""
+        circuit = self.circuit
+        matrix, self.rhs = assemble_dc(circuit)
+        size = self.size = matrix.shape[0]
+        self.groups = [_DeviceGroup(getattr(circuit, attribute), *rest)
+                       for attribute, *rest in _KINDS if len(getattr(circuit, attribute))]
+
+        linear = matrix.tocoo()
+        rows = [linear.row, np.arange(circuit.num_nodes)]
+        cols = [linear.col, np.arange(circuit.num_nodes)]
+        self._linear_values = linear.data
+        self._keep = []
+        for group in self.groups:
+            terminals = group.nodes.shape[1]
+            device_rows = np.repeat(group.nodes, terminals, axis=1).ravel()
+            device_cols = np.tile(group.nodes, (1, terminals)).ravel()
+            keep = (device_rows >= 0) & (device_cols >= 0)
+            self._keep.append(keep)
+            rows.append(device_rows[keep])
+            cols.append(device_cols[keep])
+        self._rows = np.concatenate(rows)
+        self._cols = np.concatenate(cols)
+        self._tolerance = np.where(np.arange(size) < circuit.num_nodes, self.vntol, self.abstol)
+        self._set_pattern(None)
+        self._structure = self._structure_key()
+
+    def _set_pattern(self, permutation):
+        """Slot of every matrix entry in the dense or CSC value array"""
+        size = self.size
+        if size <= DENSE_SIZE:
+            self._slots = self._rows * size + self._cols
+            self._nnz = size * size
+            return
+        self._permutation = permutation
+        cols = self._cols if permutation is None else permutation[self._cols]
+        keys, self._slots = np.unique(cols * size + self._rows, return_inverse=True)
+        self._nnz = len(keys)
+        self._indices = keys % size
+        self._indptr = np.searchsorted(keys // size, np.arange(size + 1))
+
+    def _solve_linear(self, values, rhs):
+        data = np.bincount(self._slots, weights=values, minlength=self._nnz)
+        if self.size <= DENSE_SIZE:
+            try:
+                return np.linalg.solve(data.reshape(self.size, self.size), rhs)
+            except np.linalg.LinAlgError as e:
+                raise SingularCircuitError(f"Jacobian is singular ({e})") from e
+        matrix = sp.csc_matrix((data, self._indices, self._indptr), shape=(self.size, self.size))
+        try:
+            if self._permutation is None:
+                lu = splu(matrix, permc_spec='COLAMD')
+                # Later iterations keep this column order and skip the ordering step
+                self._set_pattern(lu.perm_c)
+                return lu.solve(rhs)
+            return splu(matrix, permc_spec='NATURAL').solve(rhs)[self._permutation]
+        except RuntimeError as e:
+            raise SingularCircuitError(f"Jacobian is singular ({e})") from e
+
+    def _newton(self, x, scale=1.0, shunt=0.0, cold=False):
+        """Newton iteration from x; returns (solution or None, iterations)"""
+        for group in self.groups:
+            group.control = None
+        rhs_static = self.rhs * scale
+        shunts = np.full(self.circuit.num_nodes, shunt)
+        for iteration in range(1, self.max_iterations + 1):
+            values = [self._linear_values, shunts]
+            rhs = rhs_static.copy()
+            settled = True
+            for group, keep in zip(self.groups, self._keep):
+                jacobian, equivalent, group_settled = group.linearize(
+                    x, self.reltol, self.abstol, cold and iteration == 1)
+                settled &= group_settled
+                values.append(jacobian.ravel()[keep])
+                rows = group.nodes.ravel()
+                np.add.at(rhs, rows[rows >= 0], -equivalent.ravel()[rows >= 0])
+            try:
+                x_new = self._solve_linear(np.concatenate(values), rhs)
+            except SingularCircuitError:
+                return None, iteration
+            if not np.all(np.isfinite(x_new)):
+                return None, iteration
+            converged = settled and np.all(
+                np.abs(x_new - x) <= self.reltol * np.maximum(np.abs(x_new), np.abs(x)) + self._tolerance)
+            x = x_new
+            if converged:
+                return x, iteration
+        return None, self.max_iterations
+
+    def _gmin_stepping(self, x):
+        iterations = 0
+        for shunt in np.logspace(-2, -12, 11):
+            x, count = self._newton(x, shunt=shunt)
+            iterations += count
+            if x is None:
+                return None, iterations
+        x, count = self._newton(x)
+        return x, iterations + count
+
+    def _source_stepping(self, x):
+        # Start over from all sources off, where every device carries no current
+        iterations = 0
+        x = np.zeros(self.size)
+        scale, step = 0.0, 0.25
+        while scale < 1.0:
+            target = min(1.0, scale + step)
+            solved, count = self._newton(x, scale=target)
+            iterations += count
+            if solved is None:
+                step /= 4
+                if step < 1e-4:
+                    return None, iterations
+                continue
+            x, scale = solved, target
+            step = min(2 * step, 1.0)
+        return x, iterations
+
+    def set_value(self, name, value):
+        """Change the value of a linear element; the next solve starts from the last solution"""
+        set_element_value(self.circuit, name, parse_value(value))
+        self._values_stale = True
+
+    def solve(self):
+        if self._structure != self._structure_key():
+            self.prepare()
+        elif self._values_stale:
+            # Same structure, so the entries come in the same order as before
+            matrix, self.rhs = assemble_dc(self.circuit)
+            self._linear_values = matrix.tocoo().data
+        self._values_stale = False
+        if self.size == 0:
+            return NonlinearSolution(self.circuit, np.zeros(0), self.groups, 0, 'newton')
+        cold = self.x is None or len(self.x) != self.size
+        x0 = np.zeros(self.size) if cold else self.x
+
+        iterations = 0
+        for strategy, method in (('newton', lambda x: self._newton(x, cold=cold)),
+                                 ('gmin', self._gmin_stepping), ('source', self._source_stepping)):
+            x, count = method(x0)
+            iterations += count
+            if x is not None:
+                break
+            logger.info(f"Newton iteration failed ({strategy}), {iterations} iterations so far")
+        else:
+            raise ConvergenceError(f"No DC operating point found after {iterations} iterations; "
+                                   "check for floating nodes or unbiased devices")
+        self.x = x
+        logger.debug(f"DC operating point in {iterations} iterations ({strategy})")
+        return NonlinearSolution(self.circuit, x, self.groups, iterations, strategy)
+
@@ -0,0 +1,318 @@
+"""Series/parallel (and star-delta) reduction of two-terminal networks before MNA assembly"""
+import collections
+import copy
+import itertools
+import logging
+
+import numpy as np
+
+from .mna import DCSolution, ElementTable, solve_dc
+
+logger = logging.getLogger(__name__)
+
+PASSIVE_TABLES = (('R', 'resistors'), ('C', 'capacitors'), ('L', 'inductors'))
+UNITS = {'R': 'Ω', 'C': 'F', 'L': 'H'}
+ENGINEERING_PREFIXES = {-15: 'f', -12: 'p', -9: 'n', -6: 'µ', -3: 'm', 0: '', 3: 'k', 6: 'M', 9: 'G', 12: 'T'}
+
+
+def format_value(value, unit):
+    """value with an engineering prefix, e.g. 4700 -> '4.7 kΩ'"""
+    exponent = int(np.floor(np.log10(abs(value)) / 3)) * 3 if value else 0
+    exponent = min(max(exponent, -15), 12)
+    return f"{value / 10.0 ** exponent:.4g} {ENGINEERING_PREFIXES[exponent]}{unit}"
+
+
+def _share(kind, x, y):
+    """Fraction of the impedance of x in series with y (also the current through y in parallel)"""
+    # A capacitor's impedance falls as its value grows
+    return y / (x + y) if kind == 'C' else x / (x + y)
+
+
+def _series_value(kind, x, y):
+    return x * y / (x + y) if kind == 'C' else x + y
+
+
+def _parallel_value(kind, x, y):
+    return x + y if kind == 'C' else x * y / (x + y)
+
+
+class ReductionStep:
+    """One simplification: which parts were combined or removed, and the result"""
+
+    def __init__(self, operation, kind, parts, name=None, value=None, node=None, ends=()):
+        self.operation = operation  # 'series', 'parallel', 'star', 'dead end' or 'shorted'
+        self.kind = kind  # 'R', 'C' or 'L'
+        self.parts = parts  # Names of the elements taken out
+        self.name = name  # Name of the equivalent element (star: names of the delta elements)
+        self.value = value  # Its value (star: values of the delta elements)
+        self.node = node  # Name of the node removed, if any
+        self.ends = ends  # Names of the nodes the equivalent connects
+
+    def __str__(self):
+        unit = UNITS[self.kind]
+        if self.operation == 'series':
+            return (f"{self.name} = {' + '.join(self.parts)} = {format_value(self.value, unit)} "
+                    f"(series, removes node {self.node})")
+        if self.operation == 'parallel':
+            return (f"{self.name} = {' || '.join(self.parts)} = {format_value(self.value, unit)} "
+                    f"(parallel between {self.ends[0]} and {self.ends[1]})")
+        if self.operation == 'star':
+            delta = ', '.join(f"{name} = {format_value(value, unit)} ({a}-{b})" for name, value, (a, b)
+                              in zip(self.name, self.value, self._delta_ends()))
+            return f"Star {', '.join(self.parts)} at node {self.node} becomes delta {delta}"
+        if self.operation == 'dead end':
+            return f"{self.parts[0]} carries no current (dead end at node {self.node}), removed"
+        return f"{self.parts[0]} has both ends on node {self.node}, removed"
+
+    def _delta_ends(self):
+        ends = self.ends
+        return [(ends[0], ends[1]), (ends[1], ends[2]), (ends[2], ends[0])]
+
+    def __repr__(self):
+        return f"ReductionStep({self})"
+
+
+class Reduction:
+    """A circuit with its series/parallel sections collapsed, and how to undo it.
+
+    circuit is the reduced circuit: the equivalent elements replace the
+    parts they combine and the nodes in between are gone. steps lists every
+    simplification in order, for display. solve() solves the reduced
+    circuit and back-substitutes the removed nodes and inductor currents,
+    giving the DC solution of the original circuit.
+    """
+
+    def __init__(self, original, circuit, steps, undo):
+        self.original = original
+        self.circuit = circuit
+        self.steps = steps
+        self._undo = undo  # Per step, what back-substitution needs (node indices of the original)
+
+    def __len__(self):
+        return len(self.steps)
+
+    def solve(self):
+        original, circuit = self.original, self.circuit
+        solution = solve_dc(circuit)
+        voltages = {-1: 0.0}
+        for name, index in original.nodes.items():
+            if name in circuit.nodes:
+                voltages[index] = solution.voltage(name)
+        currents = {name: solution.current(name) for name in circuit.inductors.names}
+
+        for undo in reversed(self._undo):
+            operation = undo[0]
+            if operation == 'series':
+                _, node, x, y, parts, signs, name, share = undo
+                voltages[node] = voltages[x] - (voltages[x] - voltages[y]) * share
+                if name in currents:
+                    current = currents.pop(name)
+                    for part, sign in zip(parts, signs):
+                        currents[part] = sign * current
+            elif operation == 'parallel':
+                _, parts, signs, name, share = undo
+                if name in currents:
+                    current = currents.pop(name)
+                    for part, sign, fraction in zip(parts, signs, (1.0 - share, share)):
+                        currents[part] = sign * fraction * current
+            elif operation == 'star':
+                _, node, ends, conductances = undo
+                voltages[node] = sum(g * voltages[end] for g, end in zip(conductances, ends)) / sum(conductances)
+            elif operation == 'dead end':
+                _, node, other, part = undo
+                voltages[node] = voltages[other]
+                currents[part] = 0.0
+            else:
+                currents[undo[1]] = 0.0
+
+        x = np.zeros(original.size)
+        for index, voltage in voltages.items():
+            if index >= 0:
+                x[index] = voltage
+        for table in (original.vsources, original.vcvs, original.ccvs, original.transformers):
+            for name in table.names:
+                x[original.unknown_index(name)] = solution.x[circuit.unknown_index(name)]
+        for name in original.inductors.names:
+            x[original.unknown_index(name)] = currents.get(name, 0.0)
+        return DCSolution(original, x)
+
+
+def _protected_nodes(circuit):
+    """Ground and every node touched by something other than a resistor, capacitor or inductor"""
+    nodes = {-1}
+    for table in (circuit.vsources, circuit.isources):
+        nodes.update(table.a)
+        nodes.update(table.b)
+    for table in (circuit.diodes, circuit.bjts, circuit.mosfets, circuit.vcvs, circuit.vccs,
+                  circuit.ccvs, circuit.cccs, circuit.transformers):
+        for terminals in table.nodes:
+            nodes.update(terminals)
+    return nodes
+
+
+def reduce_circuit(circuit, star_delta=False):
+    """Collapse series and parallel resistors, capacitors and inductors of a circuit.
+
+    Elements of one kind in parallel, or in series through a node nothing
+    else touches, are replaced by their equivalent, numbered as in a
+    worked example ('Req1', 'Ceq2', ...). Elements hanging off a dead end or shorted onto one
+    node are dropped. With star_delta, a node joining exactly three
+    resistors is turned into a delta between their far ends, which lets
+    bridges reduce further. Nodes touched by sources, semiconductors or
+    controlled sources are kept, so the result has the same behaviour
+    at every remaining node. Returns a Reduction.
+    """
+    kinds, names, a, b, values = [], [], [], [], []
+    for kind, attribute in PASSIVE_TABLES:
+        table = getattr(circuit, attribute)
+        kinds += [kind] * len(table)
+        names += table.names
+        a += table.a
+        b += table.b
+        values += table.values
+    alive = [False] * len(names)  # Set as each element joins the network
+    incident = collections.defaultdict(set)  # Node -> edges (element rows) touching it
+    between = {}  # (kind, node, node) -> the edge of that kind between two nodes
+    protected = _protected_nodes(circuit)
+    node_names = {index: name for name, index in circuit.nodes.items()}
+    node_names[-1] = '0'
+    steps = []
+    undo = []
+    removed = set()
+    taken = set(names)
+    counter = itertools.count(1)
+    pending = collections.deque()
+    queued = set()
+
+    def revisit(*nodes):
+        for node in nodes:
+            if node not in queued and node not in protected:
+                queued.add(node)
+                pending.append(node)
+
+    def other(edge, node):
+        return b[edge] if a[edge] == node else a[edge]
+
+    def pair(edge):
+        return (kinds[edge], min(a[edge], b[edge]), max(a[edge], b[edge]))
+
+    def drop(edge):
+        alive[edge] = False
+        incident[a[edge]].discard(edge)
+        incident[b[edge]].discard(edge)
+        if between.get(pair(edge)) == edge:
+            del between[pair(edge)]
+        revisit(a[edge], b[edge])
+
+    def add(kind, x, y, value):
+        """Append an equivalent element; connect() it afterwards"""
+        name = f"{kind}eq{next(counter)}"
+        while name in taken:
+            name = f"{kind}eq{next(counter)}"
+        kinds.append(kind)
+        names.append(name)
+        a.append(x)
+        b.append(y)
+        values.append(value)
+        alive.append(False)
+        return len(names) - 1
+
+    def connect(edge):
+        """Join an element to the network, merging it with one already in parallel"""
+        if a[edge] == b[edge]:
+            steps.append(ReductionStep('shorted', kinds[edge], [names[edge]], node=node_names[a[edge]]))
+            undo.append(('shorted', names[edge]))
+            revisit(a[edge])
+            return
+        first = between.get(pair(edge))
+        if first is None:
+            alive[edge] = True
+            incident[a[edge]].add(edge)
+            incident[b[edge]].add(edge)
+            between[pair(edge)] = edge
+            revisit(a[edge], b[edge])
+            return
+        kind = kinds[edge]
+        value = _parallel_value(kind, values[first], values[edge])
+        share = _share(kind, values[first], values[edge])
+        signs = (1.0, 1.0 if a[edge] == a[first] else -1.0)
+        drop(first)
+        merged = add(kind, a[first], b[first], value)
+        steps.append(ReductionStep('parallel', kind, [names[first], names[edge]], names[merged], value,
+                                   ends=(node_names[a[first]], node_names[b[first]])))
+        undo.append(('parallel', (names[first], names[edge]), signs, names[merged], share))
+        connect(merged)
+
+    for edge in range(len(names)):
+        connect(edge)
+
+    while pending:
+        node = pending.popleft()
+        queued.discard(node)
+        if node in removed:
+            continue
+        edges = sorted(incident[node])
+        if len(edges) == 1:
+            edge = edges[0]
+            far = other(edge, node)
+            drop(edge)
+            removed.add(node)
+            steps.append(ReductionStep('dead end', kinds[edge], [names[edge]], node=node_names[node]))
+            undo.append(('dead end', node, far, names[edge]))
+        elif len(edges) == 2 and kinds[edges[0]] == kinds[edges[1]]:
+            first, second = edges
+            kind = kinds[first]
+            x, y = other(first, node), other(second, node)
+            value = _series_value(kind, values[first], values[second])
+            # Inductor currents of the parts follow the equivalent, which runs from x to y
+            signs = (1.0 if a[first] == x else -1.0, 1.0 if b[second] == y else -1.0)
+            share = _share(kind, values[first], values[second])
+            drop(first)
+            drop(second)
+            removed.add(node)
+            merged = add(kind, x, y, value)
+            steps.append(ReductionStep('series', kind, [names[first], names[second]], names[merged], value,
+                                       node=node_names[node], ends=(node_names[x], node_names[y])))
+            undo.append(('series', node, x, y, (names[first], names[second]), signs, names[merged], share))
+            connect(merged)
+        elif star_delta and len(edges) == 3 and all(kinds[edge] == 'R' for edge in edges):
+            ends = [other(edge, node) for edge in edges]
+            r = [values[edge] for edge in edges]
+            for edge in edges:
+                drop(edge)
+            removed.add(node)
+            numerator = r[0] * r[1] + r[1] * r[2] + r[2] * r[0]
+            delta = [add('R', ends[i], ends[j], numerator / r[k]) for i, j, k in ((0, 1, 2), (1, 2, 0), (2, 0, 1))]
+            steps.append(ReductionStep('star', 'R', [names[edge] for edge in edges], [names[edge] for edge in delta],
+                                       [values[edge] for edge in delta], node=node_names[node],
+                                       ends=tuple(node_names[end] for end in ends)))
+            undo.append(('star', node, ends, [1.0 / value for value in r]))
+            for edge in delta:
+                connect(edge)
+
+    reduced = _reduced_circuit(circuit, removed, kinds, names, a, b, values, alive)
+    logger.info(f"Reduced {circuit.size} unknowns to {reduced.size} in {len(steps)} steps")
+    return Reduction(circuit, reduced, steps, undo)
+
+
+def _reduced_circuit(circuit, removed, kinds, names, a, b, values, alive):
+    """Copy of circuit without the removed nodes, with the surviving passives"""
+    # The passive tables are rebuilt below; the memo stops deepcopy from copying them first
+    reduced = copy.deepcopy(circuit, {id(getattr(circuit, attribute)): ElementTable()
+                                      for _, attribute in PASSIVE_TABLES})
+    renumber = {-1: -1}
+    reduced.nodes = {}
+    for name, index in circuit.nodes.items():
+        if index not in removed:
+            renumber[index] = reduced.nodes[name] = len(reduced.nodes)
+    for table in (reduced.vsources, reduced.isources):
+        table.a = [renumber[node] for node in table.a]
+        table.b = [renumber[node] for node in table.b]
+    for table in (reduced.diodes, reduced.bjts, reduced.mosfets, reduced.vcvs, reduced.vccs,
+                  reduced.ccvs, reduced.cccs, reduced.transformers):
+        table.nodes = [tuple(renumber[node] for node in terminals) for terminals in table.nodes]
+    tables = {kind: getattr(reduced, attribute) for kind, attribute in PASSIVE_TABLES}
+    for edge, kind in enumerate(kinds):
+        if alive[edge]:
+            tables[kind].append(names[edge], renumber[a[edge]], renumber[b[edge]], values[edge])
+    return reduced
@@ -0,0 +1,257 @@
+"""Schematic model: placed components, their pins and reference designators"""
+import itertools
+import logging
+
+from .connectivity import Connectivity
+from .spatial import SpatialIndex
+
+logger = logging.getLogger(__name__)
+
+
+class Pin:
+    """Connection point of a placed component"""
+
+    __slots__ = ('component', 'name', 'offset', 'net')
+
+    def __init__(self, component, name, offset, net=None):
+        self.component = component  # Owning component id
+        self.name = name  # Pin name from the library symbol, e.g. '1'
+        self.offset = offset  # (dx, dy) from the component origin
+        self.net = net  # Net id once connectivity has been extracted
+
+    def __repr__(self):
+        return f"Pin({self.component}, {self.name!r}, {self.offset})"
+
+
+class Wire:
+    """Straight wire segment between two points"""
+
+    __slots__ = ('id', 'start', 'end', 'items')
+
+    def __init__(self, wire_id, start, end, items=()):
+        self.id = wire_id
+        self.start = start  # (x, y)
+        self.end = end
+        self.items = tuple(items)  # Canvas items drawn for the wire
+
+    def __repr__(self):
+        return f"Wire({self.id}, {self.start}, {self.end})"
+
+
+class Component:
+    """One placed part.
+
+    Slotted so that tens of thousands of parts stay cheap to keep resident.
+    The GUI stores the canvas items it drew in symbol, name and value (the
+    designator and value labels); name_text and value_text hold the label
+    strings, and name_hidden and value_hidden whether those labels are
+    shown. attributes holds per-part overrides of the library SPICE
+    attributes (SPICEMODEL, SPICEEXTRA, ...).
+    """
+
+    __slots__ = ('id', 'type', 'name_text', 'value_text', 'origin', 'pins',
+                 'symbol', 'name', 'value', 'name_hidden', 'value_hidden', 'attributes')
+
+    def __init__(self, component_id, component_type, name_text, origin, value_text=None,
+                 pins=(), symbol=(), name=(), value=(), attributes=None):
+        self.id = component_id
+        self.type = component_type  # Library symbol name
+        self.name_text = name_text  # Reference designator such as 'R3'
+        self.value_text = value_text  # SPICE value such as '4k7', if any
+        self.origin = origin
+        self.pins = tuple(Pin(component_id, pin_name, offset) for pin_name, offset in pins)
+        self.symbol = tuple(symbol)
+        self.name = tuple(name)
+        self.value = tuple(value)
+        self.name_hidden = False
+        self.value_hidden = False
+        self.attributes = attributes  # None unless the part overrides library attributes
+
+    def items(self):
+        """Every canvas item drawn for the component"""
+        return self.symbol + self.name + self.value
+
+    def pin_positions(self):
+        """{pin name: (x, y)} of the connection points"""
+        x, y = self.origin
+        return {pin.name: (x + pin.offset[0], y + pin.offset[1]) for pin in self.pins}
+
+    def __repr__(self):
+        return f"Component({self.id}, {self.type!r}, {self.name_text!r}, {self.origin})"
+
+
+class Schematic:
+    """Placed components of a drawing, independent of any canvas.
+
+    Components are stored by their stable id, which makes lookups and
+    removals O(1), and their canvas items are mapped back to them, so a
+    clicked item resolves in O(1). Components given a bounding box are kept
+    in a spatial index, so hit tests and box selection only look at nearby
+    components. Pin and wire endpoints feed a Connectivity tracker, which
+    keeps the nets up to date as parts are added, moved and removed.
+    """
+
+    def __init__(self, cell_size=64.0, tolerance=0.5):
+        self.components = {}  # Component id -> Component, in placement order
+        self.wires = {}  # Wire id -> Wire
+        self.counters = {}  # Symbol name -> highest designator number in use
+        self.index = SpatialIndex(cell_size)
+        self.connectivity = Connectivity(tolerance)
+        self.items = {}  # Canvas item -> component id
+        self.wire_items = {}  # Canvas item -> wire id
+        self._ids = itertools.count(1)  # Shared by components and wires
+
+    def next_name(self, component_type):
+        """Reserve and return the next designator for a symbol, e.g. 'R4'"""
+        count = self.counters.get(component_type, 0) + 1
+        self.counters[component_type] = count
+        return f"{component_type}{count}"
+
+    def add(self, component_type, origin, name_text=None, bounds=None, **fields):
+        """Create a Component; fields are passed on (value_text, pins, symbol, ...)"""
+        if name_text is None:
+            name_text = self.next_name(component_type)
+        component = Component(next(self._ids), component_type, name_text, origin, **fields)
+        self.insert(component, bounds)
+        return component
+
+    def insert(self, component, bounds=None):
+        """Add an existing Component, e.g. one put back by undo; it keeps its id"""
+        self.components[component.id] = component
+        for item in component.items():
+            self.items[item] = component.id
+        if bounds is not None:
+            self.set_bounds(component, bounds)
+        self.connectivity.add_component(component)
+        # A restored designator may be above the counter again
+        self._count(component)
+
+    def _count(self, component):
+        """Raise the designator counter of the component's symbol to its number, e.g. 7 for 'R7'"""
+        try:
+            number = int(component.name_text[len(component.type):])
+        except ValueError:
+            return
+        if number > self.counters.get(component.type, 0):
+            self.counters[component.type] = number
+
+    def add_many(self, rows):
+        """Add components from (type, name_text, value_text, origin, pins, attributes) rows.
+
+        The bulk form of add() used when loading a file: connectivity points
+        are added in one pass and no bounds or canvas items are set (see
+        set_items). Designator counters follow the names loaded. Returns the
+        components.
+        """
+        components = []
+        for component_type, name_text, value_text, origin, pins, attributes in rows:
+            component = Component(next(self._ids), component_type, name_text, origin,
+                                  value_text=value_text, pins=pins, attributes=attributes)
+            self.components[component.id] = component
+            self._count(component)
+            components.append(component)
+        self.connectivity.add_components(components)
+        return components
+
+    def set_items(self, component, symbol=(), name=(), value=(), bounds=None):
+        """Attach the canvas items drawn for a component (and its bounding box)"""
+        for item in component.items():
+            self.items.pop(item, None)
+        component.symbol = tuple(symbol)
+        component.name = tuple(name)
+        component.value = tuple(value)
+        for item in component.items():
+            self.items[item] = component.id
+        if bounds is not None:
+            self.set_bounds(component, bounds)
+
+    def add_wire(self, start, end, items=()):
+        """Add a wire from start to end (x, y); its endpoints join nets"""
+        wire = Wire(next(self._ids), tuple(start), tuple(end), items)
+        self.insert_wire(wire)
+        return wire
+
+    def insert_wire(self, wire):
+        """Add an existing Wire, e.g. one put back by undo"""
+        self.wires[wire.id] = wire
+        for item in wire.items:
+            self.wire_items[item] = wire.id
+        self.connectivity.add_wire(wire.id, *wire.start, *wire.end)
+
+    def remove_wire(self, wire):
+        del self.wires[wire.id]
+        for item in wire.items:
+            self.wire_items.pop(item, None)
+        self.connectivity.remove_wire(wire.id)
+
+    def wire_owner(self, item):
+        """Wire that drew a canvas item, or None"""
+        wire_id = self.wire_items.get(item)
+        return None if wire_id is None else self.wires[wire_id]
+
+    def set_bounds(self, component, bounds):
+        """Register (or update) the bounding box (x1, y1, x2, y2) of a component"""
+        self.index.insert(component.id, bounds)
+
+    def move(self, component, dx, dy):
+        x, y = component.origin
+        component.origin = (x + dx, y + dy)
+        if component.id in self.index:
+            self.index.move(component.id, dx, dy)
+        self.connectivity.move_component(component)
+
+    def nets(self):
+        """Current nets (see Connectivity.nets); also sets Pin.net"""
+        nets = self.connectivity.nets()
+        for component in self.components.values():
+            for pin in component.pins:
+                pin.net = self.connectivity.net_of.get((component.id, pin.name))
+        return nets
+
+    def find(self, bounds):
+        """Components whose bounding boxes intersect bounds"""
+        return [self.components[key] for key in self.index.query(bounds)]
+
+    def find_at(self, x, y, tolerance=0.0):
+        return [self.components[key] for key in self.index.query_point(x, y, tolerance)]
+
+    def get(self, component_id):
+        return self.components.get(component_id)
+
+    def owner(self, item):
+        """Component that drew a canvas item, or None"""
+        component_id = self.items.get(item)
+        return None if component_id is None else self.components[component_id]
+
+    def remove(self, component):
+        del self.components[component.id]
+        self.index.remove(component.id)
+        for item in component.items():
+            self.items.pop(item, None)
+        self.connectivity.remove_component(component)
+        # Decrement component counter if it was the last one
+        component_type = component.type
+        try:
+            component_number = int(component.name_text[len(component_type):])
+        except ValueError:
+            return
+        if component_number == self.counters.get(component_type, 0):
+            self.counters[component_type] = component_number - 1
+
+    def clear(self):
+        self.components.clear()
+        self.wires.clear()
+        self.counters.clear()
+        self.index.clear()
+        self.connectivity.clear()
+        self.items.clear()
+        self.wire_items.clear()
+
+    def __iter__(self):
+        return iter(self.components.values())
+
+    def __contains__(self, component):
+        return component.id in self.components
+
+    def __len__(self):
+        return len(self.components)
@@ -0,0 +1,265 @@
+"""Native schematic file format: columnar binary tables behind a JSON header.
+
+Layout::
+
+    magic (8 bytes) | version (u32) | header length (u32) | JSON header | tables
+
+The header lists every table with its numpy dtype, its byte offset from
+the start of the tables and its row count. Tables start on 8-byte
+boundaries, so SchematicFile maps the file and views each table in place
+with np.frombuffer; nothing is parsed until a column is read. Strings
+(symbol names, designators, values) are stored once in a UTF-8 pool and
+referenced by index.
+"""
+import gc
+import json
+import logging
+import mmap
+
+import numpy as np
+
+from .schematic import Schematic
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'PYCCSCH\0'
+VERSION = 1
+ALIGNMENT = 8
+_PREAMBLE = 16  # magic, version and header length
+
+COMPONENT_DTYPE = np.dtype([
+    ('type', '<i4'),  # String pool indices; value is -1 when unset
+    ('name', '<i4'),
+    ('value', '<i4'),
+    ('pin_count', '<i4'),
+    ('pin_start', '<i8'),  # First row of the component in the pins table
+    ('x', '<f8'),
+    ('y', '<f8'),
+])
+PIN_DTYPE = np.dtype([('name', '<i4'), ('dx', '<f8'), ('dy', '<f8')])
+WIRE_DTYPE = np.dtype([('x1', '<f8'), ('y1', '<f8'), ('x2', '<f8'), ('y2', '<f8')])
+
+
+class SchematicFormatError(ValueError):
+    """Raised for files that are not schematics of a supported version"""
+
+
+class _StringPool:
+    def __init__(self):
+        self.strings = []
+        self.index = {}
+
+    def add(self, text):
+        if text is None:
+            return -1
+        position = self.index.get(text)
+        if position is None:
+            position = self.index[text] = len(self.strings)
+            self.strings.append(text)
+        return position
+
+    def tables(self):
+        encoded = [text.encode('utf-8') for text in self.strings]
+        offsets = np.zeros(len(encoded) + 1, dtype='<i8')
+        np.cumsum([len(data) for data in encoded], out=offsets[1:])
+        return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+
+def schematic_tables(schematic):
+    """Columnar tables {name: array} of a schematic"""
+    strings = _StringPool()
+    components = np.empty(len(schematic), dtype=COMPONENT_DTYPE)
+    pin_rows = []
+    attributes = {}
+    for row, component in enumerate(schematic):
+        components[row] = (
+            strings.add(component.type), strings.add(component.name_text),
+            strings.add(component.value_text), len(component.pins), len(pin_rows),
+            component.origin[0], component.origin[1],
+        )
+        for pin in component.pins:
+            pin_rows.append((strings.add(pin.name), pin.offset[0], pin.offset[1]))
+        if component.attributes:
+            attributes[str(row)] = component.attributes
+
+    wires = np.array([(*wire.start, *wire.end) for wire in schematic.wires.values()], dtype=WIRE_DTYPE)
+    string_data, string_offsets = strings.tables()
+    return {
+        'components': components,
+        'pins': np.array(pin_rows, dtype=PIN_DTYPE),
+        'wires': wires,
+        'strings': string_data,
+        'string_offsets': string_offsets,
+        # Per-part attribute overrides are rare; keep them as a JSON blob
+        'attributes': np.frombuffer(json.dumps(attributes).encode('utf-8'), dtype=np.uint8),
+    }
+
+
+def _aligned(size):
+    return -(-size // ALIGNMENT) * ALIGNMENT
+
+
+def save_schematic(schematic, path, meta=None):
+    """Write schematic to path; meta is a JSON-serializable dict (view settings, ...)"""
+    tables = schematic_tables(schematic)
+    sections = {}
+    offset = 0
+    for name, array in tables.items():
+        dtype = array.dtype.descr if array.dtype.names else array.dtype.str
+        sections[name] = {'dtype': dtype, 'offset': offset, 'count': len(array)}
+        offset = _aligned(offset + array.nbytes)
+    header = json.dumps({'meta': meta or {}, 'sections': sections}).encode('utf-8')
+    header += b' ' * (_aligned(_PREAMBLE + len(header)) - _PREAMBLE - len(header))
+
+    with open(path, 'wb') as stream:
+        stream.write(MAGIC)
+        stream.write(np.array([VERSION, len(header)], dtype='<u4').tobytes())
+        stream.write(header)
+        position = 0
+        for name, array in tables.items():
+            stream.write(b'\0' * (sections[name]['offset'] - position))
+            stream.write(array.tobytes())
+            position = sections[name]['offset'] + array.nbytes
+    logger.info(f"Saved {len(schematic)} components and {len(schematic.wires)} wires to {path}")
+
+
+class SchematicFile:
+    """Read-only, memory-mapped view of a saved schematic.
+
+    components, pins and wires are numpy record arrays backed by the file;
+    strings are decoded on first use. to_schematic() builds a Schematic from
+    the tables, e.g. for netlist export without a GUI.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as stream:
+            try:
+                self._map = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # Empty file
+                raise SchematicFormatError(f"{path} is not a schematic file") from None
+        if self._map[:len(MAGIC)] != MAGIC:
+            self._map.close()
+            raise SchematicFormatError(f"{path} is not a schematic file")
+        version, header_length = np.frombuffer(self._map, dtype='<u4', count=2, offset=len(MAGIC)).tolist()
+        if version > VERSION:
+            self._map.close()
+            raise SchematicFormatError(f"{path} has format version {version}, newer than {VERSION}")
+        header = json.loads(bytes(self._map[_PREAMBLE:_PREAMBLE + header_length]))
+        self.meta = header['meta']
+        self._sections = header['sections']
+        self._base = _PREAMBLE + header_length
+        self._strings = None
+
+    def table(self, name):
+        section = self._sections[name]
+        dtype = np.dtype([tuple(field) for field in section['dtype']]) \
+            if isinstance(section['dtype'], list) else np.dtype(section['dtype'])
+        return np.frombuffer(self._map, dtype=dtype, count=section['count'],
+                             offset=self._base + section['offset'])
+
+    @property
+    def components(self):
+        return self.table('components')
+
+    @property
+    def pins(self):
+        return self.table('pins')
+
+    @property
+    def wires(self):
+        return self.table('wires')
+
+    @property
+    def strings(self):
+        if self._strings is None:
+            data = self.table('strings').tobytes()
+            offsets = self.table('string_offsets').tolist()
+            self._strings = [data[start:end].decode('utf-8') for start, end in zip(offsets, offsets[1:])]
+        return self._strings
+
+    @property
+    def attributes(self):
+        """{component row: attribute overrides}"""
+        return {int(row): value for row, value in json.loads(self.table('attributes').tobytes()).items()}
+
+    def rows(self):
+        """(type, name, value, (x, y), [(pin name, (dx, dy)), ...], attributes) per component"""
+        strings = self.strings
+        pins = self.pins
+        pin_names = [strings[index] for index in pins['name'].tolist()]
+        pin_offsets = list(zip(pins['dx'].tolist(), pins['dy'].tolist()))
+        attributes = self.attributes
+        components = self.components
+        for row, (type_index, name_index, value_index, start, count, x, y) in enumerate(zip(
+                components['type'].tolist(), components['name'].tolist(), components['value'].tolist(),
+                components['pin_start'].tolist(), components['pin_count'].tolist(),
+                components['x'].tolist(), components['y'].tolist())):
+            yield (strings[type_index], strings[name_index],
+                   strings[value_index] if value_index >= 0 else None, (x, y),
+                   list(zip(pin_names[start:start + count], pin_offsets[start:start + count])),
+                   attributes.get(row))
+
+    def to_schematic(self, schematic=None):
+        """Add every component and wire to schematic (a new one by default)"""
+        if schematic is None:
+            schematic = Schematic()
+        # Only new objects are created here; pausing the cyclic collector
+        # keeps it from rescanning them over and over
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            schematic.add_many(self.rows())
+            for x1, y1, x2, y2 in self.wires.tolist():
+                schematic.add_wire((x1, y1), (x2, y2))
+        finally:
+            if enabled:
+                gc.enable()
+        return schematic
+
+    def close(self):
+        try:
+            self._map.close()
+        except BufferError:
+            # Table views handed out are still alive; the map is released with the last of them
+            logger.debug(f"{self.path} stays mapped until its table views are released")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self._sections['components']['count']
+
+
+def load_schematic(path):
+    """Read a schematic file into a new Schematic"""
+    with SchematicFile(path) as schematic_file:
+        schematic = schematic_file.to_schematic()
+    logger.info(f"Loaded {len(schematic)} components and {len(schematic.wires)} wires from {path}")
+    return schematic
+
+
+def export_json(schematic, target, meta=None):
+    """Write schematic as JSON to a path or an open text stream"""
+    document = {
+        'version': VERSION,
+        'meta': meta or {},
+        'components': [{
+            'type': component.type,
+            'name': component.name_text,
+            'value': component.value_text,
+            'origin': list(component.origin),
+            'pins': [{'name': pin.name, 'offset': list(pin.offset)} for pin in component.pins],
+            'attributes': component.attributes,
+        } for component in schematic],
+        'wires': [{'start': list(wire.start), 'end': list(wire.end)} for wire in schematic.wires.values()],
+    }
+    if hasattr(target, 'write'):
+        json.dump(document, target, indent=1)
+        return
+    with open(target, 'w', encoding='utf-8') as stream:
+        json.dump(document, stream, indent=1)
+    logger.info(f"Exported {len(schematic)} components as JSON to {target}")
@@ -0,0 +1,212 @@
+"""Adjoint sensitivities: the derivative of one output with respect to every element value"""
+import logging
+
+import numpy as np
+from scipy.sparse.linalg import splu
+
+from .ac import assemble_ac_rhs
+from .mna import DCSolver, SingularCircuitError, assemble_dc, assemble_reactive
+from .schematic import Schematic
+from .sweeps import _schematic_circuit
+
+logger = logging.getLogger(__name__)
+
+# Tables whose element values have a sensitivity, in the order of element_names()
+VALUE_TABLES = ('resistors', 'capacitors', 'inductors', 'vsources', 'isources')
+GAIN_TABLES = (('vcvs', 'GAIN'), ('vccs', 'GAIN'), ('ccvs', 'GAIN'), ('cccs', 'GAIN'),
+               ('transformers', 'RATIO'))
+
+
+class Sensitivities:
+    """d(output)/d(value) of every element, one column per id.
+
+    ids are element names for a Circuit, or the component ids of a
+    Schematic in placement order (NaN for parts without a value, such as
+    grounds and semiconductors). values has one entry per id for DC, and one
+    row per frequency for AC; response is the output itself, which relative
+    uses to give (value / output) * d(output)/d(value), the percent change of
+    the output per percent change of each value.
+    """
+
+    def __init__(self, ids, values, nominal, output, response, frequencies=None):
+        self.ids = ids
+        self.values = values
+        self.nominal = nominal  # Element values the derivatives were taken at
+        self.output = output
+        self.response = response
+        self.frequencies = frequencies
+        self._columns = {element_id: i for i, element_id in enumerate(ids)}
+
+    def __getitem__(self, element_id):
+        return self.values[..., self._columns[element_id]]
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def relative(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.values * self.nominal / np.asarray(self.response)[..., None]
+
+
+def element_names(circuit):
+    """Names of every element with a value: passives, sources, then controlled-source gains"""
+    names = []
+    for attribute in VALUE_TABLES:
+        names += getattr(circuit, attribute).names
+    for attribute, _ in GAIN_TABLES:
+        names += getattr(circuit, attribute).names
+    return names
+
+
+def element_values(circuit):
+    """Values of element_names(circuit), as one array"""
+    values = [getattr(circuit, attribute).values for attribute in VALUE_TABLES]
+    values += [getattr(circuit, attribute).parameters[parameter] for attribute, parameter in GAIN_TABLES]
+    return np.concatenate([np.asarray(column, dtype=float) for column in values])
+
+
+def _adjoint(circuit, x, adjoint, s=0.0, phases=None):
+    """d(output)/d(value) for element_names(circuit), given the solution x and the adjoint solution.
+
+    With A x = b and output c^T x, A^T adjoint = c gives
+    d(output)/dp = adjoint^T (db/dp - dA/dp x) for every parameter p at
+    once. s is the Laplace variable (0 at DC); phases scales the source
+    terms by each source's AC phasor direction.
+    """
+    # Index -1 (ground) reads the trailing zero
+    x = np.append(x, 0.0)
+    adjoint = np.append(adjoint, 0.0)
+    parts = []
+
+    a, b, r = circuit.resistors.arrays()
+    parts.append((adjoint[a] - adjoint[b]) * (x[a] - x[b]) / r ** 2)
+    a, b, _ = circuit.capacitors.arrays()
+    parts.append(-s * (adjoint[a] - adjoint[b]) * (x[a] - x[b]))
+    rows = circuit.inductor_offset + np.arange(len(circuit.inductors))
+    parts.append(s * adjoint[rows] * x[rows])
+    a, b, _ = circuit.isources.arrays()
+    sources = [adjoint[circuit.num_nodes + np.arange(len(circuit.vsources))], adjoint[b] - adjoint[a]]
+    if phases is not None:
+        sources = [term * phase for term, phase in zip(sources, phases)]
+    parts += sources
+
+    # Branch rows of VCVS, CCVS and transformers, in that order
+    start = circuit.controlled_offset
+    vcvs_rows = start + np.arange(len(circuit.vcvs))
+    ccvs_rows = start + len(circuit.vcvs) + np.arange(len(circuit.ccvs))
+    transformer_rows = start + len(circuit.vcvs) + len(circuit.ccvs) + np.arange(len(circuit.transformers))
+    _, _, cp, cm = circuit.vcvs.arrays()[0].T
+    parts.append(adjoint[vcvs_rows] * (x[cp] - x[cm]))
+    p, m, cp, cm = circuit.vccs.arrays()[0].T
+    parts.append(-(adjoint[p] - adjoint[m]) * (x[cp] - x[cm]))
+    parts.append(adjoint[ccvs_rows] * x[circuit.ccvs.control_rows(circuit)])
+    p, m = circuit.cccs.arrays()[0].T
+    parts.append(-(adjoint[p] - adjoint[m]) * x[circuit.cccs.control_rows(circuit)])
+    p1, p2, _, _ = circuit.transformers.arrays()[0].T
+    parts.append(adjoint[transformer_rows] * (x[p1] - x[p2]) + (adjoint[p1] - adjoint[p2]) * x[transformer_rows])
+    return np.concatenate(parts)
+
+
+def _prepare(circuit, output):
+    """Circuit of a Circuit or Schematic, the row of output, and the schematic (or None)"""
+    schematic = None
+    pin_nodes = {}
+    if isinstance(circuit, Schematic):
+        schematic = circuit
+        circuit, pin_nodes = _schematic_circuit(schematic)
+    if circuit.is_nonlinear:
+        raise ValueError("Sensitivities need a linear circuit")
+    output = str(output)
+    row = circuit.unknown_index(pin_nodes.get(output, output))
+    if row < 0:
+        raise ValueError(f"Output {output} is the ground node")
+    return circuit, row, schematic
+
+
+def _align(circuit, values, nominal, schematic):
+    """Element columns as they are, or rearranged by schematic component id"""
+    names = element_names(circuit)
+    if schematic is None:
+        return names, values, nominal
+    ids = [component.id for component in schematic]
+    column = {name: i for i, name in enumerate(names)}
+    take = np.array([column.get(component.name_text, -1) for component in schematic], dtype=np.int64)
+    missing = take < 0
+    values = values[..., take]
+    values[..., missing] = np.nan
+    nominal = nominal[take]
+    nominal[missing] = np.nan
+    return ids, values, nominal
+
+
+def dc_sensitivities(circuit, output, solver=None):
+    """Sensitivity of a DC output (node voltage, source current or schematic pin) to every value.
+
+    Costs one transpose solve with the LU factorization of solver (a
+    DCSolver of this very circuit, whose factorization is reused as it
+    stands), instead of one re-solve per element. circuit may be a
+    Schematic, without a solver; the result is then aligned with its
+    component ids.
+    """
+    if solver is not None:
+        if isinstance(circuit, Schematic):
+            raise ValueError("A solver cannot be reused for a schematic; its circuit is built afresh")
+        if solver.circuit is not circuit:
+            raise ValueError("solver was built for a different circuit")
+    circuit, row, schematic = _prepare(circuit, output)
+    if solver is None:
+        solver = DCSolver(circuit)
+    x = solver.solve().x
+    selector = np.zeros(circuit.size)
+    selector[row] = 1.0
+    adjoint = solver.solve_transpose(selector)
+    values = _adjoint(circuit, x, adjoint)
+    ids, values, nominal = _align(circuit, values, element_values(circuit), schematic)
+    return Sensitivities(ids, values, nominal, output, x[row])
+
+
+def ac_sensitivities(circuit, output, frequencies):
+    """Sensitivity of an output phasor to every value, at each frequency.
+
+    One factorization of G + sC per frequency serves both the circuit
+    solution and the transpose (adjoint) solve. Sources are differentiated
+    with respect to their AC amplitude. Returns complex Sensitivities with
+    one row per frequency.
+    """
+    circuit, row, schematic = _prepare(circuit, output)
+    frequencies = np.atleast_1d(np.asarray(frequencies, dtype=float))
+    G = assemble_dc(circuit)[0].astype(complex)
+    C = assemble_reactive(circuit).astype(complex)
+    rhs = assemble_ac_rhs(circuit)
+    phases = [np.ones(len(circuit.vsources), dtype=complex), np.ones(len(circuit.isources), dtype=complex)]
+    for name, phasor in circuit.ac_phasors.items():
+        direction = phasor / abs(phasor) if phasor else 1.0
+        if name in circuit.vsources.index:
+            phases[0][circuit.vsources.index[name]] = direction
+        elif name in circuit.isources.index:
+            phases[1][circuit.isources.index[name]] = direction
+    selector = np.zeros(circuit.size, dtype=complex)
+    selector[row] = 1.0
+
+    nominal = element_values(circuit)
+    # Sources are taken at their AC amplitude rather than their DC value
+    start = len(circuit.resistors) + len(circuit.capacitors) + len(circuit.inductors)
+    for table in (circuit.vsources, circuit.isources):
+        nominal[start:start + len(table)] = [abs(circuit.ac_phasors.get(name, 0.0)) for name in table.names]
+        start += len(table)
+
+    values = np.empty((len(frequencies), len(nominal)), dtype=complex)
+    response = np.empty(len(frequencies), dtype=complex)
+    for i, frequency in enumerate(frequencies):
+        s = 2j * np.pi * frequency
+        try:
+            lu = splu((G + s * C).tocsc())
+        except RuntimeError as e:
+            raise SingularCircuitError(f"MNA matrix is singular at {frequency} Hz ({e})") from e
+        x = lu.solve(rhs)
+        values[i] = _adjoint(circuit, x, lu.solve(selector, trans='T'), s, phases)
+        response[i] = x[row]
+    logger.debug(f"AC sensitivities of {output} to {len(nominal)} values at {len(frequencies)} frequencies")
+    ids, values, nominal = _align(circuit, values, nominal, schematic)
+    return Sensitivities(ids, values, nominal, output, response, frequencies)
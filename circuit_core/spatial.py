@@ -0,0 +1,95 @@
+"""Uniform-grid spatial index over axis-aligned bounding boxes"""
+import math
+
+
+class SpatialIndex:
+    """Bounding boxes hashed into square grid cells.
+
+    Every key is registered in each cell its box overlaps, so a query only
+    looks at the cells under the query box: O(k) for k nearby boxes rather
+    than a scan of everything. Schematic symbols are all of similar size,
+    which is the case a uniform grid handles best.
+    """
+
+    def __init__(self, cell_size=64.0):
+        self.cell_size = float(cell_size)
+        self.boxes = {}  # key -> (x1, y1, x2, y2)
+        self.cells = {}  # (column, row) -> set of keys
+
+    def _cell_range(self, box):
+        x1, y1, x2, y2 = box
+        size = self.cell_size
+        return (math.floor(x1 / size), math.floor(y1 / size),
+                math.floor(x2 / size), math.floor(y2 / size))
+
+    def _cells(self, box):
+        c1, r1, c2, r2 = self._cell_range(box)
+        for column in range(c1, c2 + 1):
+            for row in range(r1, r2 + 1):
+                yield column, row
+
+    def insert(self, key, box):
+        """Add key with box (x1, y1, x2, y2), replacing any previous box"""
+        if key in self.boxes:
+            self.remove(key)
+        x1, y1, x2, y2 = box
+        box = (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+        self.boxes[key] = box
+        for cell in self._cells(box):
+            self.cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key):
+        box = self.boxes.pop(key, None)
+        if box is None:
+            return
+        for cell in self._cells(box):
+            keys = self.cells.get(cell)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.cells[cell]
+
+    def move(self, key, dx, dy):
+        x1, y1, x2, y2 = self.boxes[key]
+        new_box = (x1 + dx, y1 + dy, x2 + dx, y2 + dy)
+        # Only touch the cell sets when the box crosses a cell boundary
+        if self._cell_range(new_box) == self._cell_range(self.boxes[key]):
+            self.boxes[key] = new_box
+        else:
+            self.insert(key, new_box)
+
+    def clear(self):
+        self.boxes.clear()
+        self.cells.clear()
+
+    def query(self, box):
+        """Keys whose boxes intersect box (x1, y1, x2, y2)"""
+        x1, y1, x2, y2 = box
+        x1, x2 = min(x1, x2), max(x1, x2)
+        y1, y2 = min(y1, y2), max(y1, y2)
+        c1, r1, c2, r2 = self._cell_range((x1, y1, x2, y2))
+        if (c2 - c1 + 1) * (r2 - r1 + 1) > len(self.cells):
+            # Huge query box: walking the occupied cells is cheaper
+            candidates = set().union(*self.cells.values()) if self.cells else set()
+        else:
+            candidates = set()
+            for column in range(c1, c2 + 1):
+                for row in range(r1, r2 + 1):
+                    keys = self.cells.get((column, row))
+                    if keys:
+                        candidates |= keys
+        found = []
+        for key in candidates:
+            bx1, by1, bx2, by2 = self.boxes[key]
+            if bx1 <= x2 and bx2 >= x1 and by1 <= y2 and by2 >= y1:
+                found.append(key)
+        return found
+
+    def query_point(self, x, y, tolerance=0.0):
+        return self.query((x - tolerance, y - tolerance, x + tolerance, y + tolerance))
+
+    def __contains__(self, key):
+        return key in self.boxes
+
+    def __len__(self):
+        return len(self.boxes)
@@ -0,0 +1,113 @@
+"""SPICE netlist export of a schematic, streamed line by line"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+GROUND_NET = '0'
+
+# Order of the attribute fields after the nodes of an element line
+FIELD_ATTRIBUTES = ('VNAME', 'SPICEMODEL', 'VALUE', 'SPICEEXTRA')
+
+
+def element_name(component, device):
+    """SPICE element name: the designator with the device prefix in front if missing"""
+    name = component.name_text
+    prefix = device.prefix
+    if prefix and not name.upper().startswith(prefix.upper()):
+        name = prefix + name
+    return name
+
+
+def element_pins(component, device):
+    """Pins of a component in SPICE node order.
+
+    Falls back to the symbol pin order when the library pinmap names other
+    pins than the symbol has (the AMMETER symbol, for one).
+    """
+    pins = {pin.name: pin for pin in component.pins}
+    if device.pins and all(name in pins for name in device.pins):
+        return [pins[name] for name in device.pins]
+    return list(component.pins)
+
+
+def element_attributes(component, device):
+    """Library attributes of the device overridden by those of the part"""
+    attributes = dict(device.attributes)
+    if component.attributes:
+        attributes.update(component.attributes)
+    if component.value_text:
+        attributes['VALUE'] = component.value_text
+    return attributes
+
+
+def iter_netlist(schematic, library, title=None):
+    """Yield the lines of a SPICE netlist for schematic.
+
+    library resolves component types to SpiceDevice records (a
+    LibraryRegistry or SymbolLibrary). Nets holding the pin of a ground
+    symbol (SPICEGROUND) become node 0; the others are named N001, N002,
+    ... in the order they are first used. Models shipped with the library
+    follow the elements, once per model.
+    """
+    schematic.nets()  # Resolve Pin.net
+
+    devices = {}
+    for component in schematic:
+        if component.type not in devices:
+            devices[component.type] = library.device(component.type)
+
+    net_names = {}
+    for component in schematic:
+        device = devices[component.type]
+        if device is not None and device.is_ground:
+            for pin in component.pins:
+                net_names[pin.net] = GROUND_NET
+
+    yield f"* {title or 'Circuit Calculator netlist'}"
+    models = {}
+    count = 0
+    for component in schematic:
+        device = devices[component.type]
+        if device is None:
+            logger.warning(f"No SPICE device for {component.name_text} ({component.type}), skipped")
+            yield f"* {component.name_text}: no SPICE device for {component.type}"
+            continue
+        if device.is_ground:
+            continue
+
+        fields = [element_name(component, device)]
+        for pin in element_pins(component, device):
+            net_name = net_names.get(pin.net)
+            if net_name is None:
+                count += 1
+                net_name = net_names[pin.net] = f"N{count:03d}"
+            fields.append(net_name)
+        attributes = element_attributes(component, device)
+        fields.extend(attributes[name] for name in FIELD_ATTRIBUTES if attributes.get(name))
+        yield ' '.join(fields)
+
+        if device.model and attributes.get('SPICEMODEL') == device.model_name:
+            models.setdefault(device.model_name, device.model)
+
+    for model in models.values():
+        yield from model.splitlines()
+    yield '.end'
+
+
+def write_netlist(schematic, target, library, title=None):
+    """Write the netlist to a path or an open text stream; returns the line count"""
+    if hasattr(target, 'write'):
+        return _write_lines(iter_netlist(schematic, library, title), target)
+    with open(target, 'w', encoding='utf-8') as stream:
+        count = _write_lines(iter_netlist(schematic, library, title), stream)
+    logger.info(f"Wrote {count} netlist lines to {target}")
+    return count
+
+
+def _write_lines(lines, stream):
+    count = 0
+    for line in lines:
+        stream.write(line)
+        stream.write('\n')
+        count += 1
+    return count
@@ -0,0 +1,292 @@
+"""Parameter sweeps and Monte Carlo runs: one circuit, many sets of element values"""
+import concurrent.futures
+import copy
+import logging
+import os
+
+import numpy as np
+from scipy.sparse.linalg import splu
+
+from .mna import (SYMBOL_KINDS, SYMBOL_PINS, Circuit, DCSolver, SingularCircuitError, assemble_dc,
+                  element_value, set_element_value)
+from .nonlinear import NewtonSolver
+from .schematic import Schematic
+
+logger = logging.getLogger(__name__)
+
+GROUND_SYMBOLS = ('0', 'GND')  # Symbols that tie their net to the reference node
+MAX_LOW_RANK = 64  # Most varied resistors handled by the batched low-rank update
+BATCH_BYTES = 64 * 2**20  # Memory budget for one block of batched solutions
+
+
+class SweepResult:
+    """Element values and outputs of every run, one row per run"""
+
+    def __init__(self, names, values, outputs, results, seed=None):
+        self.names = names  # Varied element names
+        self.values = values  # Shape (runs, len(names))
+        self.outputs = outputs
+        self.results = results  # Shape (runs, len(outputs))
+        self.seed = seed  # Entropy that reproduces a Monte Carlo run
+        self._columns = {name: i for i, name in enumerate(outputs)}
+        self._parameters = {name: i for i, name in enumerate(names)}
+
+    def output(self, name):
+        return self.results[:, self._columns[str(name)]]
+
+    def parameter(self, name):
+        return self.values[:, self._parameters[name]]
+
+    @property
+    def mean(self):
+        return self.results.mean(axis=0)
+
+    @property
+    def std(self):
+        return self.results.std(axis=0)
+
+    def __len__(self):
+        return len(self.results)
+
+
+def _schematic_circuit(schematic, ground_symbols=GROUND_SYMBOLS):
+    """Circuit of a schematic and {'R1.2': node name} for every pin"""
+    schematic.nets()  # Resolve Pin.net
+    ground = {pin.net for component in schematic if component.type in ground_symbols
+              for pin in component.pins}
+    node_names = {}
+    pin_nodes = {}
+    circuit = Circuit()
+    for component in schematic:
+        if component.type in ground_symbols:
+            continue
+        if component.type not in SYMBOL_KINDS:
+            logger.warning(f"{component.name_text} ({component.type}) has no simulation model, skipped")
+            continue
+        nodes = []
+        pins = component.pins
+        if component.type in SYMBOL_PINS:
+            by_name = {pin.name: pin for pin in pins}
+            pins = [by_name[name] for name in SYMBOL_PINS[component.type]]
+        for pin in pins:
+            pin_name = f"{component.name_text}.{pin.name}"
+            if pin.net in ground:
+                node = '0'
+            else:
+                # Nets are named after the first pin found on them
+                node = node_names.setdefault(pin.net, pin_name)
+            pin_nodes[pin_name] = node
+            nodes.append(node)
+        attributes = component.attributes or {}
+        value = component.value_text or attributes.get('VALUE')
+        circuit.add_device(component.type, component.name_text, nodes, value, attributes.get('VNAME'))
+    return circuit, pin_nodes
+
+
+def circuit_from_schematic(schematic, ground_symbols=GROUND_SYMBOLS):
+    """Build a Circuit from the simulated parts of a schematic.
+
+    Parts are named by their designators and nodes after the first pin on
+    each net ('R1.2'); nets touching a ground symbol become node 0.
+    """
+    return _schematic_circuit(schematic, ground_symbols)[0]
+
+
+def grid(parameters):
+    """Full factorial combination of {name: values}, as {name: per-run values}"""
+    names = list(parameters)
+    mesh = np.meshgrid(*(np.asarray(parameters[name], dtype=float) for name in names), indexing='ij')
+    return {name: axis.ravel() for name, axis in zip(names, mesh)}
+
+
+def _gather(x, rows):
+    """Output rows of solutions x (size, runs); ground reads as zero"""
+    padded = np.vstack([x, np.zeros((1, x.shape[1]))])
+    return padded[rows].T
+
+
+def _dc_batch(circuit, names, values, rows):
+    """DC operating points of every run from one factorization.
+
+    Source values only change the right-hand side, so all runs are one
+    multi-column solve. Varied resistors are a rank-k change U D U^T of
+    the matrix, applied per run with the Woodbury identity
+    x = x0 - Z D (I + U^T Z D)^-1 U^T x0, Z = A^-1 U, as one stack of
+    k x k solves.
+    """
+    matrix, rhs = assemble_dc(circuit)
+    size = matrix.shape[0]
+    runs = len(values)
+    if size == 0:
+        return np.zeros((runs, len(rows)))
+    try:
+        lu = splu(matrix)
+    except RuntimeError as e:
+        raise SingularCircuitError(f"MNA matrix is singular ({e})") from e
+
+    n = circuit.num_nodes
+    resistor_columns = [j for j, name in enumerate(names) if name in circuit.resistors.index]
+    resistor_rows = np.array([circuit.resistors.index[names[j]] for j in resistor_columns], dtype=np.int64)
+    k = len(resistor_rows)
+    if k:
+        a, b, r = circuit.resistors.arrays()
+        U = np.zeros((size, k))
+        for column, (node_a, node_b) in enumerate(zip(a[resistor_rows], b[resistor_rows])):
+            if node_a >= 0:
+                U[node_a, column] += 1.0
+            if node_b >= 0:
+                U[node_b, column] -= 1.0
+        Z = lu.solve(U)
+        UtZ = U.T @ Z
+        nominal = 1.0 / r[resistor_rows]
+
+    results = np.empty((runs, len(rows)))
+    block = max(1, BATCH_BYTES // (8 * (size + k * k + k)))
+    for start in range(0, runs, block):
+        chunk = values[start:start + block]
+        B = np.repeat(rhs[:, None], len(chunk), axis=1)
+        for j, name in enumerate(names):
+            if name in circuit.vsources.index:
+                B[n + circuit.vsources.index[name]] = chunk[:, j]
+            elif name in circuit.isources.index:
+                row = circuit.isources.index[name]
+                delta = chunk[:, j] - circuit.isources.values[row]
+                if circuit.isources.a[row] >= 0:
+                    B[circuit.isources.a[row]] -= delta
+                if circuit.isources.b[row] >= 0:
+                    B[circuit.isources.b[row]] += delta
+        X = lu.solve(B)
+        if k:
+            D = 1.0 / chunk[:, resistor_columns] - nominal  # (runs, k) conductance changes
+            M = np.eye(k) + UtZ[None, :, :] * D[:, None, :]
+            try:
+                y = np.linalg.solve(M, (U.T @ X).T[..., None])[..., 0]
+            except np.linalg.LinAlgError as e:
+                raise SingularCircuitError(f"MNA matrix is singular for at least one run ({e})") from e
+            X = X - Z @ (D * y).T
+        results[start:start + block] = _gather(X, rows)
+    if not np.all(np.isfinite(results)):
+        raise SingularCircuitError("Sweep produced non-finite values")
+    return results
+
+
+def _run_chunk(circuit, names, values, rows, evaluate):
+    """Runs solved one after another; the unit of work sent to a worker process"""
+    results = []
+    if evaluate is None:
+        # DCSolver turns a few changed resistors into low-rank updates itself;
+        # NewtonSolver starts each run from the previous operating point
+        solver = NewtonSolver(circuit) if circuit.is_nonlinear else DCSolver(circuit)
+        for row in values:
+            for name, value in zip(names, row.tolist()):
+                solver.set_value(name, value)
+            x = solver.solve().x
+            results.append(np.append(x, 0.0)[rows])
+    else:
+        for row in values:
+            for name, value in zip(names, row.tolist()):
+                set_element_value(circuit, name, value)
+            results.append(np.asarray(evaluate(circuit), dtype=float))
+    return np.array(results)
+
+
+def _pool_runs(circuit, names, values, rows, evaluate, workers):
+    if workers == 1 or len(values) < 2:
+        # Workers change their own pickled copy; keep the caller's values intact here too
+        return _run_chunk(copy.deepcopy(circuit), names, values, rows, evaluate)
+    # A few chunks per worker keeps them busy when runs take uneven time
+    chunks = np.array_split(values, min(len(values), workers * 4))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_run_chunk, circuit, names, chunk, rows, evaluate) for chunk in chunks]
+        return np.concatenate([future.result() for future in futures])
+
+
+def sweep(circuit, parameters, outputs=None, evaluate=None, method='auto', workers=None):
+    """Solve circuit once per run with element values from parameters.
+
+    circuit is a Circuit or a Schematic (see circuit_from_schematic), and
+    parameters maps element names to equally long arrays, one value per run
+    (grid() builds full factorial sweeps). Outputs are node names, source or
+    inductor currents, or schematic pins such as 'R1.2'.
+
+    By default the DC operating point is solved. With a fixed topology all
+    runs share one factorization: method 'batch' solves them together (used
+    by 'auto' for up to MAX_LOW_RANK varied resistors). method 'pool', or an
+    evaluate(circuit) callable returning one row of outputs (AC, transient,
+    ...), spreads the runs over a ProcessPoolExecutor with workers processes
+    (all cores by default); evaluate must then be picklable, e.g. a
+    module-level function.
+    """
+    pin_nodes = {}
+    if isinstance(circuit, Schematic):
+        circuit, pin_nodes = _schematic_circuit(circuit)
+    names = list(parameters)
+    values = np.column_stack([np.asarray(parameters[name], dtype=float) for name in names]) \
+        if names else np.zeros((1, 0))
+    return _sweep(circuit, pin_nodes, names, values, outputs, evaluate, method, workers)
+
+
+def _sweep(circuit, pin_nodes, names, values, outputs, evaluate, method, workers):
+    for name in names:
+        element_value(circuit, name)  # Unknown names fail here, not in a worker
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if evaluate is None:
+        if outputs is None:
+            outputs = list(circuit.nodes)
+        outputs = [str(name) for name in outputs]
+        rows = np.array([circuit.unknown_index(pin_nodes.get(name, name)) for name in outputs],
+                        dtype=np.int64)
+        varied_resistors = sum(name in circuit.resistors.index for name in names)
+        if method == 'auto':
+            method = 'batch' if varied_resistors <= MAX_LOW_RANK and not circuit.is_nonlinear else 'pool'
+        elif method == 'batch' and circuit.is_nonlinear:
+            raise ValueError("Batched sweeps need a linear circuit; use method='pool'")
+    else:
+        outputs = list(outputs) if outputs is not None else None
+        rows = None
+        method = 'pool'
+
+    if method == 'batch':
+        results = _dc_batch(circuit, names, values, rows)
+    elif method == 'pool':
+        results = _pool_runs(circuit, names, values, rows, evaluate, workers)
+        if outputs is None:
+            outputs = [str(i) for i in range(results.shape[1])]
+    else:
+        raise ValueError(f"Unknown sweep method: {method!r}")
+    logger.info(f"Swept {len(values)} runs of {len(names)} parameters ({method})")
+    return SweepResult(names, values, outputs, results)
+
+
+def monte_carlo(circuit, tolerances, runs, outputs=None, seed=None, distribution='uniform',
+                evaluate=None, method='auto', workers=None):
+    """Sweep with element values drawn around their nominal values.
+
+    tolerances maps element names to relative tolerances (0.05 for 5%).
+    'uniform' draws within +-tolerance; 'normal' treats the tolerance as
+    three standard deviations. Values come from a SeedSequence, so a seed
+    (or the result's seed attribute) reproduces the run exactly, whatever
+    the number of workers. The other arguments are those of sweep().
+    """
+    pin_nodes = {}
+    if isinstance(circuit, Schematic):
+        circuit, pin_nodes = _schematic_circuit(circuit)
+    names = list(tolerances)
+    nominal = np.array([element_value(circuit, name) for name in names])
+    tolerance = np.array([tolerances[name] for name in names], dtype=float)
+
+    seed_sequence = np.random.SeedSequence(seed)
+    rng = np.random.default_rng(seed_sequence)
+    if distribution == 'uniform':
+        spread = rng.uniform(-1.0, 1.0, (runs, len(names))) * tolerance
+    elif distribution == 'normal':
+        spread = rng.normal(0.0, 1.0, (runs, len(names))) * (tolerance / 3.0)
+    else:
+        raise ValueError(f"Unknown distribution: {distribution!r}")
+    values = nominal * (1.0 + spread)
+
+    result = _sweep(circuit, pin_nodes, names, values, outputs, evaluate, method, workers)
+    result.seed = seed_sequence.entropy
+    return result
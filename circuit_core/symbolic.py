@@ -0,0 +1,352 @@
+"""Symbolic nodal (MNA) equations and their solutions, using sympy.
+
+sympy is only needed for this module: pip install sympy
+"""
+import collections
+import logging
+
+import sympy
+from sympy.polys.matrices import DomainMatrix
+from sympy.polys.matrices.exceptions import DMNonInvertibleMatrixError
+
+from .schematic import Schematic
+
+logger = logging.getLogger(__name__)
+
+s = sympy.Symbol('s')  # Laplace variable of capacitor and inductor terms
+
+# Element tables of a Circuit with the letter used for their placeholders
+_TABLES = (('resistors', 'R'), ('vsources', 'V'), ('isources', 'I'),
+           ('capacitors', 'C'), ('inductors', 'L'))
+
+
+class SymbolicCache:
+    """Solved subcircuits keyed by their structure, least recently used evicted.
+
+    A key describes the elements of a subcircuit (kind and local node
+    numbers, in circuit order) but not their names or values, which are
+    placeholders in the cached solution. Editing a value, renaming a part or
+    changing one subcircuit therefore reuses every other solved subcircuit,
+    and identical stages share one entry. Cached solutions are already
+    reduced (numerator and denominator without common factors).
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.solutions = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        solution = self.solutions.get(key)
+        if solution is None:
+            self.misses += 1
+            return None
+        self.solutions.move_to_end(key)
+        self.hits += 1
+        return solution
+
+    def put(self, key, solution):
+        self.solutions[key] = solution
+        if len(self.solutions) > self.maxsize:
+            self.solutions.popitem(last=False)
+
+    def clear(self):
+        self.solutions.clear()
+        self.hits = self.misses = 0
+
+
+_default_cache = SymbolicCache()
+
+
+def element_symbol(kind, name):
+    if kind in ('R', 'C', 'L'):
+        # Passive values are positive, which lets sympy simplify signs and roots
+        return sympy.Symbol(name, positive=True)
+    return sympy.Symbol(name, real=True)
+
+
+def node_symbol(name):
+    return sympy.Symbol(f"v_{name}")
+
+
+def current_symbol(name):
+    return sympy.Symbol(f"i_{name}")
+
+
+def _elements(circuit):
+    """(kind, name, a, b) of every element, in table order"""
+    for attribute, kind in _TABLES:
+        table = getattr(circuit, attribute)
+        for name, a, b in zip(table.names, table.a, table.b):
+            yield kind, name, a, b
+
+
+def subcircuits(circuit):
+    """Group elements into subcircuits: sets of nodes connected other than through ground"""
+    parent = list(range(circuit.num_nodes))
+
+    def find(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    elements = list(_elements(circuit))
+    for _, _, a, b in elements:
+        if a >= 0 and b >= 0:
+            parent[find(a)] = find(b)
+    groups = {}
+    for element in elements:
+        _, _, a, b = element
+        node = a if a >= 0 else b
+        if node >= 0:
+            groups.setdefault(find(node), []).append(element)
+    return list(groups.values())
+
+
+def _structure(elements):
+    """Structure key and local node order of a subcircuit"""
+    local = {-1: -1}
+    key = []
+    for kind, _, a, b in elements:
+        for node in (a, b):
+            if node not in local:
+                local[node] = len(local) - 1
+        key.append((kind, local[a], local[b]))
+    nodes = [node for node in local if node >= 0]
+    return tuple(key), nodes
+
+
+def _placeholders(key):
+    """Placeholder symbol of every element of a structure, and of resistor conductances"""
+    placeholders = [element_symbol(kind, f"p{i}_{kind}") for i, (kind, _, _) in enumerate(key)]
+    conductances = {i: element_symbol('R', f"p{i}_G") for i, (kind, _, _) in enumerate(key) if kind == 'R'}
+    return placeholders, conductances
+
+
+def _system(key):
+    """MNA matrix and right-hand side of a structure, in placeholder symbols.
+
+    Unknowns are the local node voltages, then one branch current per
+    voltage source and inductor, as in mna.assemble_dc/assemble_reactive.
+    Resistors enter as conductances so that every entry is a polynomial.
+    """
+    num_nodes = 1 + max((max(a, b) for _, a, b in key), default=-1)
+    branches = [i for i, (kind, _, _) in enumerate(key) if kind in ('V', 'L')]
+    size = num_nodes + len(branches)
+    A = sympy.zeros(size, size)
+    rhs = sympy.zeros(size, 1)
+    placeholders, conductances = _placeholders(key)
+    branch_of = {element: num_nodes + row for row, element in enumerate(branches)}
+
+    for i, (kind, a, b) in enumerate(key):
+        value = placeholders[i]
+        if kind in ('R', 'C'):
+            admittance = conductances[i] if kind == 'R' else s * value
+            for row, column, sign in ((a, a, 1), (b, b, 1), (a, b, -1), (b, a, -1)):
+                if row >= 0 and column >= 0:
+                    A[row, column] += sign * admittance
+        elif kind == 'I':
+            # Current leaves a and enters b through the external circuit
+            if a >= 0:
+                rhs[a] -= value
+            if b >= 0:
+                rhs[b] += value
+        else:
+            branch = branch_of[i]
+            for node, sign in ((a, 1), (b, -1)):
+                if node >= 0:
+                    A[node, branch] += sign
+                    A[branch, node] += sign
+            if kind == 'V':
+                rhs[branch] = value
+            else:
+                A[branch, branch] = -s * value
+    return A, rhs
+
+
+def _to_resistances(numerator, denominator, ring, conductances, converted):
+    """numerator/denominator with every conductance G replaced by 1/R, as a sympy expression.
+
+    Determinants of an MNA matrix are multilinear in each element's
+    admittance, so multiplying both polynomials by the product of the
+    resistances only flips the conductance exponents between 0 and 1; no
+    rational function simplification is needed. converted memoizes the
+    sympy form of polynomials shared by several unknowns (the denominator).
+    """
+    symbols = ring.symbols
+    flip = {position: conductances[symbol] for position, symbol in enumerate(symbols) if symbol in conductances}
+    terms = [numerator.terms(), denominator.terms()]
+    if any(monom[position] > 1 for polynomial in terms for monom, _ in polynomial for position in flip):
+        return sympy.cancel((ring.to_sympy(numerator) / ring.to_sympy(denominator))
+                            .xreplace({symbols[position]: 1 / r for position, r in flip.items()}))
+
+    flipped = [tuple((tuple(1 - e if position in flip else e for position, e in enumerate(monom)), coefficient)
+                     for monom, coefficient in polynomial) for polynomial in terms]
+    # Drop the monomial common to both (resistors that appear in neither)
+    common = tuple(min(column) for column in zip(*(e for polynomial in flipped for e, _ in polynomial)))
+    generators = [flip.get(position, symbol) for position, symbol in enumerate(symbols)]
+    expressions = []
+    for polynomial in flipped:
+        expression = converted.get((polynomial, common))
+        if expression is None:
+            expression = converted[polynomial, common] = sympy.Add(*[
+                sympy.Mul(ring.dom.to_sympy(coefficient), *[
+                    generator ** (e - c) for generator, e, c in zip(generators, monom, common) if e > c])
+                for monom, coefficient in polynomial])
+        expressions.append(expression)
+    return expressions[0] / expressions[1]
+
+
+def _solve_structure(key):
+    """Solution of a structure in resistance (and other) placeholders"""
+    A, rhs = _system(key)
+    if A.shape[0] == 0:
+        return A, rhs, []
+    placeholders, conductances = _placeholders(key)
+    resistances = {conductances[i]: placeholders[i] for i in conductances}
+    matrix, vector = DomainMatrix.from_Matrix(A).unify(DomainMatrix.from_Matrix(rhs))
+    try:
+        # Fraction-free elimination over the polynomial ring in the placeholders
+        numerators, denominator = matrix.solve_den(vector)
+    except (DMNonInvertibleMatrixError, ZeroDivisionError) as e:
+        raise ValueError(f"Symbolic MNA system is singular ({e}); check for floating nodes "
+                         "or voltage source loops") from e
+    ring = matrix.domain
+    if not ring.is_PolynomialRing:
+        return A, rhs, [sympy.cancel((ring.to_sympy(value) / ring.to_sympy(denominator)).xreplace(
+            {g: 1 / r for g, r in resistances.items()})) for value in numerators.to_Matrix()]
+
+    values = []
+    converted = {}
+    for row in numerators.to_list():
+        numerator, reduced = row[0].cancel(denominator) if row[0] else (row[0], ring.one)
+        values.append(_to_resistances(numerator, reduced, ring, resistances, converted))
+    return A, rhs, values
+
+
+class SymbolicSolution:
+    """Symbolic MNA equations of a circuit and their solution.
+
+    Node voltages are v_<node> and branch currents of voltage sources and
+    inductors i_<name>; element values are symbols named after the
+    elements, and capacitors and inductors carry the Laplace variable s.
+    """
+
+    def __init__(self, circuit, equations, solution, symbols):
+        self.circuit = circuit
+        self.equations = equations  # sympy.Eq per KCL row and branch equation
+        self.solution = solution  # Unknown symbol -> expression
+        self.symbols = symbols  # Element name -> symbol
+
+    @property
+    def unknowns(self):
+        return list(self.solution)
+
+    def voltage(self, node):
+        node = str(node)
+        if node in ('0', 'GND', 'gnd'):
+            return sympy.Integer(0)
+        return self.solution[node_symbol(node)]
+
+    def current(self, name):
+        return self.solution[current_symbol(name)]
+
+    def values(self):
+        """{element symbol: value} of the circuit's current element values"""
+        values = {}
+        for attribute, _ in _TABLES:
+            table = getattr(self.circuit, attribute)
+            for name, value in zip(table.names, table.values):
+                values[self.symbols[name]] = value
+        return values
+
+    def evaluate(self, expression, frequency=None, **values):
+        """Substitute element values (the circuit's unless given by name) and s=j*2*pi*f"""
+        substitutions = self.values()
+        for name, value in values.items():
+            substitutions[self.symbols[name]] = value
+        substitutions[s] = 0 if frequency is None else 2j * sympy.pi * frequency
+        return complex(sympy.N(expression.xreplace(substitutions))) if frequency is not None \
+            else float(sympy.N(expression.xreplace(substitutions)))
+
+
+def _names(key, elements):
+    """Placeholder -> element symbol (conductances -> 1/R) of a subcircuit"""
+    placeholders, conductances = _placeholders(key)
+    actual = [element_symbol(kind, name) for kind, name, _, _ in elements]
+    names = dict(zip(placeholders, actual))
+    names.update((conductance, 1 / actual[i]) for i, conductance in conductances.items())
+    return names, actual
+
+
+def _subcircuit_unknowns(elements, nodes, node_names):
+    unknowns = [node_symbol(node_names[node]) for node in nodes]
+    unknowns += [current_symbol(name) for kind, name, _, _ in elements if kind in ('V', 'L')]
+    return unknowns
+
+
+def _equations(A, rhs, unknowns):
+    x = sympy.Matrix(unknowns)
+    return [sympy.Eq((A[row, :] * x)[0], rhs[row]) for row in range(A.shape[0])]
+
+
+def _as_circuit(circuit):
+    if isinstance(circuit, Schematic):
+        from .sweeps import circuit_from_schematic
+        circuit = circuit_from_schematic(circuit)
+    if circuit.is_nonlinear or circuit.has_controlled_sources:
+        raise ValueError("Diodes, transistors and controlled sources have no symbolic model")
+    return circuit
+
+
+def nodal_equations(circuit):
+    """Symbolic MNA equations of a circuit (or schematic) and their unknowns, unsolved"""
+    circuit = _as_circuit(circuit)
+    node_names = {index: name for name, index in circuit.nodes.items()}
+    equations = []
+    unknowns = []
+    for elements in subcircuits(circuit):
+        key, nodes = _structure(elements)
+        A, rhs = _system(key)
+        names, _ = _names(key, elements)
+        local = _subcircuit_unknowns(elements, nodes, node_names)
+        equations += _equations(A.xreplace(names), rhs.xreplace(names), local)
+        unknowns += local
+    return equations, unknowns
+
+
+def solve_symbolic(circuit, cache=None):
+    """Generate and solve the symbolic MNA equations of a circuit or schematic.
+
+    Each subcircuit (see subcircuits()) is solved on its own and the result
+    is cached under its structure, so regenerating after an edit only
+    solves the subcircuits whose structure changed.
+    """
+    circuit = _as_circuit(circuit)
+    if cache is None:
+        cache = _default_cache
+
+    node_names = {index: name for name, index in circuit.nodes.items()}
+    symbols = {}
+    equations = []
+    solution = {}
+    for elements in subcircuits(circuit):
+        key, nodes = _structure(elements)
+        solved = cache.get(key)
+        if solved is None:
+            solved = _solve_structure(key)
+            cache.put(key, solved)
+        A, rhs, values = solved
+
+        names, actual = _names(key, elements)
+        symbols.update((name, symbol) for (_, name, _, _), symbol in zip(elements, actual))
+        unknowns = _subcircuit_unknowns(elements, nodes, node_names)
+        equations += _equations(A.xreplace(names), rhs.xreplace(names), unknowns)
+        for unknown, value in zip(unknowns, values):
+            solution[unknown] = value.xreplace(names)
+    logger.info(f"Solved {len(solution)} unknowns symbolically "
+                f"(cache: {cache.hits} hits, {cache.misses} misses)")
+    return SymbolicSolution(circuit, equations, solution, symbols)
+
@@ -1,10 +1,43 @@
-import xml.etree.ElementTree as ET
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, filedialog
 import math
 import logging
 
+import numpy as np
+
+from circuit_core.geometry import transform_points
+from circuit_core.history import AddItems, EditComponent, History, MoveComponents, RemoveItems
+from circuit_core.library import DEFAULT_LIBRARY, LibraryRegistry
+from circuit_core.schematic import Schematic
+from circuit_core.schematic_file import SchematicFile, SchematicFormatError, export_json, save_schematic
+from circuit_core.spice import write_netlist
+
+PREVIEW_TAG = 'preview'  # Canvas tag shared by all items of the placement preview
+SCHEMATIC_TAG = 'schematic'  # Every placed item
+VIEW_TAGS = f"{SCHEMATIC_TAG}||{PREVIEW_TAG}"  # Items zoomed with a single canvas.scale
+STROKE_TAG = 'stroke'  # Outlines drawn 2 * zoom wide
+MARKER_TAG = 'marker'  # Origin crosses drawn 1.5 * zoom wide
+SELECTED_TAG = 'selected'  # Items of the selected components
+
+def font_tag(base_size):
+    # Texts are grouped by unzoomed font size so zoom updates one tag per size
+    return f"font{base_size:g}"
+
 class EagleSymbol:
+    WIRE_COLOR = "#006400"  # Schematic wires (nets)
+    # Map text pin directions to angles
+    DIRECTION_ANGLES = {
+        'R': 0,    # Right
+        'L': 180,  # Left
+        'U': 90,   # Up
+        'D': 270,  # Down
+        'io': 0,   # Default to right for IO pins
+        'in': 180, # Input pins come from left
+        'out': 0,  # Output pins go to right
+        '1': 0,    # Pin 1 goes right
+        '2': 0,    # Pin 2 also goes right (changed from 180)
+    }
+
     def __init__(self, canvas):
         self.canvas = canvas
         self.scale = 20  # Scale factor to convert Eagle units to pixels
@@ -13,6 +46,7 @@ class EagleSymbol:
         self.offset_x = 0  # Add offset support
         self.offset_y = 0
         self.zoom = 1.0  # Add zoom factor
+        self.font_sizes = set()  # Unzoomed font sizes used by drawn texts
         
     def draw_wire(self, x1, y1, x2, y2, layer="94"):
         x1, y1 = self.rotate_point(x1, y1)
@@ -27,7 +61,8 @@ class EagleSymbol:
             canvas_x1, canvas_y1, 
             canvas_x2, canvas_y2,
             fill=self.get_layer_color(layer), 
-            width=2 * self.zoom  # Scale line width with zoom
+            width=2 * self.zoom,  # Scale line width with zoom
+            tags=STROKE_TAG
         )
     
     def draw_circle(self, x, y, radius, layer="94"):
@@ -40,7 +75,8 @@ class EagleSymbol:
             canvas_x - r, canvas_y - r,
             canvas_x + r, canvas_y + r,
             outline=self.get_layer_color(layer),
-            width=2 * self.zoom  # Scale line width with zoom
+            width=2 * self.zoom,  # Scale line width with zoom
+            tags=STROKE_TAG
         )
     
     def draw_arc(self, x, y, radius, start_angle, end_angle, layer="94"):
@@ -76,7 +112,9 @@ class EagleSymbol:
                 canvas_y -= self.scale * 0.8 * self.zoom  # Scale offset with zoom
         
         # Scale font size with zoom
-        font_size = int(size * 12 * self.zoom)  # Scale font size with zoom
+        base_size = size * 12
+        font_size = int(base_size * self.zoom)  # Scale font size with zoom
+        self.font_sizes.add(base_size)
         
         # Map text anchors
         anchor_map = {
@@ -94,7 +132,7 @@ class EagleSymbol:
             fill=self.get_layer_color(layer),
             font=("Arial", font_size),
             anchor=anchor,
-            tags=tags  # Add tags parameter
+            tags=tuple(tags) + (font_tag(base_size),)  # Add tags parameter
         )
     
     def draw_pin(self, x, y, length, direction, name, layer="91"):
@@ -146,19 +184,7 @@ class EagleSymbol:
         # Convert direction to float and handle special cases
         try:
             if isinstance(direction, str):
-                # Map text directions to angles
-                direction_map = {
-                    'R': 0,    # Right
-                    'L': 180,  # Left
-                    'U': 90,   # Up
-                    'D': 270,  # Down
-                    'io': 0,   # Default to right for IO pins
-                    'in': 180, # Input pins come from left
-                    'out': 0,  # Output pins go to right
-                    '1': 0,    # Pin 1 goes right
-                    '2': 0,    # Pin 2 also goes right (changed from 180)
-                }
-                angle = direction_map.get(direction, 0)
+                angle = self.DIRECTION_ANGLES.get(direction, 0)
             else:
                 angle = float(direction)
             
@@ -196,19 +222,269 @@ class EagleSymbol:
         markers.append(self.canvas.create_line(
             canvas_x - size, canvas_y,
             canvas_x + size, canvas_y,
-            fill=color, width=1.5 * self.zoom  # Slightly thicker lines
+            fill=color, width=1.5 * self.zoom,  # Slightly thicker lines
+            tags=MARKER_TAG
         ))
         # Vertical line
         markers.append(self.canvas.create_line(
             canvas_x, canvas_y - size,
             canvas_x, canvas_y + size,
-            fill=color, width=1.5 * self.zoom  # Slightly thicker lines
+            fill=color, width=1.5 * self.zoom,  # Slightly thicker lines
+            tags=MARKER_TAG
         ))
         
         return markers
 
+    def canvas_points(self, points):
+        """Rotate, zoom and offset an (n, 2) array of Eagle points in one step"""
+        return transform_points(points, self.rotation, self.scale * self.zoom,
+                                self.offset_x, self.offset_y)
+
+    def canvas_arcs(self, geometry):
+        """Bounding boxes (n, 4), start angles, extents and layers of the arcs of a symbol.
+
+        An Eagle arc runs from (x1, y1) to (x2, y2), turning counterclockwise
+        by curve degrees (clockwise when negative), so its center lies on the
+        perpendicular bisector of the chord. Straight arcs (curve 0) are left out.
+        """
+        curved = geometry.arcs[:, 4] != 0
+        x1, y1, x2, y2, curve = geometry.arcs[curved].T
+        half = np.radians(curve) / 2
+        chord_x, chord_y = x2 - x1, y2 - y1
+        # Offset of the center from the chord midpoint, to the left, per unit chord length
+        along = 0.5 / np.tan(half)
+        cx = (x1 + x2) / 2 - chord_y * along
+        cy = (y1 + y2) / 2 + chord_x * along
+        radii = np.hypot(chord_x, chord_y) / (2 * np.abs(np.sin(half))) * self.scale * self.zoom
+        centers = self.canvas_points(np.column_stack([cx, cy]))
+        boxes = np.column_stack([centers - radii[:, None], centers + radii[:, None]])
+        # Tk angles run counterclockwise on screen, as Eagle's do with y pointing up
+        starts = np.degrees(np.arctan2(y1 - cy, x1 - cx)) + self.rotation
+        return boxes, starts, curve, geometry.arc_layers[curved]
+
+    def pin_offsets(self, geometry):
+        """(pin name, (dx, dy)) of each connection point relative to the symbol origin"""
+        points = self.canvas_points(geometry.pins[:, :2]) - (self.offset_x, self.offset_y)
+        return list(zip(geometry.pin_names, map(tuple, points.tolist())))
+
+    def draw_pins(self, geometry):
+        """Draw all pins of a symbol, transforming their endpoints together"""
+        if not len(geometry.pins):
+            return []
+        angles = np.radians([self.DIRECTION_ANGLES.get(d, 0) for d in geometry.pin_directions])
+        dx = np.cos(angles)
+        dy = np.sin(angles)
+        # Adjust pin direction for pin 2
+        dx[[name == "2" for name in geometry.pin_names]] *= -1
+        x, y, length = geometry.pins.T
+        starts = self.canvas_points(geometry.pins[:, :2])
+        ends = self.canvas_points(np.column_stack((x + dx * length, y + dy * length)))
+        
+        items = []
+        for start, end, layer in zip(starts.tolist(), ends.tolist(), geometry.pin_layers.tolist()):
+            items.append(self.canvas.create_line(
+                *start, *end,
+                fill=self.get_layer_color(str(layer)),
+                width=2 * self.zoom,
+                tags=STROKE_TAG
+            ))
+        # Pin numbers sit slightly above the pin, close to the component
+        number_offset = 0.3  # Offset in grid units
+        for px, py, pdx, plength, name, layer in zip(x.tolist(), y.tolist(), dx.tolist(), length.tolist(),
+                                                   geometry.pin_names, geometry.pin_layers.tolist()):
+            items.append(self.draw_text(
+                px + pdx * plength * 0.2, py - number_offset, name,
+                size=0.7, layer=str(layer), align="center"
+            ))
+        return items
+
+    def draw_geometry(self, geometry, name_text=None):
+        """Draw a whole symbol; returns its symbol, name and value canvas items"""
+        symbol_items = []  # Main symbol elements (wires, circles, pins)
+        name_items = []   # Name text and origin
+        value_items = []  # Value text and origin
+        width = 2 * self.zoom  # Scale line width with zoom
+        
+        # Add symbol origin marker first
+        symbol_items.extend(self.draw_origin_markers(0, 0))
+        
+        wires = self.canvas_points(geometry.wires.reshape(-1, 2)).reshape(-1, 4)
+        for coords, layer in zip(wires.tolist(), geometry.wire_layers.tolist()):
+            symbol_items.append(self.canvas.create_line(
+                *coords, fill=self.get_layer_color(str(layer)), width=width, tags=STROKE_TAG
+            ))
+        
+        centers = self.canvas_points(geometry.circles[:, :2])
+        radii = geometry.circles[:, 2] * self.scale * self.zoom
+        for (cx, cy), r, layer in zip(centers.tolist(), radii.tolist(), geometry.circle_layers.tolist()):
+            symbol_items.append(self.canvas.create_oval(
+                cx - r, cy - r, cx + r, cy + r,
+                outline=self.get_layer_color(str(layer)), width=width, tags=STROKE_TAG
+            ))
+        
+        boxes, starts, extents, layers = self.canvas_arcs(geometry)
+        for box, start, extent, layer in zip(boxes.tolist(), starts.tolist(), extents.tolist(), layers.tolist()):
+            symbol_items.append(self.canvas.create_arc(
+                *box, start=start, extent=extent, style="arc",
+                outline=self.get_layer_color(str(layer)), width=width, tags=STROKE_TAG
+            ))
+        
+        symbol_items.extend(self.draw_pins(geometry))
+        
+        # Only names and values are drawn; SPICEMODEL/SPICEEXTRA stay hidden
+        for (tx, ty, size), text, layer in zip(geometry.texts.tolist(), geometry.text_contents,
+                                               geometry.text_layers.tolist()):
+            if text == '>NAME':
+                label = name_text or text
+                text_item = self.draw_text(tx, ty, label, size, str(layer), tags=('name',))
+                name_items.extend([text_item] + self.draw_origin_markers(tx, ty, is_text=True))
+            elif text == '>VALUE':
+                text_item = self.draw_text(tx, ty, text, size, str(layer), tags=('value',))
+                value_items.extend([text_item] + self.draw_origin_markers(tx, ty, is_text=True))
+        
+        return {
+            'symbol': symbol_items,
+            'name': name_items,
+            'value': value_items
+        }
+
+class CanvasGrid:
+    """Grid lines or dots covering the visible part of the canvas.
+
+    Items are kept in a pool keyed by grid position. Panning only moves the
+    lines that leave the drawn area to the positions entering it, and nothing
+    is touched while the view stays inside the drawn margin. Dense dot grids
+    are a single tiled image instead of thousands of ovals.
+    """
+
+    TAG = 'grid'
+    COLOR = '#e0e0e0'
+    MARGIN = 5  # Grid cells drawn beyond each side of the viewport
+    DENSE_DOTS = 2500  # Above this many dots the tiled image is used
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.key = None  # (grid size, style, zoom) the pool was built for
+        self.region = None  # (left, top, right, bottom) currently covered
+        self.span = None  # Extent of the pooled lines
+        self.vertical = {}  # x -> line item
+        self.horizontal = {}  # y -> line item
+        self.dots = {}  # (x, y) -> oval item
+        self.image_item = None
+        self.tile = None
+        self.image = None
+
+    def clear(self):
+        self.canvas.delete(self.TAG)
+        self.key = None
+        self.region = None
+        self.span = None
+        self.vertical = {}
+        self.horizontal = {}
+        self.dots = {}
+        self.image_item = None
+        self.tile = None
+        self.image = None
+
+    def update(self, viewport, grid_size, style, zoom):
+        """Cover viewport (left, top, right, bottom in canvas coordinates)"""
+        key = (grid_size, style, zoom)
+        if key != self.key:
+            self.clear()
+            self.key = key
+
+        left, top, right, bottom = viewport
+        if self.region is not None:
+            r_left, r_top, r_right, r_bottom = self.region
+            if (r_left <= left - grid_size and r_top <= top - grid_size and
+                    r_right >= right + grid_size and r_bottom >= bottom + grid_size):
+                return  # Still inside the drawn margin
+
+        # Fixed cell counts for a given viewport size, aligned to the grid
+        margin = self.MARGIN * grid_size
+        columns = math.ceil((right - left) / grid_size) + 2 * self.MARGIN + 1
+        rows = math.ceil((bottom - top) / grid_size) + 2 * self.MARGIN + 1
+        start_x = int(left // grid_size) * grid_size - margin
+        start_y = int(top // grid_size) * grid_size - margin
+        self.region = (start_x, start_y, start_x + columns * grid_size, start_y + rows * grid_size)
+        xs = range(start_x, self.region[2] + 1, grid_size)
+        ys = range(start_y, self.region[3] + 1, grid_size)
+
+        if style == "lines":
+            self.update_lines(xs, ys, zoom)
+        elif len(xs) * len(ys) > self.DENSE_DOTS:
+            self.update_image(xs, ys, grid_size, zoom)
+        else:
+            self.update_dots(xs, ys, zoom)
+        self.canvas.tag_lower(self.TAG)
+
+    def update_lines(self, xs, ys, zoom):
+        width = max(1, 0.5 * zoom)
+        region = self.region
+        refresh = self.span is None or not (
+            self.span[0] <= region[0] and self.span[1] <= region[1] and
+            self.span[2] >= region[2] and self.span[3] >= region[3])
+        if refresh:
+            # Lines reach one region size further so short pans keep their extent
+            w = region[2] - region[0]
+            h = region[3] - region[1]
+            self.span = (region[0] - w, region[1] - h, region[2] + w, region[3] + h)
+        left, top, right, bottom = self.span
+
+        def create(coords):
+            return self.canvas.create_line(*coords, fill=self.COLOR, width=width, tags=self.TAG)
+
+        self.recycle(self.vertical, xs, lambda x: (x, top, x, bottom), create, refresh)
+        self.recycle(self.horizontal, ys, lambda y: (left, y, right, y), create, refresh)
+
+    def update_dots(self, xs, ys, zoom):
+        r = max(1, zoom)
+
+        def create(coords):
+            return self.canvas.create_oval(*coords, fill=self.COLOR, outline=self.COLOR, tags=self.TAG)
+
+        points = [(x, y) for x in xs for y in ys]
+        self.recycle(self.dots, points, lambda p: (p[0] - r, p[1] - r, p[0] + r, p[1] + r), create)
+
+    def update_image(self, xs, ys, grid_size, zoom):
+        r = max(1, int(round(zoom)))
+        width = len(xs) * grid_size
+        height = len(ys) * grid_size
+        if self.image is None or (self.image.width(), self.image.height()) != (width, height):
+            if self.tile is None:
+                # One cell with its dot in the top-left corner, transparent elsewhere
+                self.tile = tk.PhotoImage(width=grid_size, height=grid_size)
+                self.tile.put(self.COLOR, to=(0, 0, 2 * r, 2 * r))
+            self.image = tk.PhotoImage(width=width, height=height)
+            self.canvas.tk.call(str(self.image), 'copy', str(self.tile), '-to', 0, 0, width, height)
+            if self.image_item is not None:
+                self.canvas.delete(self.image_item)
+            self.image_item = self.canvas.create_image(
+                xs[0] - r, ys[0] - r, image=self.image, anchor='nw', tags=self.TAG)
+        else:
+            self.canvas.coords(self.image_item, xs[0] - r, ys[0] - r)
+
+    def recycle(self, items, positions, coords_for, create, refresh=False):
+        """Point items at positions, reusing the ones that scrolled out of view"""
+        wanted = set(positions)
+        free = [items.pop(position) for position in list(items) if position not in wanted]
+        if refresh:
+            for position, item in items.items():
+                self.canvas.coords(item, *coords_for(position))
+        for position in positions:
+            if position in items:
+                continue
+            if free:
+                item = free.pop()
+                self.canvas.coords(item, *coords_for(position))
+            else:
+                item = create(coords_for(position))
+            items[position] = item
+        for item in free:
+            self.canvas.delete(item)
+
 class CircuitApp:
-    def __init__(self):
+    def __init__(self, library_paths=None):
         # Setup logging
         logging.basicConfig(
             level=logging.INFO,
@@ -220,8 +496,10 @@ class CircuitApp:
         self.root = tk.Tk()
         self.root.title("Circuit Calculator")
         
-        # Initialize zoom before creating canvas and drawing grid
+        # Initialize zoom before creating canvas and drawing grid. The model
+        # keeps world coordinates; canvas = world * zoom + view_origin
         self.zoom = 1.0
+        self.view_origin = (0.0, 0.0)
         
         self.create_menu_bar()
         self.main_container = tk.PanedWindow(self.root, orient=tk.HORIZONTAL)
@@ -231,12 +509,22 @@ class CircuitApp:
         self.create_canvas()
         
         self.current_tool = "select"
-        self.selected_components = []
+        self.selected_components = {}  # Component id -> component
+        self.history = History()  # Undo/redo command log
         self.temp_component = []  # Changed to list to store multiple canvas items
+        self.preview_position = (0, 0)  # Snapped position of the placement preview
+        self.preview_pending = False  # A coalesced preview move is scheduled
+        self.preview_pins = []  # (pin name, offset) of the previewed symbol
+        self.wire_start = None  # Last point of the wire being drawn
+        self.wire_preview = None  # Rubber-band line of the wire being drawn
+        self.font_sizes = set()  # Unzoomed font sizes of drawn texts, see font_tag()
         self.mouse_x = 0
         self.mouse_y = 0
         
-        self.load_eagle_library("eagle_libraries/ngspice-simulation.lbr")
+        # Symbols of every registered library, parsed lazily on first use
+        self.symbols = LibraryRegistry()
+        for library_path in library_paths or [DEFAULT_LIBRARY]:
+            self.load_eagle_library(library_path)
         
         self.sidebar_visible = True
         self.current_component = None
@@ -249,6 +537,7 @@ class CircuitApp:
         self.root.bind('<Control-n>', lambda e: self.menu_new())
         self.root.bind('<Control-o>', lambda e: self.menu_open())
         self.root.bind('<Control-s>', lambda e: self.menu_save())
+        self.root.bind('<Control-e>', lambda e: self.menu_export_netlist())
         self.root.bind('<Control-z>', lambda e: self.menu_undo())
         self.root.bind('<Control-y>', lambda e: self.menu_redo())
         self.root.bind('<Control-x>', lambda e: self.menu_cut())
@@ -268,8 +557,9 @@ class CircuitApp:
         self.root.update_idletasks()  # Ensure geometry is updated
         self.draw_grid()
         
-        self.placed_components = []  # Track placed components
-        self.component_counters = {}  # Track component numbers
+        self.schematic = Schematic()  # Headless model of the drawing
+        self.placed_components = self.schematic.components  # Track placed components
+        self.component_counters = self.schematic.counters  # Track component numbers
         
         # Add zoom bindings
         self.canvas.bind("<MouseWheel>", self.on_mousewheel)  # Windows
@@ -282,7 +572,7 @@ class CircuitApp:
         self.selection_start_x = None
         self.selection_start_y = None
         self.selection_rectangle = None
-        self.selected_components = []
+        self.selected_components = {}  # Component id -> component
         self.is_selecting = False
         
         # Bind mouse events for selection
@@ -321,6 +611,7 @@ class CircuitApp:
             ("New", "📄", self.menu_new, "Ctrl+N"),
             ("Open", "📂", self.menu_open, "Ctrl+O"),
             ("Save", "💾", self.menu_save, "Ctrl+S"),
+            ("Export", "📤", self.menu_export_netlist, "Ctrl+E"),
         ]
         
         file_toolbar = ttk.Frame(file_tab)
@@ -445,11 +736,90 @@ class CircuitApp:
 
     def menu_open(self):
         self.logger.info("Menu: Open")
-        # Add open file functionality
+        filename = filedialog.askopenfilename(
+            title="Open schematic",
+            filetypes=[("Circuit schematic", "*.csch"), ("All files", "*.*")]
+        )
+        if not filename:
+            return
+        try:
+            schematic_file = SchematicFile(filename)
+        except (OSError, SchematicFormatError) as e:
+            self.logger.error(f"Error opening schematic: {str(e)}")
+            return
+        with schematic_file:
+            self.load_schematic_file(schematic_file)
 
     def menu_save(self):
         self.logger.info("Menu: Save")
-        # Add save functionality
+        filename = filedialog.asksaveasfilename(
+            title="Save schematic",
+            defaultextension=".csch",
+            filetypes=[("Circuit schematic", "*.csch"), ("JSON", "*.json"), ("All files", "*.*")]
+        )
+        if not filename:
+            return
+        # Coordinates are stored in world units; the view goes along
+        meta = {'zoom': self.zoom, 'view_origin': list(self.view_origin)}
+        try:
+            if filename.lower().endswith('.json'):
+                export_json(self.schematic, filename, meta)
+            else:
+                save_schematic(self.schematic, filename, meta)
+        except OSError as e:
+            self.logger.error(f"Error saving schematic: {str(e)}")
+
+    def clear_schematic(self):
+        self.finish_net()
+        self.canvas.delete(SCHEMATIC_TAG)
+        self.schematic.clear()
+        self.history.clear()
+        self.selected_components.clear()
+        self.moving_component = None
+
+    def load_schematic_file(self, schematic_file):
+        self.clear_schematic()
+        self.zoom = schematic_file.meta.get('zoom', self.zoom)
+        self.view_origin = tuple(schematic_file.meta.get('view_origin', self.view_origin))
+        
+        rows = []
+        for row in schematic_file.rows():
+            if row[0] not in self.symbols:
+                self.logger.warning(f"Symbol {row[0]} of {row[1]} not found in library")
+                continue
+            rows.append(row)
+        components = self.schematic.add_many(rows)
+
+        # Draw every part with one symbol renderer before Tk gets to redraw
+        symbol = EagleSymbol(self.canvas)
+        symbol.zoom = self.zoom
+        for component in components:
+            symbol.offset_x, symbol.offset_y = self.to_canvas(*component.origin)
+            items, bounds = self.draw_symbol_items(symbol, self.symbols[component.type], component.name_text)
+            self.schematic.set_items(component, items['symbol'], items['name'], items['value'], bounds)
+            self.bind_component(component)
+        self.font_sizes |= symbol.font_sizes
+
+        for x1, y1, x2, y2 in schematic_file.wires.tolist():
+            self.schematic.add_wire((x1, y1), (x2, y2), items=[self.draw_wire((x1, y1), (x2, y2))])
+
+        self.draw_grid()
+        self.logger.info(f"Opened {schematic_file.path}: {len(self.schematic)} components, "
+                         f"{len(self.schematic.wires)} wires")
+
+    def menu_export_netlist(self):
+        self.logger.info("Menu: Export netlist")
+        filename = filedialog.asksaveasfilename(
+            title="Export SPICE netlist",
+            defaultextension=".cir",
+            filetypes=[("SPICE netlist", "*.cir *.net *.sp"), ("All files", "*.*")]
+        )
+        if not filename:
+            return
+        try:
+            write_netlist(self.schematic, filename, self.symbols)
+        except OSError as e:
+            self.logger.error(f"Error exporting netlist: {str(e)}")
 
     def menu_exit(self):
         self.logger.info("Menu: Exit selected")
@@ -458,11 +828,67 @@ class CircuitApp:
 
     def menu_undo(self):
         self.logger.info("Menu: Undo")
-        # Add undo functionality
+        self.moving_component = None
+        command = self.history.undo(self)
+        if command is not None:
+            self.logger.info(f"Undid {command!r}")
 
     def menu_redo(self):
         self.logger.info("Menu: Redo")
-        # Add redo functionality
+        self.moving_component = None
+        command = self.history.redo(self)
+        if command is not None:
+            self.logger.info(f"Redid {command!r}")
+
+    # Editor interface used by the undo history (see circuit_core.history)
+
+    def insert_items(self, components, wires):
+        symbol = EagleSymbol(self.canvas)
+        symbol.zoom = self.zoom
+        for component in components:
+            # The canvas items were deleted along with the component; draw it again
+            symbol.offset_x, symbol.offset_y = self.to_canvas(*component.origin)
+            items, bounds = self.draw_symbol_items(symbol, self.symbols[component.type], component.name_text)
+            component.symbol = tuple(items['symbol'])
+            component.name = tuple(items['name'])
+            component.value = tuple(items['value'])
+            self.schematic.insert(component, bounds)
+            self.bind_component(component)
+            self.show_labels(component)
+        self.font_sizes |= symbol.font_sizes
+        for wire in wires:
+            wire.items = (self.draw_wire(wire.start, wire.end),)
+            self.schematic.insert_wire(wire)
+
+    def delete_items(self, components, wires):
+        for component in components:
+            for item in component.items():
+                self.canvas.delete(item)
+            self.schematic.remove(component)
+            self.selected_components.pop(component.id, None)
+        for wire in wires:
+            for item in wire.items:
+                self.canvas.delete(item)
+            self.schematic.remove_wire(wire)
+
+    def translate_components(self, components, dx, dy):
+        for component in components:
+            self.schematic.move(component, dx, dy)
+            for item in component.items():
+                self.canvas.move(item, dx * self.zoom, dy * self.zoom)
+
+    def edit_component(self, component, attribute, value):
+        setattr(component, attribute, value)
+        if attribute in ('name_hidden', 'value_hidden'):
+            self.show_labels(component)
+        elif attribute == 'name_text' and component.name:
+            self.canvas.itemconfig(component.name[0], text=value)
+
+    def show_labels(self, component):
+        # Apply the component's label visibility to its canvas items
+        for items, hidden in ((component.name, component.name_hidden), (component.value, component.value_hidden)):
+            for item in items:
+                self.canvas.itemconfig(item, state='hidden' if hidden else 'normal')
 
     def menu_cut(self):
         self.logger.info("Menu: Cut")
@@ -593,6 +1019,50 @@ class CircuitApp:
             self.canvas.unbind("<Button-1>")
             self.canvas.bind("<Motion>", self.update_component_position)
             self.canvas.bind("<Button-1>", self.place_component)
+        elif tool == "net":
+            # Draw wires: click to start, click again for each corner
+            self.canvas.bind("<Button-1>", self.handle_net_click)
+            self.canvas.bind("<Motion>", self.update_net_preview)
+            self.canvas.bind("<Button-3>", self.finish_net)
+            self.canvas.unbind("<B1-Motion>")
+        
+        if tool != "net":
+            self.finish_net()
+
+    def snap_point(self, event):
+        # World coordinates of an event, snapped to the grid if enabled
+        x, y = self.world_point(event.x, event.y)
+        if self.snap_grid_var.get():
+            grid_size = int(self.grid_size_var.get())
+            x = round(x / grid_size) * grid_size
+            y = round(y / grid_size) * grid_size
+        return x, y
+
+    def handle_net_click(self, event):
+        x, y = self.snap_point(event)
+        if self.wire_start is not None and (x, y) != self.wire_start:
+            line = self.draw_wire(self.wire_start, (x, y))
+            wire = self.schematic.add_wire(self.wire_start, (x, y), items=[line])
+            self.history.record(AddItems(wires=[wire]))
+            self.logger.info(f"Wire {self.wire_start} -> {(x, y)}, {len(self.schematic.nets())} nets")
+        # Keep going from the clicked point
+        self.wire_start = (x, y)
+        x, y = self.to_canvas(x, y)
+        if self.wire_preview is None:
+            self.wire_preview = self.canvas.create_line(x, y, x, y, fill='#808080', dash=(4, 2))
+        else:
+            self.canvas.coords(self.wire_preview, x, y, x, y)
+
+    def update_net_preview(self, event):
+        if self.wire_preview is not None:
+            self.canvas.coords(self.wire_preview, *self.to_canvas(*self.wire_start),
+                               *self.to_canvas(*self.snap_point(event)))
+
+    def finish_net(self, event=None):
+        if self.wire_preview is not None:
+            self.canvas.delete(self.wire_preview)
+        self.wire_preview = None
+        self.wire_start = None
 
     def open_parts_window(self):
         parts_window = tk.Toplevel(self.root)
@@ -692,10 +1162,7 @@ class CircuitApp:
         self.canvas_drag = False
         self.last_x = 0
         self.last_y = 0
-        self.grid_items = []  # Store grid lines
-        
-        # Initialize component counters
-        self.component_counters = {}
+        self.grid = CanvasGrid(self.canvas)  # Pooled grid items
         
         # Bind window and canvas resize events
         self.root.bind('<Configure>', self.on_window_configure)
@@ -712,58 +1179,24 @@ class CircuitApp:
         self.draw_grid()
         
     def draw_grid(self):
-        # Clear existing grid
-        for item in getattr(self, 'grid_items', []):
-            self.canvas.delete(item)
-        self.grid_items = []
-        
         if not self.grid_visible_var.get():
+            self.grid.clear()
             return
         
         # Convert grid size to int first, then multiply by zoom
         base_grid_size = int(self.grid_size_var.get())
-        grid_size = int(base_grid_size * self.zoom)  # Scale grid with zoom
+        grid_size = max(2, int(base_grid_size * self.zoom))  # Scale grid with zoom
         
         # Get visible area
-        visible_left = self.canvas.canvasx(0)
-        visible_top = self.canvas.canvasy(0)
-        visible_right = self.canvas.canvasx(self.canvas.winfo_width())
-        visible_bottom = self.canvas.canvasy(self.canvas.winfo_height())
-        
-        # Extend grid area
-        left = int(visible_left - grid_size * 5)
-        top = int(visible_top - grid_size * 5)
-        right = int(visible_right + grid_size * 5)
-        bottom = int(visible_bottom + grid_size * 5)
-        
-        # Ensure grid starts at multiples of grid_size
-        start_x = (left // grid_size) * grid_size
-        start_y = (top // grid_size) * grid_size
-        
-        # Draw grid lines or dots
-        if self.grid_style_var.get() == "lines":
-            for x in range(start_x, right + grid_size, grid_size):
-                line = self.canvas.create_line(x, top, x, bottom, 
-                                             fill='#e0e0e0', 
-                                             width=max(1, 0.5 * self.zoom))
-                self.grid_items.append(line)
-            
-            for y in range(start_y, bottom + grid_size, grid_size):
-                line = self.canvas.create_line(left, y, right, y, 
-                                             fill='#e0e0e0', 
-                                             width=max(1, 0.5 * self.zoom))
-                self.grid_items.append(line)
-        else:  # dots
-            dot_size = max(1, self.zoom)
-            for x in range(start_x, right + grid_size, grid_size):
-                for y in range(start_y, bottom + grid_size, grid_size):
-                    dot = self.canvas.create_oval(
-                        x - dot_size, y - dot_size,
-                        x + dot_size, y + dot_size,
-                        fill='#e0e0e0',
-                        outline='#e0e0e0'
-                    )
-                    self.grid_items.append(dot)
+        viewport = (
+            self.canvas.canvasx(0),
+            self.canvas.canvasy(0),
+            self.canvas.canvasx(self.canvas.winfo_width()),
+            self.canvas.canvasy(self.canvas.winfo_height())
+        )
+        
+        # Only lines or dots entering the view are (re)positioned
+        self.grid.update(viewport, grid_size, self.grid_style_var.get(), self.zoom)
 
     def drag_canvas(self, event):
         if self.canvas_drag:
@@ -798,70 +1231,34 @@ class CircuitApp:
 
     def create_temp_component(self, x, y):
         # Clear any existing temporary component
-        if isinstance(self.temp_component, dict):
-            for items in self.temp_component.values():
-                for item in items:
-                    self.canvas.delete(item)
-        elif isinstance(self.temp_component, list):
-            for item in self.temp_component:
-                self.canvas.delete(item)
+        self.canvas.delete(PREVIEW_TAG)
         self.temp_component = {}
         
         # Create new temporary component
         if self.current_component in self.symbols:
-            # Snap to grid
+            # Snap the pointer (window coordinates) to the grid
             grid_size = 20
+            x, y = self.world_point(x, y)
             x = round(x / grid_size) * grid_size
             y = round(y / grid_size) * grid_size
             
             symbol_data = self.symbols[self.current_component]
             symbol = EagleSymbol(self.canvas)
+            symbol.zoom = self.zoom
             
             # Set position offset
-            symbol.offset_x = x
-            symbol.offset_y = y
-            
-            # Track different parts of the component
-            symbol_items = []  # Main symbol elements (wires, circles, pins)
-            name_items = []   # Name text and origin
-            value_items = []  # Value text and origin
-            
-            # Add symbol origin marker first
-            origin_markers = symbol.draw_origin_markers(0, 0)
-            symbol_items.extend(origin_markers)
-            
-            for element in symbol_data:
-                element_type = element[0]
-                if element_type == 'text':
-                    tx, ty, size, text, layer = element[1:6]
-                    if text not in ['>SPICEMODEL', '>SPICEEXTRA']:
-                        # Create text and its origin marker
-                        if text == '>NAME':
-                            text_item = symbol.draw_text(tx, ty, text, size, layer, tags=('name',))
-                            origin_markers = symbol.draw_origin_markers(tx, ty, is_text=True)
-                            name_items.extend([text_item] + origin_markers)
-                        elif text == '>VALUE':
-                            text_item = symbol.draw_text(tx, ty, text, size, layer, tags=('value',))
-                            origin_markers = symbol.draw_origin_markers(tx, ty, is_text=True)
-                            value_items.extend([text_item] + origin_markers)
-                else:
-                    # Add other elements to symbol items
-                    if element_type == 'wire':
-                        item = symbol.draw_wire(*element[1:6])
-                        symbol_items.append(item)
-                    elif element_type == 'circle':
-                        item = symbol.draw_circle(*element[1:5])
-                        symbol_items.append(item)
-                    elif element_type == 'pin':
-                        items = symbol.draw_pin(*element[1:7])
-                        symbol_items.extend(items)
+            symbol.offset_x, symbol.offset_y = self.to_canvas(x, y)
             
             # Store all items in temp_component dictionary
-            self.temp_component = {
-                'symbol': symbol_items,
-                'name': name_items,
-                'value': value_items
-            }
+            self.temp_component = symbol.draw_geometry(symbol_data)
+            self.preview_pins = self.world_pin_offsets(symbol, symbol_data)
+            self.font_sizes |= symbol.font_sizes
+            
+            # Tag the preview so it can be moved or deleted with a single call
+            for items in self.temp_component.values():
+                for item in items:
+                    self.canvas.addtag_withtag(PREVIEW_TAG, item)
+            self.preview_position = (x, y)
         else:
             self.logger.warning(f"Symbol {self.current_component} not found in library")
 
@@ -871,45 +1268,52 @@ class CircuitApp:
             self.mouse_x = event.x
             self.mouse_y = event.y
             
-            # Create new temporary component at new position
-            self.create_temp_component(event.x, event.y)
-            
-            self.logger.debug(f"Component position: ({event.x}, {event.y})")
+            # Coalesce motion events: only the latest position gets drawn
+            if not self.preview_pending:
+                self.preview_pending = True
+                self.root.after_idle(self.apply_preview_motion)
+
+    def apply_preview_motion(self):
+        self.preview_pending = False
+        if self.current_component and self.temp_component:
+            self.move_preview_to(self.mouse_x, self.mouse_y)
+            self.logger.debug(f"Component position: ({self.mouse_x}, {self.mouse_y})")
+
+    def move_preview_to(self, x, y, grid_size=20):
+        # Snap the pointer to the grid and shift the existing preview items by the delta
+        x, y = self.world_point(x, y)
+        x = round(x / grid_size) * grid_size
+        y = round(y / grid_size) * grid_size
+        dx = x - self.preview_position[0]
+        dy = y - self.preview_position[1]
+        if dx or dy:
+            self.canvas.move(PREVIEW_TAG, dx * self.zoom, dy * self.zoom)
+            self.preview_position = (x, y)
 
     def place_component(self, event):
         if self.current_component and self.temp_component:
-            # Get the next component number
+            # Get the next component name
             base_name = self.current_component
-            count = self.component_counters.get(base_name, 0) + 1
-            self.component_counters[base_name] = count
-            
-            # Snap to grid
-            grid_size = int(self.grid_size_var.get())
-            x = round(event.x / grid_size) * grid_size
-            y = round(event.y / grid_size) * grid_size
+            name_text = self.schematic.next_name(base_name)
             
-            # Create permanent component
-            self.create_temp_component(x, y)
+            # Snap to grid and turn the preview into the permanent component
+            self.move_preview_to(event.x, event.y, int(self.grid_size_var.get()))
+            x, y = self.preview_position
+            self.canvas.addtag_withtag(SCHEMATIC_TAG, PREVIEW_TAG)
+            bounds = self.world_box(self.canvas.bbox(PREVIEW_TAG))
+            self.canvas.dtag(PREVIEW_TAG, PREVIEW_TAG)
             
             # Store component with separate parts
-            component_data = {
-                'symbol': self.temp_component['symbol'],
-                'name': self.temp_component['name'],
-                'value': self.temp_component['value'],
-                'type': base_name,
-                'name_text': f"{base_name}{count}",
-                'origin': (x, y)
-            }
-            self.placed_components.append(component_data)
+            component_data = self.schematic.add(
+                base_name, (x, y), name_text=name_text, bounds=bounds,
+                pins=self.preview_pins,
+                symbol=self.temp_component['symbol'],
+                name=self.temp_component['name'],
+                value=self.temp_component['value']
+            )
             
-            # Add click handlers for movement
-            for item in component_data['symbol']:
-                self.canvas.tag_bind(item, '<Button-1>', 
-                    lambda e, c=component_data: self.start_component_move(e, c))
-                self.canvas.tag_bind(item, '<B1-Motion>', 
-                    lambda e, c=component_data: self.move_component(e, c))
-                self.canvas.tag_bind(item, '<ButtonRelease-1>', 
-                    lambda e, c=component_data: self.stop_component_move(e, c))
+            self.bind_component(component_data)
+            self.history.record(AddItems([component_data]))
             
             # Clear temporary component references but don't delete the items
             self.temp_component = []
@@ -918,12 +1322,22 @@ class CircuitApp:
             
             self.logger.info(f"Placed {base_name} at ({x}, {y})")
 
+    def bind_component(self, component):
+        # Add click handlers for movement
+        for item in component.symbol:
+            self.canvas.tag_bind(item, '<Button-1>', 
+                lambda e, c=component: self.start_component_move(e, c))
+            self.canvas.tag_bind(item, '<B1-Motion>', 
+                lambda e, c=component: self.move_component(e, c))
+            self.canvas.tag_bind(item, '<ButtonRelease-1>', 
+                lambda e, c=component: self.stop_component_move(e, c))
+
     def start_component_move(self, event, component):
         if self.current_tool == "select":
             self.moving_component = component
             self.last_x = event.x
             self.last_y = event.y
-            self.logger.debug(f"Started moving component {component['name_text']}")
+            self.logger.debug(f"Started moving component {component.name_text}")
 
     def move_component(self, event, component):
         if self.current_tool == "select" and self.moving_component == component:
@@ -931,37 +1345,41 @@ class CircuitApp:
             dx = event.x - self.last_x
             dy = event.y - self.last_y
             
-            # Update component position
-            component['origin'] = (component['origin'][0] + dx, component['origin'][1] + dy)
+            # Update component position (and its spatial index entry) in world units
+            self.schematic.move(component, dx / self.zoom, dy / self.zoom)
             
-            # Move all items in the component
-            for item in component['symbol']:
+            # Move all items in the component, labels included
+            for item in component.items():
                 self.canvas.move(item, dx, dy)
+            # Deltas of one drag merge into a single undo step
+            self.history.record(MoveComponents([component], dx / self.zoom, dy / self.zoom))
             
             # Update last position
             self.last_x = event.x
             self.last_y = event.y
             
-            self.logger.debug(f"Moving component {component['name_text']} by ({dx}, {dy})")
+            self.logger.debug(f"Moving component {component.name_text} by ({dx}, {dy})")
 
     def stop_component_move(self, event, component):
         if self.current_tool == "select" and self.moving_component == component:
             # Snap final position to grid if enabled
             if self.snap_grid_var.get():
                 grid_size = int(self.grid_size_var.get())
-                new_x = round(component['origin'][0] / grid_size) * grid_size
-                new_y = round(component['origin'][1] / grid_size) * grid_size
+                new_x = round(component.origin[0] / grid_size) * grid_size
+                new_y = round(component.origin[1] / grid_size) * grid_size
                 
                 # Move to final snapped position
-                dx = new_x - component['origin'][0]
-                dy = new_y - component['origin'][1]
-                for item in component['symbol']:
-                    self.canvas.move(item, dx, dy)
+                dx = new_x - component.origin[0]
+                dy = new_y - component.origin[1]
+                for item in component.items():
+                    self.canvas.move(item, dx * self.zoom, dy * self.zoom)
                 
-                component['origin'] = (new_x, new_y)
+                self.schematic.move(component, dx, dy)
+                self.history.record(MoveComponents([component], dx, dy))
             
+            self.history.seal()
             self.moving_component = None
-            self.logger.debug(f"Stopped moving component {component['name_text']}")
+            self.logger.debug(f"Stopped moving component {component.name_text}")
 
     def add_resistor(self, x, y):
         self.add_component(x, y)
@@ -984,6 +1402,8 @@ class CircuitApp:
     def add_component(self, x, y):
         self.logger.info(f"Adding component {self.current_component} at ({x}, {y})")
         symbol = EagleSymbol(self.canvas)
+        symbol.zoom = self.zoom
+        symbol.offset_x, symbol.offset_y = self.to_canvas(x, y)
         
         if self.current_component in self.symbols:
             # Generate automatic name when placing component
@@ -991,175 +1411,43 @@ class CircuitApp:
             auto_name = f"{self.current_component}{component_number}"
             
             symbol_data = self.symbols[self.current_component]
-            for cmd, *args in symbol_data:
-                try:
-                    if cmd == 'text':
-                        tx, ty, size, content, layer = args
-                        # Skip SPICEMODEL and SPICEEXTRA
-                        if content in ['>SPICEMODEL', '>SPICEEXTRA']:
-                            continue
-                        # Replace >NAME with auto_name when placing
-                        if content == '>NAME':
-                            content = auto_name
-                        symbol.draw_text(
-                            tx + x/symbol.scale,
-                            ty - y/symbol.scale,
-                            content,
-                            size,
-                            layer
-                        )
-                    elif cmd == 'wire':
-                        x1, y1, x2, y2, layer = args
-                        symbol.draw_wire(
-                            x1 + x/symbol.scale,
-                            y1 - y/symbol.scale,
-                            x2 + x/symbol.scale,
-                            y2 - y/symbol.scale,
-                            layer
-                        )
-                    elif cmd == 'circle':
-                        cx, cy, radius, layer = args
-                        symbol.draw_circle(
-                            cx + x/symbol.scale,
-                            cy + y/symbol.scale,
-                            radius,
-                            layer
-                        )
-                    elif cmd == 'arc':
-                        x1, y1, x2, y2, curve, layer = args
-                        symbol.draw_arc(
-                            x1 + x/symbol.scale,
-                            y1 + y/symbol.scale,
-                            abs(x2-x1)/2,  # radius
-                            0,  # start angle
-                            curve,  # end angle
-                            layer
-                        )
-                    elif cmd == 'pin':
-                        px, py, length, direction, name, layer = args
-                        symbol.draw_pin(
-                            px + x/symbol.scale,
-                            py - y/symbol.scale,  # Invert y coordinate
-                            length,
-                            direction,
-                            name,
-                            layer
-                        )
-                except Exception as e:
-                    self.logger.error(f"Error drawing {cmd}: {str(e)}")
+            items, bounds = self.draw_symbol_items(symbol, symbol_data, auto_name)
+            self.font_sizes |= symbol.font_sizes
             
             # Store component with separate parts
-            component_data = {
-                'symbol': symbol_items,
-                'name': name_items,
-                'value': value_items,
-                'type': self.current_component,
-                'name_text': auto_name,  # Store actual name text
-                'origin': (x, y)
-            }
-            self.placed_components.append(component_data)
+            component = self.schematic.add(
+                self.current_component, (x, y), name_text=auto_name,
+                bounds=bounds,
+                pins=self.world_pin_offsets(symbol, symbol_data),
+                symbol=items['symbol'],
+                name=items['name'],
+                value=items['value']
+            )
+            self.history.record(AddItems([component]))
         else:
             self.logger.warning(f"Symbol {self.current_component} not found in library")
 
+    def draw_symbol_items(self, symbol, geometry, name_text):
+        # Draw a placed symbol; returns its items and their bounding box
+        items = symbol.draw_geometry(geometry, name_text=name_text)
+        all_items = items['symbol'] + items['name'] + items['value']
+        for item in all_items:
+            self.canvas.addtag_withtag(SCHEMATIC_TAG, item)
+        return items, self.world_box(self.canvas.bbox(*all_items))
+
+    def draw_wire(self, start, end):
+        # start and end are world coordinates
+        return self.canvas.create_line(
+            *self.to_canvas(*start), *self.to_canvas(*end),
+            fill=EagleSymbol.WIRE_COLOR,
+            width=2 * self.zoom,
+            tags=(SCHEMATIC_TAG, STROKE_TAG)
+        )
+
     def load_eagle_library(self, filename):
         self.logger.info(f"Loading library: {filename}")
         try:
-            self.symbols = {}
-            tree = ET.parse(filename)
-            root = tree.getroot()
-            
-            symbol_count = 0
-            for symbol in root.findall(".//symbols/symbol"):
-                symbol_name = symbol.get('name')
-                symbol_data = []
-                
-                # Parse wires (lines)
-                for wire in symbol.findall("wire"):
-                    x1 = float(wire.get('x1', '0'))
-                    y1 = float(wire.get('y1', '0'))
-                    x2 = float(wire.get('x2', '0'))
-                    y2 = float(wire.get('y2', '0'))
-                    layer = wire.get('layer', '94')
-                    symbol_data.append(('wire', x1, y1, x2, y2, layer))
-                
-                # Parse circles
-                for circle in symbol.findall("circle"):
-                    x = float(circle.get('x', '0'))
-                    y = float(circle.get('y', '0'))
-                    radius = float(circle.get('radius', '1'))
-                    layer = circle.get('layer', '94')
-                    symbol_data.append(('circle', x, y, radius, layer))
-                
-                # Parse arcs
-                for arc in symbol.findall("arc"):
-                    x1 = float(arc.get('x1', '0'))
-                    y1 = float(arc.get('y1', '0'))
-                    x2 = float(arc.get('x2', '0'))
-                    y2 = float(arc.get('y2', '0'))
-                    curve = float(arc.get('curve', '90'))
-                    layer = arc.get('layer', '94')
-                    symbol_data.append(('arc', x1, y1, x2, y2, curve, layer))
-                
-                # Parse text
-                for text in symbol.findall("text"):
-                    x = float(text.get('x', '0'))
-                    y = float(text.get('y', '0'))
-                    size = float(text.get('size', '1'))
-                    layer = text.get('layer', '95')
-                    content = text.text or ''
-                    symbol_data.append(('text', x, y, size, content, layer))
-                
-                # Parse pins with safe length handling
-                for pin in symbol.findall("pin"):
-                    x = float(pin.get('x', '0'))
-                    y = float(pin.get('y', '0'))
-                    length_str = pin.get('length', 'short')
-                    # Convert Eagle pin lengths to numeric values
-                    length_map = {
-                        'short': 2.54,
-                        'middle': 5.08,
-                        'long': 7.62,
-                        'point': 0
-                    }
-                    length = length_map.get(length_str, 2.54)
-                    direction = pin.get('direction', 'io')
-                    name = pin.get('name', '')
-                    layer = "91"  # Standard pin layer
-                    symbol_data.append(('pin', x, y, length, direction, name, layer))
-                
-                if symbol_name == "C":
-                    symbol_data = [
-                        # Main capacitor plates (vertical lines)
-                        ('wire', -1.27, -2, -1.27, 0, "94"),  # Left plate (vertical)
-                        ('wire', 1.27, 0, 1.27, 2, "94"),     # Right plate (vertical)
-                        # Connection pins
-                        ('pin', -5.08, 0, 3, "R", "1", "91"),  # Left pin
-                        ('pin', 5.08, 0, 3, "L", "2", "91"),   # Right pin
-                        # Value and name labels
-                        ('text', 0, -3.81, 1.27, '>VALUE', "96"),  # Value above
-                        ('text', 0, 2.54, 1.27, '>NAME', "95"),    # Name below
-                    ]
-                
-                if symbol_name == "AMMETER":
-                    symbol_data = [
-                        # Circle
-                        ('circle', 0, 0, 2.54, "94"),  # Main circle
-                        # Arrow
-                        ('wire', 0, -1.27, 0, 1.27, "94"),    # Vertical line
-                        ('wire', -0.635, 0.635, 0, 1.27, "94"),  # Left diagonal
-                        ('wire', 0.635, 0.635, 0, 1.27, "94"),   # Right diagonal
-                        # Pins
-                        ('pin', 0, -2.54, 2, "D", "1", "91"),  # Top pin
-                        ('pin', 0, 2.54, 2, "U", "2", "91"),   # Bottom pin
-                        # Labels with adjusted positions
-                        ('text', 3.81, 0, 1.27, '>NAME', "95"),    # Name to the right
-                        ('text', 3.81, 2.54, 1.27, '>VALUE', "96") # Value above name
-                    ]
-                
-                self.symbols[symbol_name] = symbol_data
-                symbol_count += 1
-            
-            self.logger.info(f"Loaded {symbol_count} symbols from library")
+            self.symbols.register(filename)
         except Exception as e:
             self.logger.error(f"Error loading library: {str(e)}")
 
@@ -1222,35 +1510,14 @@ class CircuitApp:
         elif self.zoom > 5.0:
             self.zoom = 5.0
         
-        # Adjust all components scale
-        for component in self.placed_components:
-            for item in component['symbol']:
-                # Get current coordinates
-                coords = self.canvas.coords(item)
-                if coords:  # Check if item still exists
-                    # Scale coordinates around mouse position
-                    new_coords = []
-                    for i in range(0, len(coords), 2):
-                        cx = coords[i]
-                        cy = coords[i + 1]
-                        # Calculate new position relative to mouse
-                        dx = cx - x
-                        dy = cy - y
-                        new_coords.append(x + dx * (self.zoom / old_zoom))
-                        new_coords.append(y + dy * (self.zoom / old_zoom))
-                    # Update item position
-                    self.canvas.coords(item, *new_coords)
-                    
-                    # Scale line width for wires
-                    if self.canvas.type(item) == "line":
-                        self.canvas.itemconfig(item, width=2 * self.zoom)
-                    elif self.canvas.type(item) == "text":
-                        # Scale font size
-                        current_font = self.canvas.itemcget(item, "font")
-                        font_name = current_font.split()[0]
-                        base_size = 12  # Base font size
-                        new_size = int(base_size * self.zoom)
-                        self.canvas.itemconfig(item, font=(font_name, new_size))
+        # Scale every drawn item around the mouse in one call; only the view
+        # transform follows, the model stays in world coordinates
+        factor = self.zoom / old_zoom
+        if factor != 1.0:
+            self.canvas.scale(VIEW_TAGS, x, y, factor, factor)
+            ox, oy = self.view_origin
+            self.view_origin = (x + (ox - x) * factor, y + (oy - y) * factor)
+            self.apply_zoom_styles()
         
         # Redraw grid with new zoom level
         self.draw_grid()
@@ -1293,7 +1560,7 @@ class CircuitApp:
             
             # Clear previous selection if not holding shift
             if not event.state & 0x1:  # Check if shift is not pressed
-                self.selected_components = []
+                self.selected_components = {}
             
             self.logger.debug(f"Started selection at ({canvas_x}, {canvas_y})")
 
@@ -1319,16 +1586,17 @@ class CircuitApp:
             x1, x2 = min(x1, x2), max(x1, x2)
             y1, y2 = min(y1, y2), max(y1, y2)
             
-            # Find components in selection area
+            # Find components in selection area (only those near it are tested)
+            x1, y1, x2, y2 = self.world_box((x1, y1, x2, y2))
             newly_selected = []
-            for component in self.placed_components:
-                origin = component['origin']
+            for component in self.schematic.find((x1, y1, x2, y2)):
+                origin = component.origin
                 if (x1 <= origin[0] <= x2 and y1 <= origin[1] <= y2):
-                    if component not in self.selected_components:
+                    if component.id not in self.selected_components:
                         newly_selected.append(component)
             
             # Add newly selected components
-            self.selected_components.extend(newly_selected)
+            self.selected_components.update((component.id, component) for component in newly_selected)
             
             # Highlight all selected components
             self.highlight_selected_components()
@@ -1342,17 +1610,48 @@ class CircuitApp:
             
             self.logger.info(f"Selection ended, {len(newly_selected)} new components selected")
 
+    def to_canvas(self, x, y):
+        # World coordinates to canvas coordinates at the current view
+        ox, oy = self.view_origin
+        return x * self.zoom + ox, y * self.zoom + oy
+
+    def to_world(self, x, y):
+        ox, oy = self.view_origin
+        return (x - ox) / self.zoom, (y - oy) / self.zoom
+
+    def world_point(self, x, y):
+        # World coordinates of a pointer position in window coordinates
+        return self.to_world(self.canvas.canvasx(x), self.canvas.canvasy(y))
+
+    def world_box(self, box):
+        if box is None:
+            return None
+        x1, y1, x2, y2 = box
+        return (*self.to_world(x1, y1), *self.to_world(x2, y2))
+
+    def world_pin_offsets(self, symbol, geometry):
+        # Pin offsets drawn at the current zoom, in world units
+        return [(name, (dx / self.zoom, dy / self.zoom)) for name, (dx, dy) in symbol.pin_offsets(geometry)]
+
+    def apply_zoom_styles(self):
+        # Line widths and fonts are updated per item class, not per item
+        self.canvas.itemconfig(STROKE_TAG, width=2 * self.zoom)
+        self.canvas.itemconfig(MARKER_TAG, width=1.5 * self.zoom)
+        self.canvas.itemconfig(f"{SELECTED_TAG}&&{STROKE_TAG}", width=3 * self.zoom)
+        for base_size in self.font_sizes:
+            self.canvas.itemconfig(font_tag(base_size), font=("Arial", int(base_size * self.zoom)))
+
     def highlight_selected_components(self):
         # Remove previous highlights
-        for component in self.placed_components:
-            for item in component['symbol']:
-                self.canvas.itemconfig(item, width=2 * self.zoom)
+        self.canvas.dtag(SELECTED_TAG, SELECTED_TAG)
+        self.canvas.itemconfig(STROKE_TAG, width=2 * self.zoom)
         
         # Highlight selected components
-        for component in self.selected_components:
-            for item in component['symbol']:
-                # Make selected items thicker
-                self.canvas.itemconfig(item, width=3 * self.zoom)
+        for component in self.selected_components.values():
+            for item in component.symbol:
+                self.canvas.addtag_withtag(SELECTED_TAG, item)
+        # Make selected outlines thicker
+        self.canvas.itemconfig(f"{SELECTED_TAG}&&{STROKE_TAG}", width=3 * self.zoom)
 
     def delete_selected(self, event=None):
         if not self.selected_components:
@@ -1361,22 +1660,13 @@ class CircuitApp:
         # Store number of components being deleted for logging
         num_deleted = len(self.selected_components)
         
-        # Delete each selected component
-        for component in self.selected_components:
-            # Delete all canvas items for this component
-            for item in component['symbol']:
-                self.canvas.delete(item)
-            # Remove from placed components list
-            self.placed_components.remove(component)
-            
-            # Decrement component counter if it was the last one
-            component_type = component['type']
-            component_number = int(component['name_text'][len(component_type):])
-            if component_number == self.component_counters.get(component_type, 0):
-                self.component_counters[component_type] = component_number - 1
+        # Delete each selected component (also frees the last designator number)
+        components = list(self.selected_components.values())
+        self.delete_items(components, ())
+        self.history.record(RemoveItems(components))
         
         # Clear selection
-        self.selected_components = []
+        self.selected_components = {}
         
         self.logger.info(f"Deleted {num_deleted} component{'s' if num_deleted > 1 else ''}")
             
@@ -1398,11 +1688,27 @@ class CircuitApp:
         if not items:
             return
             
-        for component in self.placed_components:
+        # Wires are deleted as a whole
+        for item in items:
+            wire = self.schematic.wire_owner(item)
+            if wire is not None:
+                self.delete_items((), [wire])
+                self.history.record(RemoveItems(wires=[wire]))
+                self.logger.info(f"Deleted wire {wire.start} -> {wire.end}")
+                return
+        
+        # Group the clicked items by the component that owns them
+        clicked = {}
+        for item in items:
+            component = self.schematic.owner(item)
+            if component is not None:
+                clicked.setdefault(component.id, component)
+        
+        for component in clicked.values():
             # Check which part was clicked
-            clicked_symbol = set(items) & set(component['symbol'])
-            clicked_name = set(items) & set(component['name'])
-            clicked_value = set(items) & set(component['value'])
+            clicked_symbol = set(items) & set(component.symbol)
+            clicked_name = set(items) & set(component.name)
+            clicked_value = set(items) & set(component.value)
             
             if clicked_symbol:
                 # Delete entire component if clicking symbol origin
@@ -1415,30 +1721,25 @@ class CircuitApp:
                 
                 if is_origin:
                     # Delete everything
-                    for items in component.values():
-                        for item in items:
-                            self.canvas.delete(item)
-                    self.placed_components.remove(component)
-                    # Update counter
-                    component_type = component['type']
-                    component_number = int(component['name_text'][len(component_type):])
-                    if component_number == self.component_counters.get(component_type, 0):
-                        self.component_counters[component_type] = component_number - 1
-                    self.logger.info(f"Deleted component {component['name_text']}")
+                    self.delete_items([component], ())
+                    self.history.record(RemoveItems([component]))
+                    self.logger.info(f"Deleted component {component.name_text}")
                 break
                 
             elif clicked_name:
                 # Hide name if clicking name text or origin
-                for item in component['name']:
-                    self.canvas.itemconfig(item, state='hidden')
-                self.logger.info(f"Hidden name for component {component['name_text']}")
+                hidden = component.name_hidden
+                self.edit_component(component, 'name_hidden', True)
+                self.history.record(EditComponent(component, 'name_hidden', hidden, True))
+                self.logger.info(f"Hidden name for component {component.name_text}")
                 break
                 
             elif clicked_value:
                 # Hide value if clicking value text or origin
-                for item in component['value']:
-                    self.canvas.itemconfig(item, state='hidden')
-                self.logger.info(f"Hidden value for component {component['name_text']}")
+                hidden = component.value_hidden
+                self.edit_component(component, 'value_hidden', True)
+                self.history.record(EditComponent(component, 'value_hidden', hidden, True))
+                self.logger.info(f"Hidden value for component {component.name_text}")
                 break
 
 if __name__ == "__main__":
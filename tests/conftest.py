@@ -0,0 +1,58 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from circuit_core import Circuit, assemble_dc  # noqa: E402
+
+
+def dense_solve(circuit):
+    """Reference DC solution: the assembled MNA system solved densely"""
+    matrix, rhs = assemble_dc(circuit)
+    return np.linalg.solve(matrix.toarray(), rhs)
+
+
+def build_mixed():
+    """Linear circuit with every element kind, including controlled sources and a transformer"""
+    c = Circuit()
+    c.add_voltage_source('V1', 'in', '0', 2)
+    c.add_resistor('R1', 'in', 'a', 1e3)
+    c.add_resistor('R2', 'a', '0', 2e3)
+    c.add_current_source('I1', '0', 'a', 1e-3)
+    c.add_capacitor('C1', 'a', '0', 1e-6)
+    c.add_inductor('L1', 'a', 'b', 1e-3)
+    c.add_resistor('R3', 'b', '0', 500)
+    c.add_vcvs('E1', 'e', '0', 'a', '0', 3)
+    c.add_resistor('RE', 'e', 'f', 1e3)
+    c.add_vccs('G1', '0', 'f', 'a', '0', 1e-3)
+    c.add_resistor('RF', 'f', '0', 1e3)
+    c.add_ccvs('H1', 'h', '0', 'V1', 50)
+    c.add_resistor('RH', 'h', 'f', 2e3)
+    c.add_cccs('F1', '0', 'f', 'V1', 0.5)
+    c.add_transformer('T1', 'f', '0', 's', '0', 2)
+    c.add_resistor('RS', 's', '0', 300)
+    c.add_ac_source('VAC', 'in2', '0', 1.0, phase=30)
+    c.add_resistor('RA', 'in2', 'a', 1e3)
+    return c
+
+
+def build_ladder(sections, source=10.0):
+    c = Circuit()
+    c.add_voltage_source('V1', 'n0', '0', source)
+    for i in range(sections):
+        c.add_resistor(f'Rs{i}', f'n{i}', f'n{i + 1}', 1e3 * (i + 1))
+        c.add_resistor(f'Rp{i}', f'n{i + 1}', '0', 2e3)
+    return c
+
+
+@pytest.fixture
+def mixed():
+    return build_mixed()
+
+
+@pytest.fixture
+def ladder():
+    return build_ladder(6)
@@ -0,0 +1,51 @@
+"""AC sweeps against analytic transfer functions and a dense complex solve"""
+import numpy as np
+import pytest
+
+from circuit_core import Circuit, ac_sweep, assemble_dc, assemble_reactive
+from circuit_core.ac import assemble_ac_rhs
+
+FREQUENCIES = np.logspace(1, 6, 41)
+
+
+def rc_lowpass():
+    c = Circuit()
+    c.add_ac_source('V1', 'in', '0', 1.0)
+    c.add_resistor('R1', 'in', 'out', 1e3)
+    c.add_capacitor('C1', 'out', '0', 1e-7)
+    return c
+
+
+def dense_sweep(circuit, frequencies, node):
+    G = assemble_dc(circuit)[0].toarray()
+    C = assemble_reactive(circuit).toarray()
+    rhs = assemble_ac_rhs(circuit)
+    row = circuit.unknown_index(node)
+    return np.array([np.linalg.solve(G + 2j * np.pi * f * C, rhs)[row] for f in frequencies])
+
+
+@pytest.mark.parametrize('method', ['auto', 'modal', 'batched', 'sparse'])
+def test_rc_lowpass(method):
+    result = ac_sweep(rc_lowpass(), FREQUENCIES, outputs=['out'], method=method)
+    expected = 1.0 / (1.0 + 2j * np.pi * FREQUENCIES * 1e3 * 1e-7)
+    np.testing.assert_allclose(result.phasor('out'), expected, rtol=1e-9)
+
+
+def test_bode_at_corner():
+    corner = 1.0 / (2 * np.pi * 1e3 * 1e-7)
+    magnitude, phase = ac_sweep(rc_lowpass(), [corner]).bode('out')
+    assert magnitude[0] == pytest.approx(-10 * np.log10(2))
+    assert phase[0] == pytest.approx(-45.0)
+
+
+@pytest.mark.parametrize('method', ['modal', 'batched', 'sparse'])
+def test_mixed_circuit_matches_dense_solve(mixed, method):
+    result = ac_sweep(mixed, FREQUENCIES, outputs=['f', 's'], method=method)
+    for node in ('f', 's'):
+        np.testing.assert_allclose(result.phasor(node), dense_sweep(mixed, FREQUENCIES, node),
+                                   rtol=1e-7, atol=1e-12)
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        ac_sweep(rc_lowpass(), FREQUENCIES, method='modla')
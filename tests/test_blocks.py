@@ -0,0 +1,60 @@
+"""Block decomposition solves against the plain sparse solver"""
+import numpy as np
+import pytest
+
+from circuit_core import BlockSolver, Circuit, DCSolver, SingularCircuitError
+from conftest import build_ladder
+
+
+def independent_stages(count):
+    c = Circuit()
+    for i in range(count):
+        c.add_voltage_source(f'V{i}', f'a{i}', '0', 1 + i % 3)
+        c.add_resistor(f'R1_{i}', f'a{i}', f'b{i}', 1e3)
+        c.add_resistor(f'R2_{i}', f'b{i}', '0', 2e3 * (1 + i % 5))
+        if i % 7 == 0:
+            c.add_vcvs(f'E{i}', f'o{i}', '0', f'b{i}', '0', 3)
+            c.add_resistor(f'RL{i}', f'o{i}', '0', 1e3)
+    return c
+
+
+@pytest.mark.parametrize('workers, dense_block', [(1, 32), (4, 2)])
+def test_matches_dcsolver(workers, dense_block):
+    c = independent_stages(60)
+    solver = BlockSolver(c, workers=workers, dense_block=dense_block)
+    np.testing.assert_allclose(solver.solve().x, DCSolver(c).solve().x, rtol=1e-12, atol=1e-14)
+    assert solver.structure.components == 60
+
+
+def test_mixed_circuit(mixed):
+    np.testing.assert_allclose(BlockSolver(mixed).solve().x, DCSolver(mixed).solve().x, rtol=1e-10, atol=1e-14)
+
+
+def test_feed_forward_chain_has_levels():
+    c = Circuit()
+    c.add_voltage_source('V', 'n0', '0', 1)
+    for i in range(10):
+        c.add_resistor(f'R{i}', f'n{i}', '0', 1e3)
+        c.add_vcvs(f'E{i}', f'n{i + 1}', '0', f'n{i}', '0', 1.5)
+    c.add_resistor('RL', 'n10', '0', 1)
+    solver = BlockSolver(c)
+    assert solver.solve().voltage('n10') == pytest.approx(1.5 ** 10)
+    assert solver.structure.depth > 1
+
+
+def test_value_edits():
+    c = build_ladder(10)
+    solver = BlockSolver(c)
+    solver.solve()
+    solver.set_value('Rs3', '2.2k')
+    solver.set_value('V1', 4)
+    np.testing.assert_allclose(solver.solve().x, DCSolver(c).solve().x, rtol=1e-12)
+
+
+def test_structurally_singular_names_the_unknown():
+    c = Circuit()
+    c.add_voltage_source('V1', 'a', '0', 1)
+    c.add_voltage_source('V2', 'a', '0', 2)
+    c.add_resistor('R', 'a', '0', 1)
+    with pytest.raises(SingularCircuitError, match='V'):
+        BlockSolver(c).solve()
@@ -0,0 +1,63 @@
+"""Incremental net extraction against a full rebuild"""
+import random
+
+from circuit_core import Schematic
+from circuit_core.connectivity import Connectivity
+
+
+def canonical(connectivity):
+    connectivity.refresh()
+    return sorted(sorted(map(repr, members)) for members in connectivity.members.values())
+
+
+def rebuilt(connectivity):
+    """Copy of the tracked points and links with every net extracted from scratch"""
+    copy = Connectivity()
+    copy.points = dict(connectivity.points)
+    copy.cells = {key: set(value) for key, value in connectivity.cells.items()}
+    copy.links = {key: set(value) for key, value in connectivity.links.items()}
+    copy.rebuild()
+    return copy
+
+
+def test_incremental_edits_match_rebuild():
+    rng = random.Random(1)
+
+    def coordinate():
+        return rng.randint(0, 20) * 10
+
+    connectivity = Connectivity()
+    for i in range(500):
+        connectivity.add_point(('p', i), coordinate(), coordinate())
+    for i in range(100):
+        connectivity.add_wire(i, coordinate(), coordinate(), coordinate(), coordinate())
+    connectivity.refresh()
+    for step in range(200):
+        key = ('p', rng.randrange(500))
+        if key in connectivity.points:
+            connectivity.move_point(key, coordinate(), coordinate())
+        if step % 7 == 0:
+            connectivity.remove_wire(rng.randrange(100))
+        if step % 11 == 0:
+            connectivity.add_wire(1000 + step, coordinate(), 0, 0, coordinate())
+        if step % 13 == 0:
+            connectivity.remove_point(('p', rng.randrange(500)))
+        if step % 3 == 0:
+            connectivity.refresh()
+        if step % 20 == 0:
+            assert canonical(connectivity) == canonical(rebuilt(connectivity)), step
+
+
+def test_schematic_nets_follow_wires_and_moves():
+    schematic = Schematic()
+    first = schematic.add('R', (0, 0), pins=[('1', (0, 0)), ('2', (40, 0))])
+    second = schematic.add('R', (100, 0), pins=[('1', (0, 0)), ('2', (40, 0))])
+    assert len(schematic.nets()) == 4
+    wire = schematic.add_wire((40, 0), (100, 0))
+    schematic.nets()
+    assert first.pins[1].net == second.pins[0].net
+    schematic.remove_wire(wire)
+    schematic.move(second, -60, 0)
+    schematic.nets()
+    assert first.pins[1].net == second.pins[0].net
+    assert len(schematic.nets()) == 3
@@ -0,0 +1,27 @@
+"""Lazy package exports resolve to the same objects whatever was imported first"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(code):
+    # A fresh interpreter: a collision only shows before the export is cached
+    subprocess.run([sys.executable, '-c', code], check=True, cwd=ROOT)
+
+
+def test_transient_is_the_function():
+    _run("from circuit_core import Pulse, transient; assert callable(transient), transient")
+
+
+def test_sweep_is_the_function():
+    _run("from circuit_core import grid, sweep; assert callable(sweep), sweep")
+    _run("from circuit_core import monte_carlo, sweep; assert callable(sweep), sweep")
+
+
+def test_exports_match_their_modules():
+    import circuit_core
+    for name, module_name in circuit_core._EXPORTS.items():
+        module = __import__(f'circuit_core.{module_name}', fromlist=[name])
+        assert getattr(circuit_core, name) is getattr(module, name), name
@@ -0,0 +1,74 @@
+"""DC MNA solutions against analytic results and a dense reference solve"""
+import numpy as np
+import pytest
+
+from circuit_core import Circuit, DCSolver, SingularCircuitError, parse_value, solve_dc
+from conftest import build_ladder, dense_solve
+
+
+def test_voltage_divider():
+    c = Circuit()
+    c.add_voltage_source('V1', 'in', '0', 9)
+    c.add_resistor('R1', 'in', 'out', '1k')
+    c.add_resistor('R2', 'out', '0', '2k')
+    solution = solve_dc(c)
+    assert solution.voltage('out') == pytest.approx(6.0)
+    # SPICE convention: the source current flows out of its positive terminal as a negative value
+    assert solution.current('V1') == pytest.approx(-3e-3)
+    assert solution.current('R1') == pytest.approx(3e-3)
+
+
+def test_current_source_into_resistor():
+    c = Circuit()
+    c.add_current_source('I1', '0', 'a', 2e-3)
+    c.add_resistor('R1', 'a', '0', 500)
+    assert solve_dc(c).voltage('a') == pytest.approx(1.0)
+
+
+def test_inductor_shorts_and_capacitor_opens(mixed):
+    solution = DCSolver(mixed).solve()
+    assert solution.voltage('a') == pytest.approx(solution.voltage('b'))
+    assert solution.current('C1') == 0.0
+
+
+def test_controlled_sources_match_dense_reference(mixed):
+    x = DCSolver(mixed).solve().x
+    np.testing.assert_allclose(x, dense_solve(mixed), rtol=1e-10, atol=1e-13)
+    solution = DCSolver(mixed).solve()
+    assert solution.voltage('e') == pytest.approx(3 * solution.voltage('a'))
+    assert solution.voltage('s') == pytest.approx(2 * solution.voltage('f'))
+
+
+@pytest.mark.parametrize('text, value', [('4.7k', 4700.0), ('1meg', 1e6), ('10u', 1e-5), ('2m', 2e-3), (5, 5.0)])
+def test_parse_value(text, value):
+    assert parse_value(text) == pytest.approx(value)
+
+
+def test_incremental_updates_match_rebuild():
+    c = build_ladder(30)
+    solver = DCSolver(c, max_updates=4)
+    solver.solve()
+    rng = np.random.default_rng(1)
+    # More edits than max_updates, so both the low-rank and the refactor paths run
+    for step in range(12):
+        solver.set_value(f'Rs{rng.integers(30)}', float(rng.uniform(100, 1e4)))
+        if step % 5 == 0:
+            solver.set_value('V1', float(rng.uniform(1, 20)))
+        np.testing.assert_allclose(solver.solve().x, dense_solve(c), rtol=1e-9, atol=1e-12)
+
+
+def test_structure_change_rebuilds():
+    c = build_ladder(3)
+    solver = DCSolver(c)
+    solver.solve()
+    c.add_resistor('Rx', 'n3', '0', 1e3)
+    np.testing.assert_allclose(solver.solve().x, dense_solve(c))
+
+
+def test_floating_node_is_singular():
+    c = Circuit()
+    c.add_voltage_source('V1', 'a', '0', 1)
+    c.add_resistor('R1', 'a', '0', 1)
+    c.add_capacitor('C1', 'a', 'float', 1e-6)
+    with pytest.raises(SingularCircuitError):
+        solve_dc(c)
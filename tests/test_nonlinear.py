@@ -0,0 +1,61 @@
+"""Newton-Raphson operating points checked against the device equations"""
+import math
+
+import pytest
+
+from circuit_core import Circuit, NewtonSolver, solve_dc
+from circuit_core.mna import DEVICE_MODELS
+from circuit_core.nonlinear import THERMAL_VOLTAGE
+
+
+def diode_circuit(supply=5.0, resistance=1e3):
+    c = Circuit()
+    c.add_voltage_source('V1', 'a', '0', supply)
+    c.add_resistor('R1', 'a', 'd', resistance)
+    c.add_diode('D1', 'd', '0')
+    return c
+
+
+def test_diode_satisfies_kcl():
+    solution = solve_dc(diode_circuit())
+    vd = solution.voltage('d')
+    model = DEVICE_MODELS['DMOD']
+    diode_current = model['IS'] * (math.exp(vd / (model['N'] * THERMAL_VOLTAGE)) - 1)
+    assert (5.0 - vd) / 1e3 == pytest.approx(diode_current, rel=1e-6)
+    assert 0.6 < vd < 0.8
+
+
+def test_nmos_in_saturation():
+    c = Circuit()
+    c.add_voltage_source('VDD', 'vdd', '0', 10)
+    c.add_resistor('RD', 'vdd', 'd', 2e3)
+    c.add_voltage_source('VG', 'g', '0', 3)
+    c.add_mosfet('M1', 'd', 'g', '0')
+    solution = solve_dc(c)
+    vd = solution.voltage('d')
+    model = DEVICE_MODELS['NFET']
+    # Square law with channel-length modulation: KP/2 (Vgs - Vt)^2 (1 + lambda Vds)
+    drain_current = model['KP'] / 2 * (3 - model['VTO']) ** 2 * (1 + model['LAMBDA'] * vd)
+    assert (10 - vd) / 2e3 == pytest.approx(drain_current, rel=1e-6)
+
+
+def test_cmos_inverter_chain_converges():
+    c = Circuit()
+    c.add_voltage_source('VDD', 'vdd', '0', 5)
+    c.add_voltage_source('VIN', 'n0', '0', 0)
+    for i in range(20):
+        c.add_mosfet(f'MP{i}', f'n{i + 1}', f'n{i}', 'vdd', 'PFET')
+        c.add_mosfet(f'MN{i}', f'n{i + 1}', f'n{i}', '0', 'NFET')
+        c.add_resistor(f'RL{i}', f'n{i + 1}', '0', 1e6)
+    solution = solve_dc(c)
+    assert solution.voltage('n1') == pytest.approx(5.0, abs=0.05)
+    assert solution.voltage('n2') == pytest.approx(0.0, abs=0.05)
+
+
+def test_set_value_parses_strings():
+    c = diode_circuit()
+    solver = NewtonSolver(c)
+    solver.solve()
+    solver.set_value('R1', '2k')
+    reference = solve_dc(diode_circuit(resistance=2e3))
+    assert solver.solve().voltage('d') == pytest.approx(reference.voltage('d'), rel=1e-9)
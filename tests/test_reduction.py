@@ -0,0 +1,62 @@
+"""Series/parallel reduction against full solves of the original circuit"""
+import pytest
+
+from circuit_core import Circuit, reduce_circuit, solve_dc
+from conftest import build_ladder
+
+
+def assert_same_solution(circuit, **options):
+    reduction = reduce_circuit(circuit, **options)
+    reduced = reduction.solve()
+    reference = solve_dc(circuit)
+    for node in circuit.nodes:
+        assert reduced.voltage(node) == pytest.approx(reference.voltage(node), rel=1e-9, abs=1e-12)
+    for name in circuit.resistors.names + circuit.vsources.names + circuit.inductors.names:
+        assert reduced.current(name) == pytest.approx(reference.current(name), rel=1e-9, abs=1e-12)
+    return reduction
+
+
+def test_ladder_reduces_to_one_resistor():
+    reduction = assert_same_solution(build_ladder(6))
+    assert len(reduction.circuit.resistors) == 1
+
+
+def bridge():
+    c = Circuit()
+    c.add_voltage_source('V', 't', '0', 5)
+    c.add_resistor('R1', 't', 'x', 100)
+    c.add_resistor('R2', 't', 'y', 200)
+    c.add_resistor('R3', 'x', 'y', 300)
+    c.add_resistor('R4', 'x', '0', 400)
+    c.add_resistor('R5', 'y', '0', 500)
+    return c
+
+
+@pytest.mark.parametrize('star_delta', [False, True])
+def test_bridge(star_delta):
+    reduction = assert_same_solution(bridge(), star_delta=star_delta)
+    assert (len(reduction.circuit.resistors) < 5) == star_delta
+
+
+def test_inductors_capacitors_and_dead_ends():
+    c = Circuit()
+    c.add_voltage_source('V', 'a', '0', 1)
+    c.add_inductor('L1', 'a', 'm', 1e-3)
+    c.add_inductor('L2', 'b', 'm', 2e-3)
+    c.add_resistor('R', 'b', '0', 10)
+    c.add_inductor('L3', 'a', 'p', 1e-3)
+    c.add_resistor('R2', 'p', '0', 5)
+    c.add_capacitor('C1', 'a', '0', 1e-6)
+    c.add_capacitor('C2', 'a', '0', 1e-6)
+    c.add_resistor('Rd', 'b', 'dead', 1)
+    assert_same_solution(c)
+
+
+def test_keeps_nonlinear_nodes():
+    c = Circuit()
+    c.add_voltage_source('V', 'a', '0', 5)
+    c.add_resistor('R1', 'a', 'm', 500)
+    c.add_resistor('R2', 'm', 'k', 500)
+    c.add_diode('D', 'k', '0')
+    reduction = reduce_circuit(c)
+    assert reduction.solve().voltage('k') == pytest.approx(solve_dc(c).voltage('k'), rel=1e-6)
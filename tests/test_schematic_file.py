@@ -0,0 +1,65 @@
+"""Round trips through the binary schematic format"""
+import io
+import json
+
+import pytest
+
+from circuit_core import Schematic
+from circuit_core.schematic_file import (SchematicFile, SchematicFormatError, export_json, load_schematic,
+                                         save_schematic)
+
+
+@pytest.fixture
+def schematic():
+    s = Schematic()
+    for i in range(5):
+        s.add('R', (i * 10.0, 0.0), value_text='1k', pins=[('1', (0, 0)), ('2', (10, 0))])
+    s.add('C', (0, 50.0), name_text='C9', pins=[('1', (0, 0)), ('2', (0, 10))],
+          attributes={'SPICEMODEL': 'cap'})
+    s.add('GND', (0, 60.0), name_text='GND1', pins=[('1', (0, 0))])
+    s.add_wire((0, 0), (0, 50))
+    return s
+
+
+def describe(schematic):
+    return ([(c.type, c.name_text, c.value_text, tuple(c.origin),
+              [(p.name, tuple(p.offset)) for p in c.pins], c.attributes) for c in schematic],
+            sorted((tuple(w.start), tuple(w.end)) for w in schematic.wires.values()))
+
+
+def test_round_trip(schematic, tmp_path):
+    path = tmp_path / 'a.csch'
+    save_schematic(schematic, path, meta={'zoom': 2.0})
+    loaded = load_schematic(path)
+    assert describe(loaded) == describe(schematic)
+    assert loaded.counters == schematic.counters
+    assert loaded.next_name('R') == 'R6'
+    assert len(loaded.nets()) == len(schematic.nets())
+    with SchematicFile(path) as schematic_file:
+        assert schematic_file.meta == {'zoom': 2.0}
+        assert len(schematic_file) == 7
+
+
+def test_close_with_live_views(schematic, tmp_path):
+    path = tmp_path / 'a.csch'
+    save_schematic(schematic, path)
+    with SchematicFile(path) as schematic_file:
+        x = schematic_file.components['x']
+    assert x.tolist() == [0.0, 10.0, 20.0, 30.0, 40.0, 0.0, 0.0]
+
+
+def test_export_json(schematic):
+    stream = io.StringIO()
+    export_json(schematic, stream)
+    document = json.loads(stream.getvalue())
+    assert [c['name'] for c in document['components']] == ['R1', 'R2', 'R3', 'R4', 'R5', 'C9', 'GND1']
+    assert document['components'][5]['attributes'] == {'SPICEMODEL': 'cap'}
+    assert document['wires'] == [{'start': [0, 0], 'end': [0, 50]}]
+
+
+@pytest.mark.parametrize('content', [b'', b'not a schematic file'])
+def test_rejects_other_files(content, tmp_path):
+    path = tmp_path / 'bad.csch'
+    path.write_bytes(content)
+    with pytest.raises(SchematicFormatError):
+        SchematicFile(path)
@@ -0,0 +1,73 @@
+"""Adjoint sensitivities against finite differences of full re-solves"""
+import copy
+
+import numpy as np
+import pytest
+
+from circuit_core import DCSolver, ac_sensitivities, ac_sweep, dc_sensitivities
+from circuit_core.sensitivity import GAIN_TABLES, VALUE_TABLES, element_names
+
+OUTPUT = 'f'
+
+
+def table_of(circuit, name):
+    """(values array, row) holding the value of an element"""
+    for attribute in VALUE_TABLES:
+        table = getattr(circuit, attribute)
+        if name in table.index:
+            return table.values, table.index[name]
+    for attribute, parameter in GAIN_TABLES:
+        table = getattr(circuit, attribute)
+        if name in table.index:
+            return table.parameters[parameter], table.index[name]
+    raise KeyError(name)
+
+
+def perturbed(circuit, name):
+    """Copy of circuit with one value nudged, and the step taken"""
+    circuit = copy.deepcopy(circuit)
+    values, row = table_of(circuit, name)
+    step = abs(values[row]) * 1e-6 or 1e-9
+    values[row] += step
+    return circuit, step
+
+
+def test_dc_matches_finite_differences(mixed):
+    S = dc_sensitivities(mixed, OUTPUT)
+    base = DCSolver(mixed).solve().voltage(OUTPUT)
+    assert S.response == pytest.approx(base)
+    for name in element_names(mixed):
+        circuit, step = perturbed(mixed, name)
+        difference = (DCSolver(circuit).solve().voltage(OUTPUT) - base) / step
+        assert S[name] == pytest.approx(difference, rel=1e-4, abs=1e-9), name
+
+
+def test_ac_matches_finite_differences(mixed):
+    frequencies = [100.0, 1e4]
+    A = ac_sensitivities(mixed, OUTPUT, frequencies)
+    base = ac_sweep(mixed, frequencies, outputs=[OUTPUT]).phasor(OUTPUT)
+    np.testing.assert_allclose(A.response, base, rtol=1e-10)
+    for name in element_names(mixed):
+        if name in mixed.vsources.index or name in mixed.isources.index:
+            # Sources are differentiated with respect to their AC amplitude
+            circuit, step = copy.deepcopy(mixed), 1e-6
+            phasor = mixed.ac_phasors.get(name, 0)
+            direction = phasor / abs(phasor) if phasor else 1
+            circuit.ac_phasors[name] = (abs(phasor) + step) * direction
+        else:
+            circuit, step = perturbed(mixed, name)
+        difference = (ac_sweep(circuit, frequencies, outputs=[OUTPUT]).phasor(OUTPUT) - base) / step
+        np.testing.assert_allclose(A[name], difference, rtol=1e-4, atol=1e-9, err_msg=name)
+
+
+def test_reuses_solver_with_pending_updates(mixed):
+    solver = DCSolver(mixed)
+    solver.solve()
+    solver.set_value('R1', 1500)
+    S = dc_sensitivities(mixed, OUTPUT, solver=solver)
+    assert S.response == pytest.approx(DCSolver(copy.deepcopy(mixed)).solve().voltage(OUTPUT))
+
+
+def test_rejects_solver_of_another_circuit(mixed):
+    with pytest.raises(ValueError):
+        dc_sensitivities(mixed, OUTPUT, solver=DCSolver(copy.deepcopy(mixed)))
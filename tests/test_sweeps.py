@@ -0,0 +1,61 @@
+"""Sweeps and Monte Carlo runs against one DCSolver solve per run"""
+import copy
+
+import numpy as np
+import pytest
+
+from circuit_core import DCSolver, Schematic, grid, monte_carlo, sweep
+from circuit_core.mna import set_element_value
+from conftest import build_ladder
+
+
+def reference(circuit, result, outputs):
+    """Outputs of every run of result, each solved on its own"""
+    rows = []
+    for values in result.values:
+        run = copy.deepcopy(circuit)
+        for name, value in zip(result.names, values):
+            set_element_value(run, name, value)
+        solution = DCSolver(run).solve()
+        rows.append([solution.voltage(name) for name in outputs])
+    return np.array(rows)
+
+
+@pytest.mark.parametrize('method', ['batch', 'pool'])
+def test_grid_sweep(method):
+    circuit = build_ladder(4)
+    outputs = ['n2', 'n4']
+    parameters = grid({'Rs0': [500, 1e3, 2e3], 'Rp3': [1e3, 4.7e3], 'V1': [5, 10]})
+    result = sweep(circuit, parameters, outputs=outputs, method=method, workers=1)
+    assert len(result) == 12
+    np.testing.assert_allclose(result.parameter('Rp3'), parameters['Rp3'])
+    np.testing.assert_allclose(result.results, reference(circuit, result, outputs), rtol=1e-10)
+    assert circuit.resistors.values[0] == 1e3  # The swept circuit is left as it was
+
+
+def test_monte_carlo_is_reproducible():
+    circuit = build_ladder(3)
+    tolerances = {'Rs0': 0.05, 'Rp1': 0.1}
+    first = monte_carlo(circuit, tolerances, 50, outputs=['n3'], seed=1)
+    again = monte_carlo(circuit, tolerances, 50, outputs=['n3'], seed=first.seed, method='pool', workers=1)
+    np.testing.assert_allclose(first.values, again.values)
+    np.testing.assert_allclose(first.results, again.results, rtol=1e-10)
+    spread = first.parameter('Rs0') / 1e3 - 1
+    assert np.all(np.abs(spread) <= 0.05) and spread.std() > 0.01
+    np.testing.assert_allclose(first.results, reference(circuit, first, ['n3']), rtol=1e-10)
+
+
+def test_schematic_pins():
+    schematic = Schematic()
+    schematic.add('VOLTAGE', (0, 0), value_text='10', pins=[('+', (0, 0)), ('-', (0, 40))])
+    schematic.add('R', (0, 0), value_text='1k', pins=[('1', (0, 0)), ('2', (40, 0))])
+    schematic.add('R', (40, 0), value_text='3k', pins=[('1', (0, 0)), ('2', (0, 40))])
+    schematic.add('GND', (0, 40), pins=[('1', (0, 0))])
+    schematic.add_wire((0, 40), (40, 40))
+    result = sweep(schematic, {'R2': [1e3, 3e3]}, outputs=['R2.1'], method='batch')
+    np.testing.assert_allclose(result.output('R2.1'), [5.0, 7.5])
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        sweep(build_ladder(2), {'Rs0': [1.0]}, method='serial')
@@ -0,0 +1,50 @@
+"""Symbolic MNA solutions evaluated against the numeric solvers"""
+import pytest
+
+from circuit_core import Circuit, ac_sweep, solve_dc
+
+sympy = pytest.importorskip('sympy')
+
+from circuit_core.symbolic import SymbolicCache, solve_symbolic  # noqa: E402
+
+
+def test_divider_with_current_source():
+    c = Circuit()
+    c.add_voltage_source('V1', 'a', '0', 5)
+    c.add_resistor('R1', 'a', 'b', 1000)
+    c.add_resistor('R2', 'b', '0', 2000)
+    c.add_current_source('I1', '0', 'b', 0.001)
+    solution = solve_symbolic(c)
+    reference = solve_dc(c)
+    assert solution.evaluate(solution.voltage('b')) == pytest.approx(reference.voltage('b'))
+    assert solution.evaluate(solution.current('V1')) == pytest.approx(reference.current('V1'))
+    assert solution.evaluate(solution.voltage('b'), R2=1000) == pytest.approx(3.0)
+
+
+def test_rlc_matches_ac_sweep():
+    c = Circuit()
+    c.add_ac_source('V1', 'in', '0', 1.0)
+    c.add_resistor('R1', 'in', 'm', 50)
+    c.add_inductor('L1', 'm', 'o', 1e-3)
+    c.add_capacitor('C1', 'o', '0', 1e-6)
+    c.add_resistor('R2', 'o', '0', 1e3)
+    solution = solve_symbolic(c)
+    expected = ac_sweep(c, [3000.0], outputs=['o']).phasor('o')[0]
+    # Sources take their DC values unless given, so V1 is set to its AC amplitude
+    response = solution.evaluate(solution.voltage('o'), frequency=3000.0, V1=1.0)
+    assert response == pytest.approx(expected, rel=1e-9)
+
+
+def test_cache_reuses_structure():
+    c = Circuit()
+    for k in range(3):
+        c.add_voltage_source(f'V{k}', f'a{k}', '0', 1)
+        c.add_resistor(f'Ra{k}', f'a{k}', f'b{k}', 1)
+        c.add_resistor(f'Rb{k}', f'b{k}', '0', 1)
+    cache = SymbolicCache()
+    solve_symbolic(c, cache)
+    assert (cache.hits, cache.misses) == (2, 1)
+    c.resistors.values[0] = 3
+    solution = solve_symbolic(c, cache)
+    assert cache.misses == 1
+    assert solution.evaluate(solution.voltage('b0')) == pytest.approx(0.25)
@@ -0,0 +1,48 @@
+"""Transient runs against analytic RC responses"""
+import numpy as np
+import pytest
+
+from circuit_core import Circuit, Pulse, Sine, TransientSimulator, transient
+
+
+def rc(waveform):
+    c = Circuit()
+    c.add_voltage_source('V1', 'in', '0', 0)
+    c.add_resistor('R1', 'in', 'out', 1e3)
+    c.add_capacitor('C1', 'out', '0', 1e-6)
+    c.set_waveform('V1', waveform)
+    return c
+
+
+def collect(chunks):
+    chunks = list(chunks)
+    return np.concatenate([chunk.time for chunk in chunks]), np.concatenate([chunk.values for chunk in chunks])
+
+
+def test_step_response():
+    simulator = TransientSimulator(rc(Pulse(0, 1, delay=1e-4, rise=1e-9)), 5e-3, 1e-5, ['out'], chunk_size=64)
+    time, values = collect(simulator.chunks())
+    np.testing.assert_allclose(time, np.arange(501) * 1e-5, atol=1e-15)
+    expected = np.where(time > 1e-4, 1 - np.exp(-(time - 1e-4) / 1e-3), 0.0)
+    np.testing.assert_allclose(values[:, 0], expected, atol=2e-3)
+
+
+def test_sine_steady_state():
+    frequency = 200.0
+    time, values = collect(transient(rc(Sine(0, 1, frequency)), 50e-3, 1e-5, ['out']))
+    gain = 1.0 / (1.0 + 2j * np.pi * frequency * 1e-3)
+    settled = time > 10e-3
+    expected = np.imag(gain * np.exp(2j * np.pi * frequency * time[settled]))
+    np.testing.assert_allclose(values[settled, 0], expected, atol=2e-3)
+
+
+def test_long_run_steps_past_tstep():
+    simulator = TransientSimulator(rc(Pulse(0, 1, delay=1e-4, rise=1e-9)), 0.5, 1e-6, ['out'])
+    count = sum(len(chunk) for chunk in simulator.chunks())
+    assert count == 500001
+    assert simulator.steps_accepted < 10000
+
+
+def test_rejects_nonpositive_times():
+    with pytest.raises(ValueError):
+        TransientSimulator(rc(Sine(0, 1, 1)), 0, 1e-6)